@@ -1 +1,3 @@
 __version__ = "0.2.0"
+
+from .hints import get_type_hints
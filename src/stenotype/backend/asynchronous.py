@@ -0,0 +1,164 @@
+"""
+Conversion for :py:mod:`asyncio` services, without blocking the event loop
+
+Parsing is synchronous and CPU bound, so a burst of long expressions would stall an
+event loop for as long as they take to parse. An :py:class:`~.AsyncConverter` runs
+the conversions in an executor instead, and only awaits their results:
+
+.. code:: python
+
+    converter = AsyncConverter(ProcessPoolExecutor(4), max_pending=4)
+    typing_string = await converter.convert("?[int]")
+
+Results that are cached already are returned right away. Concurrent requests for the
+same string share a single conversion. At most ``max_pending`` conversions are
+submitted to the executor at once, so further requests wait in the event loop; a
+request that is cancelled while waiting never occupies a worker.
+"""
+import asyncio
+import os
+import weakref
+from concurrent.futures import Executor
+from typing import Any, Dict, Hashable, List, Optional
+
+from . import elements as ste
+from . import grammar, pipeline
+from .cache import CachedFunction
+
+
+__all__ = ["AsyncConverter", "parse", "convert", "shorten"]
+
+
+#: cached functions that may run in an executor, by name
+FUNCTIONS: Dict[str, CachedFunction] = {
+    "parse": grammar.parse,
+    "convert": pipeline.convert,
+    "shorten": pipeline.shorten,
+}
+
+
+def _call(name: str, string: str, engine: Optional[str]) -> Any:
+    """Run a function of :py:data:`~.FUNCTIONS` in a worker thread or process"""
+    return FUNCTIONS[name](string, engine)
+
+
+class AsyncConverter:
+    """
+    Converter that runs conversions in an ``executor`` on behalf of an event loop
+
+    :param executor: the executor to run conversions in, by default that of the loop
+    :param max_pending: maximum number of conversions submitted to the executor at
+        once, by default the number of CPUs
+    :param engine: parser engine, see :py:func:`~.grammar.parse`
+
+    A :py:class:`~concurrent.futures.ProcessPoolExecutor` allows to convert on several
+    cores; its workers each keep their own caches, whose results are also stored in
+    the caches of the serving process. For the queue of pending conversions to be
+    effective, ``max_pending`` should not exceed the number of workers. A conversion
+    that has started cannot be interrupted; it runs to completion, but its result
+    is discarded if all its requests are cancelled.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        max_pending: Optional[int] = None,
+        engine: Optional[str] = None,
+    ):
+        self.executor = executor
+        self.max_pending = max_pending or os.cpu_count() or 1
+        self.engine = engine
+        self._slots: Optional[asyncio.Semaphore] = None
+        #: task and number of requests for each conversion in flight
+        self._in_flight: Dict[Hashable, List[Any]] = {}
+
+    async def parse(self, steno_string: str) -> ste.Steno:
+        """Parse ``steno_string`` as by :py:func:`~.grammar.parse`"""
+        element: ste.Steno = await self._request("parse", steno_string)
+        return element
+
+    async def convert(self, steno_string: str) -> str:
+        """Convert ``steno_string`` as by :py:func:`~.pipeline.convert`"""
+        typing_string: str = await self._request("convert", steno_string)
+        return typing_string
+
+    async def shorten(self, typing_string: str) -> str:
+        """Shorten ``typing_string`` as by :py:func:`~.pipeline.shorten`"""
+        steno_string: str = await self._request("shorten", typing_string)
+        return steno_string
+
+    async def _request(self, name: str, string: str) -> Any:
+        function = FUNCTIONS[name]
+        key = (name, grammar._engine_key(string, self.engine))
+        if key[1] in function.cache:
+            return function(string, self.engine)
+        try:
+            in_flight = self._in_flight[key]
+        except KeyError:
+            task = asyncio.ensure_future(self._run(name, string))
+            in_flight = self._in_flight[key] = [task, 0]
+            task.add_done_callback(lambda _: self._forget(key, in_flight))
+        in_flight[1] += 1
+        try:
+            return await asyncio.shield(in_flight[0])
+        except asyncio.CancelledError:
+            # stop the conversion if no other request waits for it anymore
+            if in_flight[1] == 1:
+                # later requests must start a new conversion, not await this one
+                self._forget(key, in_flight)
+                in_flight[0].cancel()
+            raise
+        finally:
+            in_flight[1] -= 1
+
+    def _forget(self, key: Hashable, in_flight: List[Any]) -> None:
+        """Remove the conversion ``in_flight`` for ``key``, if it is still current"""
+        if self._in_flight.get(key) is in_flight:
+            del self._in_flight[key]
+
+    async def _run(self, name: str, string: str) -> Any:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            result = await asyncio.get_event_loop().run_in_executor(
+                self.executor, _call, name, string, self.engine
+            )
+        # keep the results of worker processes in the caches of this process
+        FUNCTIONS[name].cache.put(grammar._engine_key(string, self.engine), result)
+        return result
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({self.executor!r},"
+            f" max_pending={self.max_pending}, engine={self.engine!r})"
+        )
+
+
+#: converters of the module level functions, by event loop
+_CONVERTERS: "weakref.WeakKeyDictionary[Any, AsyncConverter]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _converter() -> AsyncConverter:
+    loop = asyncio.get_event_loop()
+    try:
+        return _CONVERTERS[loop]
+    except KeyError:
+        converter = _CONVERTERS[loop] = AsyncConverter()
+        return converter
+
+
+async def parse(steno_string: str) -> ste.Steno:
+    """Parse ``steno_string`` in the default executor of the running event loop"""
+    return await _converter().parse(steno_string)
+
+
+async def convert(steno_string: str) -> str:
+    """Convert ``steno_string`` in the default executor of the running event loop"""
+    return await _converter().convert(steno_string)
+
+
+async def shorten(typing_string: str) -> str:
+    """Shorten ``typing_string`` in the default executor of the running event loop"""
+    return await _converter().shorten(typing_string)
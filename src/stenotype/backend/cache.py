@@ -0,0 +1,224 @@
+"""
+Bounded memoization of :py:mod:`stenotype` conversions
+
+Annotations are highly repetitive: the same few hundred strings, such as ``?str`` or
+``[int]``, make up most of any code base. Since all
+:py:mod:`~stenotype.backend.elements` are immutable values, the result of converting
+a string can be safely shared by every later conversion of the same string.
+
+The caches are bounded both by number of entries and by an approximate memory budget,
+and evict the least recently used entries first.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from functools import update_wrapper
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+
+__all__ = ["CacheInfo", "LRUCache", "CachedFunction", "bounded_cache"]
+
+
+R = TypeVar("R")
+
+#: marker for a missing cache entry, as ``None`` is a valid cached value
+_MISSING = object()
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a :py:class:`~.LRUCache`, akin to :py:func:`functools.lru_cache`"""
+
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+    maxbytes: Optional[int]
+    currbytes: int
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Approximate the memory footprint of a value in bytes
+
+    Nested tuples, such as any :py:mod:`~stenotype.backend.elements` tree,
+    are traversed and every object that is shared inside the tree is counted only once.
+    """
+    seen = set()
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, tuple):
+            stack.extend(item)
+    return size
+
+
+class LRUCache:
+    """
+    Mapping that evicts the least recently used entries when exceeding its bounds
+
+    :param maxsize: maximum number of entries, or :py:data:`None` for no limit
+    :param maxbytes: approximate maximum size of keys and values in bytes,
+        or :py:data:`None` for no limit
+    """
+
+    def __init__(
+        self, maxsize: Optional[int] = 1024, maxbytes: Optional[int] = None
+    ) -> None:
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get the value for ``key``, or ``default`` if it is not cached"""
+        with self._lock:
+            try:
+                value, _ = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store the ``value`` for ``key``, evicting old entries as needed"""
+        size = approximate_size(key) + approximate_size(value)
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._data.pop(key)[1]
+            if self._maxbytes is not None and size > self._maxbytes:
+                return
+            self._data[key] = value, size
+            self._bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self._maxsize is not None and len(self._data) > self._maxsize)
+            or (self._maxbytes is not None and self._bytes > self._maxbytes)
+        ):
+            _, (_, size) = self._data.popitem(last=False)
+            self._bytes -= size
+
+    def resize(self, maxsize: Optional[int], maxbytes: Optional[int]) -> None:
+        """Change the bounds of the cache, evicting entries that no longer fit"""
+        with self._lock:
+            self._maxsize, self._maxbytes = maxsize, maxbytes
+            self._evict()
+
+    def info(self) -> CacheInfo:
+        """Report statistics and bounds of the cache"""
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self._maxsize,
+                currsize=len(self._data),
+                maxbytes=self._maxbytes,
+                currbytes=self._bytes,
+            )
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = self._hits = self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+
+class CachedFunction(Generic[R]):
+    """
+    Function memoized by a :py:class:`~.LRUCache`
+
+    Only successful results are cached; exceptions are always raised anew.
+    The original function is available as ``__wrapped__``.
+
+    If ``key`` is given, it is called with the arguments of each call to compute
+    the cache key. This allows equivalent calls, such as those relying on
+    defaults, to share the same entry.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., R],
+        cache: LRUCache,
+        key: Optional[Callable[..., Hashable]] = None,
+    ) -> None:
+        self.cache = cache
+        self.key = key
+        self.__wrapped__ = func
+        update_wrapper(self, func)
+
+    def __call__(self, *args: Hashable, **kwargs: Hashable) -> R:
+        if self.key is not None:
+            key = self.key(*args, **kwargs)
+        elif kwargs:
+            key = (*args, *sorted(kwargs.items()))
+        else:
+            key = args
+        result = self.cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = self.__wrapped__(*args, **kwargs)
+            self.cache.put(key, result)
+        return result  # type: ignore
+
+    def cache_info(self) -> CacheInfo:
+        """Report statistics and bounds of the cache"""
+        return self.cache.info()
+
+    def cache_clear(self) -> None:
+        """Remove all entries and reset the statistics of the cache"""
+        self.cache.clear()
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.__wrapped__!r}>"
+
+
+def bounded_cache(
+    maxsize: Optional[int] = 1024,
+    maxbytes: Optional[int] = None,
+    key: Optional[Callable[..., Hashable]] = None,
+) -> Callable[[Callable[..., R]], CachedFunction[R]]:
+    """
+    Decorator to memoize a function with hashable arguments in an :py:class:`~.LRUCache`
+
+    .. code:: python
+
+        @bounded_cache(maxsize=256, maxbytes=1024 * 1024)
+        def parse(steno_string: str) -> ste.Steno:
+            ...
+
+        parse.cache_info()   # CacheInfo(hits=0, misses=0, maxsize=256, ...)
+        parse.cache_clear()
+    """
+
+    def decorator(func: Callable[..., R]) -> CachedFunction[R]:
+        return CachedFunction(
+            func, LRUCache(maxsize=maxsize, maxbytes=maxbytes), key=key
+        )
+
+    return decorator
@@ -0,0 +1,156 @@
+"""
+Single pass compiler from :py:mod:`stenotype` elements to :py:mod:`typing` strings
+
+Converting a parsed element via ``unparse(normalize(element))`` walks two trees:
+:py:func:`~.typing.normalize` rebuilds the element tree from :py:mod:`typing`
+elements, and :py:func:`~.steno.unparse` turns these into a string.
+:py:func:`~.to_typing` instead folds the parsed tree directly into the string of its
+normalized form, without building the intermediate tree:
+
+.. code:: python
+
+    to_typing(parse("?[int]")) == "typing.Optional[typing.List[int]]"
+
+The result and errors are the same as for ``unparse(normalize(element))``, which is
+also used for elements that only have handlers for the separate passes.
+"""
+from operator import attrgetter
+from typing import List, Union
+
+from . import elements as ste
+from .dispatch import typedispatch
+from .steno import unparse
+from .typing import (
+    normalize,
+    SHORTHAND,
+    _LITERAL_BASES,
+    _base,
+    _callable_children,
+    _generic_children,
+    _signature_children,
+)
+
+
+__all__ = ["to_typing"]
+
+
+@typedispatch
+def to_typing(element: ste.Steno) -> str:
+    """Convert any element representation to the string of its typing equivalent"""
+    return unparse(normalize(element))
+
+
+def _generic(base: str, parameters: List[str]) -> str:
+    return f"typing.{base}[{', '.join(parameters)}]"
+
+
+@to_typing.register(ste.Dots)
+def to_typing_dots(element: ste.Dots) -> str:
+    return "..."
+
+
+# typing expressions
+# ==================
+
+
+@to_typing.register(ste.Identifier)
+def to_typing_identifier(element: ste.Identifier) -> str:
+    return ".".join(element)
+
+
+@to_typing.register_fold(ste.Generic, _generic_children)
+def to_typing_generic(element: ste.Generic, parameters: List[str]) -> str:
+    if element.base in _LITERAL_BASES:
+        return unparse(element)
+    return f"{unparse(element.base)}[{', '.join(parameters)}]"
+
+
+@to_typing.register_fold(ste.Callable, _callable_children)
+def to_typing_callable(element: ste.Callable, children: List[str]) -> str:
+    if isinstance(element.positional, ste.Dots):
+        return f"typing.Callable[..., {children[-1]}]"
+    return f"typing.Callable[[{', '.join(children[:-1])}], {children[-1]}]"
+
+
+# stenotype expressions
+# =====================
+
+# Special Forms
+# -------------
+
+
+@to_typing.register(ste.Any)
+def to_typing_any(element: ste.Any) -> str:
+    return "typing.Any"
+
+
+@to_typing.register_fold(ste.Optional, _base)
+def to_typing_optional(element: ste.Optional, children: List[str]) -> str:
+    return _generic("Optional", children)
+
+
+@to_typing.register_fold(ste.Union, tuple)
+def to_typing_union(element: ste.Union, members: List[str]) -> str:
+    return _generic("Union", members)
+
+
+# Containers
+# ----------
+
+
+@to_typing.register_fold(ste.Tuple, attrgetter("elements"))
+def to_typing_tuple(element: ste.Tuple, elements: List[str]) -> str:
+    return _generic("Tuple", elements)
+
+
+@to_typing.register_fold(ste.List, lambda element: (element.values,))
+def to_typing_list(element: ste.List, children: List[str]) -> str:
+    return _generic("List", children)
+
+
+@to_typing.register_fold(ste.Dict, lambda element: (element.keys, element.values))
+def to_typing_dict(element: ste.Dict, children: List[str]) -> str:
+    return _generic("Dict", children)
+
+
+@to_typing.register_fold(ste.Set, lambda element: (element.values,))
+def to_typing_set(element: ste.Set, children: List[str]) -> str:
+    return _generic("Set", children)
+
+
+# Literals
+# --------
+
+
+@to_typing.register(ste.Literal)
+def to_typing_literal(element: ste.Literal) -> str:
+    return f"typing.Literal[{unparse(element)}]"
+
+
+# Shorthands
+# ----------
+
+
+@to_typing.register_fold(ste.Iterable, _base)
+@to_typing.register_fold(ste.Context, _base)
+@to_typing.register_fold(ste.Awaitable, _base)
+@to_typing.register_fold(ste.AsyncIterable, _base)
+@to_typing.register_fold(ste.AsyncContext, _base)
+def to_typing_shorthand(
+    element: Union[
+        ste.Iterable, ste.Context, ste.Awaitable, ste.AsyncIterable, ste.AsyncContext
+    ],
+    children: List[str],
+) -> str:
+    return f"{unparse(SHORTHAND[type(element)])}[{children[0]}]"
+
+
+# Callables
+# ---------
+
+
+@to_typing.register_fold(ste.Signature, _signature_children)
+def to_typing_signature(element: ste.Signature, children: List[str]) -> str:
+    if element.args:
+        return f"typing.Callable[..., {children[-1]}]"
+    return f"typing.Callable[[{', '.join(children[:-1])}], {children[-1]}]"
@@ -0,0 +1,360 @@
+"""
+Recursive descent parser for :py:mod:`stenotype` strings
+
+This is an alternative engine to the :py:mod:`pyparsing` rules of
+:py:mod:`~stenotype.backend.grammar`, producing the same
+:py:mod:`~stenotype.backend.elements`. Instead of trying each alternative of a rule
+in turn, it decides on a rule by looking at the next token only. Each string is
+parsed in a single pass from left to right over the tokens of
+:py:mod:`~stenotype.backend.lexer`.
+
+Where the grammar has to backtrack, the parser instead reinterprets what it has
+already parsed: for example, ``(A, B)`` is parsed as a parameter list and turned
+into a :py:class:`~stenotype.backend.elements.Tuple` if no ``->`` follows.
+"""
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from . import elements as ste
+from .lexer import tokenize
+from .limits import current_budget, set_budget
+from ..util import ParseError
+
+
+__all__ = ["parse", "parse_deep"]
+
+
+#: names under which :py:class:`typing.Callable` is recognised
+_CALLABLE_NAMES = {ste.Identifier("Callable"), ste.Identifier("typing", "Callable")}
+
+_SHORTHANDS: Dict[str, Callable[[ste.Steno], ste.Steno]] = {
+    "iter": ste.Iterable,
+    "with": ste.Context,
+    "await": ste.Awaitable,
+    "async iter": ste.AsyncIterable,
+    "async with": ste.AsyncContext,
+}
+
+_LITERALS = {"True": True, "False": False, "None": None, "Ellipsis": Ellipsis}
+
+
+class Parser:
+    """Parser for a single string, see :py:func:`~.parse`"""
+
+    def __init__(self, string: str):
+        self.string = string
+        budget = current_budget()
+        self._tokens = (
+            tokenize(string) if budget is None else budget.metered(tokenize(string))
+        )
+        self.kind, self.value, self.pos, _ = next(self._tokens)
+
+    def advance(self) -> str:
+        """Move to the next token, returning the value of the current one"""
+        value = self.value
+        self.kind, self.value, self.pos, _ = next(self._tokens)
+        return value
+
+    def expect(self, kind: str) -> str:
+        """Move past the current token, which must be of the given ``kind``"""
+        if self.kind != kind:
+            raise self.error(f"Expected {kind!r}")
+        return self.advance()
+
+    def error(self, message: str) -> ParseError:
+        found = f"found {self.value!r}" if self.kind != "END" else "found end of text"
+        return ParseError(f"{message}, {found}", self.string, self.pos)
+
+    # entry points
+    def parse(self) -> ste.Steno:
+        """Parse the entire string as a single ``TYPE``"""
+        element = self.type()
+        if self.kind != "END":
+            raise self.error("Expected end of text")
+        return element
+
+    def type(self) -> ste.Steno:
+        """``TYPE``, i.e. a signature or a union of types"""
+        if self.kind == "(":
+            element = self.paren()
+            if isinstance(element, ste.Signature):
+                return element
+            return self.union_tail(element)
+        return self.union_tail(self.operand())
+
+    def union_tail(self, first: ste.Steno) -> ste.Steno:
+        """Parse any ``'or' TYPE`` following ``first`` to a union"""
+        if self.kind != "or":
+            return first
+        members = [first]
+        while self.kind == "or":
+            self.advance()
+            members.append(self.union_member())
+        return ste.Union(*members)
+
+    def union_member(self) -> ste.Steno:
+        """``TYPE_exclude_UNION``, i.e. a type that is not a signature or union"""
+        if self.kind == "(":
+            pos = self.pos
+            element = self.paren()
+            if isinstance(element, ste.Signature):
+                raise ParseError("Signature must not be in a union", self.string, pos)
+            return element
+        return self.operand()
+
+    def operand(self) -> ste.Steno:
+        """Any type that is not parenthesised or a union"""
+        kind = self.kind
+        if kind == "NAME":
+            return self.typing(self.advance())
+        elif kind == "_":
+            self.advance()
+            return ste.Any()
+        elif kind == "?":
+            self.advance()
+            if self.kind == "?":
+                raise self.error("Expected TYPE")
+            return ste.Optional(self.type())
+        elif kind == "[":
+            self.advance()
+            values = self.type()
+            self.expect("]")
+            return ste.List(values)
+        elif kind == "{":
+            self.advance()
+            keys = self.type()
+            if self.kind == ":":
+                self.advance()
+                values = self.type()
+                self.expect("}")
+                return ste.Dict(keys, values)
+            self.expect("}")
+            return ste.Set(keys)
+        elif kind in _LITERALS:
+            self.advance()
+            return ste.Literal(_LITERALS[kind])
+        elif kind == "INT":
+            return ste.Literal(int(self.advance()))
+        elif kind == "STRING":
+            return ste.Literal(self.advance())
+        elif kind == "BYTES":
+            return ste.Literal("b" + self.advance()[1:].lstrip(" \t\n\r"))
+        elif kind in _SHORTHANDS:
+            self.advance()
+            return _SHORTHANDS[kind](self.type())
+        raise self.error("Expected TYPE")
+
+    # typing expressions
+    def typing(self, first: str) -> ste.Steno:
+        """``IDENTIFIER``, ``GENERIC`` or ``CALLABLE`` whose first name is consumed"""
+        names = [first]
+        while self.kind == ".":
+            self.advance()
+            names.append(self.expect("NAME"))
+        identifier = ste.Identifier(*names)
+        if self.kind != "[":
+            return identifier
+        self.advance()
+        if identifier in _CALLABLE_NAMES:
+            if self.kind == "...":
+                self.advance()
+                self.expect(",")
+                returns = self.type()
+                self.expect("]")
+                return ste.Callable(ste.Dots(), returns)
+            elif self.kind == "[":
+                return self.callable(identifier)
+        return self.generic(identifier, [self.generic_parameter()])
+
+    def generic_parameter(self) -> ste.Steno:
+        """``TYPE | '...'``, such as the ``...`` of ``typing.Tuple[int, ...]``"""
+        if self.kind == "...":
+            self.advance()
+            return ste.Dots()
+        return self.type()
+
+    def generic(self, base: ste.Identifier, parameters: List[ste.Steno]) -> ste.Generic:
+        """Parse the remaining ``{',' (TYPE | '...')} ']'`` of a ``GENERIC``"""
+        while self.kind == ",":
+            self.advance()
+            parameters.append(self.generic_parameter())
+        self.expect("]")
+        return ste.Generic(base, tuple(parameters))
+
+    def callable(self, base: ste.Identifier) -> ste.Steno:
+        """Parse ``'[' [TYPE {',' TYPE}] ']' ',' TYPE ']'`` of a ``CALLABLE``"""
+        pos = self.pos
+        self.advance()
+        if self.kind == "]":
+            self.advance()
+            self.expect(",")
+            returns = self.type()
+            self.expect("]")
+            return ste.Callable((), returns)
+        positional = [self.type()]
+        while self.kind == ",":
+            self.advance()
+            positional.append(self.type())
+        self.expect("]")
+        if self.kind == ",":
+            self.advance()
+            returns = self.type()
+            if self.kind == "]":
+                self.advance()
+                return ste.Callable(tuple(positional), returns)
+            parameters = [ste.List(positional[0]), returns]
+        else:
+            parameters = [self.union_tail(ste.List(positional[0]))]
+        # not a Callable after all, but a Generic whose first parameter is a List
+        if len(positional) != 1:
+            raise ParseError("Expected ']'", self.string, pos)
+        return self.generic(base, parameters)
+
+    # stenotype expressions
+    def parameter(self) -> ste.Parameter:
+        """``[NAME ':'] TYPE``"""
+        if self.kind == "NAME":
+            name = self.advance()
+            if self.kind == ":":
+                self.advance()
+                return ste.Parameter(name=name, base=self.type())
+            return ste.Parameter(name=None, base=self.union_tail(self.typing(name)))
+        return ste.Parameter(name=None, base=self.type())
+
+    def paren(self) -> ste.Steno:
+        """``SIGNATURE_ANY``, ``SIGNATURE`` or ``TUPLE``"""
+        self.advance()
+        if self.kind == "...":
+            self.advance()
+            self.expect(")")
+            self.expect("->")
+            return ste.Signature(
+                positional=(),
+                mixed=(),
+                args=ste.Parameter(name=None, base=ste.Any()),
+                keywords=(),
+                kwargs=None,
+                returns=self.type(),
+            )
+        positional: Optional[List[ste.Parameter]] = None
+        mixed: List[ste.Parameter] = []
+        args: Optional[ste.Parameter] = None
+        keywords: List[ste.Parameter] = []
+        kwargs: Optional[ste.Parameter] = None
+        # the parameter list section, one of "mixed", "keywords" or "end"
+        section = "mixed"
+        is_tuple, dots = True, False
+        while True:
+            kind = self.kind
+            if kind == "/" and section == "mixed" and positional is None and mixed:
+                self.advance()
+                positional, mixed, is_tuple = mixed, [], False
+            elif kind == "*" and section == "mixed":
+                self.advance()
+                if self.kind != "," and self.kind != ")":
+                    args = self.parameter()
+                section, is_tuple = "keywords", False
+            elif kind == "**" and section == "keywords":
+                self.advance()
+                kwargs = self.parameter()
+                section = "end"
+            elif kind == "..." and is_tuple and mixed:
+                self.advance()
+                dots = True
+                break
+            elif section == "mixed":
+                parameter = self.parameter()
+                is_tuple = is_tuple and parameter.name is None
+                mixed.append(parameter)
+            elif section == "keywords" and self.kind == "NAME":
+                pos = self.pos
+                parameter = self.parameter()
+                if parameter.name is None:
+                    raise ParseError("Expected NAME ':' TYPE", self.string, pos)
+                keywords.append(parameter)
+            else:
+                raise self.error("Expected ')'")
+            if self.kind != ",":
+                break
+            self.advance()
+        self.expect(")")
+        if self.kind == "->" and not dots:
+            self.advance()
+            return ste.Signature(
+                positional=tuple(positional or ()),
+                mixed=tuple(mixed),
+                args=args,
+                keywords=tuple(keywords),
+                kwargs=kwargs,
+                returns=self.type(),
+            )
+        if not is_tuple:
+            raise self.error("Expected '->'")
+        elements: Tuple = tuple(parameter.base for parameter in mixed)
+        return ste.Tuple(elements + (ste.Dots(),) if dots else elements)
+
+
+def parse(steno_string: str) -> ste.Steno:
+    """Parse a stenotype or typing string to element representation"""
+    return Parser(steno_string).parse()
+
+
+#: Python frames used per nested ``TYPE``, at most, for any kind of nesting
+_FRAMES_PER_LEVEL = 8
+
+
+class _DeepParser(Parser):
+    """Parser continuing in a new thread after each ``levels`` of nested ``TYPE``"""
+
+    def __init__(self, string: str, levels: int):
+        super().__init__(string)
+        self.levels = levels
+        self.depth = 0
+
+    def type(self) -> ste.Steno:
+        self.depth += 1
+        try:
+            if self.depth % self.levels:
+                return super().type()
+            return _in_thread(super().type)
+        finally:
+            self.depth -= 1
+
+
+def _in_thread(function: Callable[[], ste.Steno]) -> ste.Steno:
+    """Call ``function`` in a new thread, with the budget of the current thread"""
+    outcome: List[Union[ste.Steno, BaseException]] = []
+    budget = current_budget()
+
+    def run() -> None:
+        set_budget(budget)
+        try:
+            outcome.append(function())
+        except BaseException as err:
+            outcome.append(err)
+
+    thread = threading.Thread(target=run, name="stenotype-parse-deep")
+    thread.start()
+    thread.join()
+    result = outcome[0]
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def parse_deep(steno_string: str) -> ste.Steno:
+    """
+    Parse a stenotype or typing string nested arbitrarily deep
+
+    The parser uses a few Python frames for each level of nesting, so
+    :py:func:`~.parse` fails with a :py:exc:`RecursionError` for expressions
+    nested more than a few hundred levels deep. This function instead continues
+    parsing in a new thread whenever the frames of the current thread reach half
+    the recursion limit; the recursion limit applies to each thread separately,
+    and is never changed. Only one thread parses at any time.
+    """
+    levels = max(1, sys.getrecursionlimit() // (2 * _FRAMES_PER_LEVEL))
+    if len(steno_string) < levels:
+        return parse(steno_string)
+    return _in_thread(_DeepParser(steno_string, levels).parse)
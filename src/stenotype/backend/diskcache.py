@@ -0,0 +1,159 @@
+"""
+Persistent cache of conversion results, shared by consecutive and concurrent runs
+
+Entries are JSON documents, each stored in its own file below a directory specific
+to the version of :py:mod:`stenotype` and the sources of its backend. Any change to
+either starts a fresh set of entries, so that stale results are never reused.
+
+Every entry is written to a temporary file first and then moved into place, so that
+concurrent runs never see partial entries. When the cache outgrows its size limit,
+the least recently used entries are evicted.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .. import __version__
+
+
+__all__ = ["DiskCache", "digest", "fingerprint", "DEFAULT_DIRECTORY"]
+
+
+#: directory of the cache, relative to the working directory
+DEFAULT_DIRECTORY = ".stenotype_cache"
+
+_FINGERPRINT: Optional[str] = None
+
+
+def digest(*parts: Union[str, bytes]) -> str:
+    """Compute a key from several strings or bytes"""
+    hasher = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+    return hasher.hexdigest()
+
+
+def fingerprint() -> str:
+    """Identify the version and grammar of :py:mod:`stenotype` that create results"""
+    global _FINGERPRINT
+    if _FINGERPRINT is None:
+        sources = sorted(Path(__file__).parent.glob("*.py"))
+        _FINGERPRINT = digest(
+            __version__, *(source.read_bytes() for source in sources)
+        )[:16]
+    return _FINGERPRINT
+
+
+class DiskCache:
+    """
+    Cache of JSON documents in the files of a directory
+
+    :param directory: the directory of the cache, which is created as needed
+    :param maxbytes: approximate maximum size of all entries, or ``None`` for no limit
+
+    The size limit is only enforced by :py:meth:`~.prune`, which is meant to be
+    called once at the end of a run.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = DEFAULT_DIRECTORY,
+        maxbytes: Optional[int] = 256 * 1024 * 1024,
+    ):
+        self.directory = Path(directory)
+        self.maxbytes = maxbytes
+
+    def _path(self, key: str) -> Path:
+        return self.directory / fingerprint() / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get the entry for ``key``, or ``None`` if there is none"""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as in_stream:
+                value = json.load(in_stream)
+            # mark the entry as recently used for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Atomically set the entry for ``key`` to the JSON document ``value``"""
+        path = self._path(key)
+        if not path.parent.exists():
+            self._create(path.parent)
+        handle, temp_path = tempfile.mkstemp(
+            dir=str(path.parent), prefix=".", suffix=".tmp"
+        )
+        try:
+            with open(handle, "w", encoding="utf-8") as out_stream:
+                json.dump(value, out_stream, separators=(",", ":"))
+            os.replace(temp_path, str(path))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def update(self, key: str, items: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add ``items`` to the object entry for ``key`` and return the merged entry
+
+        The entry is re-read before merging, to keep items added concurrently.
+        Should two runs update the entry at the same time, the items of one run
+        may be lost; the entry is never corrupted, however.
+        """
+        merged = self.get(key)
+        merged = merged if isinstance(merged, dict) else {}
+        merged.update(items)
+        self.put(key, merged)
+        return merged
+
+    def _create(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        ignore = self.directory / ".gitignore"
+        if not ignore.exists():
+            ignore.write_text("# automatically created by stenotype\n*\n")
+
+    def prune(self) -> int:
+        """
+        Evict the least recently used entries to respect ``maxbytes``
+
+        :returns: the number of evicted entries
+        """
+        if self.maxbytes is None or not self.directory.exists():
+            return 0
+        entries = []
+        for path in self.directory.glob("*/*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, entry_size, path in sorted(entries):
+            if size <= self.maxbytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            size -= entry_size
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        """Remove all entries of all versions"""
+        for path in self.directory.glob("*/*/*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({str(self.directory)!r}, {self.maxbytes})"
@@ -0,0 +1,169 @@
+"""
+Dispatch of functions on the type of :py:mod:`~stenotype.backend.elements`
+
+Passes over element trees, such as :py:func:`~stenotype.backend.typing.normalize`
+and :py:func:`~stenotype.backend.steno.unparse`, call one handler per type of
+element. :py:func:`functools.singledispatch` supports this for arbitrary class
+hierarchies, at the price of an MRO aware lookup per call. The element types are
+a closed set of concrete classes, so a :py:class:`~.TypeDispatcher` instead looks
+up handlers by the exact type of each element in a plain :py:class:`dict`.
+
+Handlers are registered as for :py:func:`functools.singledispatch`, including
+handlers for new element types added by third parties:
+
+.. code:: python
+
+    @unparse.register(MyElement)
+    def unparse_my_element(element: MyElement) -> str:
+        ...
+
+Subclasses of registered types are still dispatched to the handler of their
+nearest registered base class; the lookup via the MRO happens only once per type.
+
+Handlers registered via :py:meth:`~.TypeDispatcher.register_fold` do not call the
+dispatcher for the children of an element, but receive their results. The
+dispatcher then traverses the tree using an explicit stack instead of recursion,
+so that even trees nested thousands of levels deep do not exceed the recursion limit.
+"""
+import functools
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Type, TypeVar
+
+
+__all__ = ["TypeDispatcher", "typedispatch"]
+
+
+R = TypeVar("R")
+
+
+class _Fold(Generic[R]):
+    """Handler combining the results for the ``children`` of an element"""
+
+    __slots__ = ("dispatcher", "children", "func")
+
+    def __init__(
+        self,
+        dispatcher: "TypeDispatcher[R]",
+        children: Callable[[Any], Sequence],
+        func: Callable[[Any, List[R]], R],
+    ):
+        self.dispatcher = dispatcher
+        self.children = children
+        self.func = func
+
+    def __call__(self, element) -> R:
+        return self.dispatcher._fold(element, self)
+
+
+class TypeDispatcher(Generic[R]):
+    """
+    Function dispatching on the exact type of its first argument
+
+    :param default: the function called for types without a registered handler
+    """
+
+    def __init__(self, default: Callable[..., R]):
+        functools.update_wrapper(self, default)
+        self.default = default
+        #: handlers as registered for each type
+        self.registry: Dict[type, Callable[..., R]] = {object: default}
+        #: handlers for each type encountered, including unregistered subclasses
+        self._table: Dict[type, Callable[..., R]] = dict(self.registry)
+
+    def register(self, cls: type, func: Optional[Callable[..., R]] = None) -> Callable:
+        """
+        Register ``func`` as the handler for elements of type ``cls``
+
+        If ``func`` is omitted, act as a decorator that registers a function.
+        """
+        if func is None:
+            return functools.partial(self.register, cls)
+        self.registry[cls] = func
+        # handlers found via the MRO may be shadowed by the new handler
+        self._table = dict(self.registry)
+        return func
+
+    def register_fold(
+        self,
+        cls: type,
+        children: Callable[[Any], Sequence],
+        func: Optional[Callable[[Any, List[R]], R]] = None,
+    ) -> Callable:
+        """
+        Register ``func`` as the handler for elements of type ``cls`` and their results
+
+        :param children: a function getting the children of an element, which are
+            dispatched before the element itself
+        :param func: a function getting an element and the results of its children
+
+        If ``func`` is omitted, act as a decorator that registers a function.
+        """
+        if func is None:
+            return functools.partial(self.register_fold, cls, children)
+        self.register(cls, _Fold(self, children, func))
+        return func
+
+    def dispatch(self, cls: Type) -> Callable[..., R]:
+        """Get the handler for elements of type ``cls``"""
+        try:
+            return self._table[cls]
+        except KeyError:
+            pass
+        handler = next(
+            self.registry[base] for base in cls.__mro__ if base in self.registry
+        )
+        self._table[cls] = handler
+        return handler
+
+    def __call__(self, element, *args, **kwargs) -> R:
+        try:
+            handler = self._table[element.__class__]
+        except KeyError:
+            handler = self.dispatch(element.__class__)
+        return handler(element, *args, **kwargs)
+
+    def _fold(self, element, fold: _Fold[R]) -> R:
+        """Dispatch ``element`` and all its children without recursion"""
+        table, dispatch = self._table, self.dispatch
+        results: List[R] = []
+        # pending elements with their handler, and the start of the results of their
+        # children once these are pending as well; leaves and new folds are marked by
+        # a start of -1 and -2, respectively
+        stack: List[Any] = [(element, fold, -2)]
+        while stack:
+            node, handler, start = stack.pop()
+            if start >= 0:
+                children = results[start:]
+                del results[start:]
+                results.append(handler.func(node, children))
+                continue
+            elif start == -1:
+                results.append(handler(node))
+                continue
+            children = handler.children(node)
+            # results of leading leaves are computed right away, in order
+            leaves = []
+            for index, child in enumerate(children):
+                child_handler = table.get(child.__class__) or dispatch(child.__class__)
+                if type(child_handler) is _Fold:
+                    break
+                leaves.append(child_handler(child))
+            else:
+                results.append(handler.func(node, leaves))
+                continue
+            stack.append((node, handler, len(results)))
+            results.extend(leaves)
+            first = (children[index], child_handler, -2)
+            for child in reversed(children[index + 1 :]):
+                child_handler = table.get(child.__class__) or dispatch(child.__class__)
+                is_fold = type(child_handler) is _Fold
+                stack.append((child, child_handler, -2 if is_fold else -1))
+            stack.append(first)
+        return results[0]
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.__qualname__}>"
+
+
+def typedispatch(default: Callable[..., R]) -> TypeDispatcher[R]:
+    """Decorate a function to dispatch on the exact type of its first argument"""
+    return TypeDispatcher(default)
@@ -171,6 +171,7 @@ Steno = UnionT[
     Generic,
     Any,
     Optional,
+    Union,
     Tuple,
     List,
     Dict,
@@ -0,0 +1,258 @@
+"""
+Random generation of :py:mod:`~stenotype.backend.elements` trees
+
+A :py:class:`~.Generator` creates random, well-formed element trees of every
+construct, for stress tests, benchmarks and differential tests. Trees are
+rendered via :py:func:`~stenotype.backend.steno.unparse` and parse back to the
+very same tree:
+
+.. code:: python
+
+    generator = Generator(seed=42, max_depth=6, weights={"signature": 0})
+    for tree in generator.trees(1000):
+        assert roundtrip(tree)
+
+The same seed and options always produce the same trees. Large corpora are best
+streamed to disk with :py:func:`~.write_corpus`, one expression per line.
+"""
+import random
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    TextIO,
+    Union,
+)
+
+from . import elements as ste
+from .grammar import parse
+from .steno import unparse
+
+
+__all__ = ["Generator", "CONSTRUCTS", "roundtrip", "write_corpus"]
+
+
+#: constructs that may be generated, of which the first three are leaves
+CONSTRUCTS = (
+    "identifier",
+    "any",
+    "literal",
+    "generic",
+    "optional",
+    "union",
+    "tuple",
+    "list",
+    "dict",
+    "set",
+    "shorthand",
+    "signature",
+    "callable",
+)
+
+_LEAVES = CONSTRUCTS[:3]
+
+_IDENTIFIERS = [
+    ste.Identifier(*name.split("."))
+    for name in ("int", "str", "bytes", "foo", "Bar", "T", "typing.List", "np.ndarray")
+]
+_GENERICS = [
+    ste.Identifier(*name.split("."))
+    for name in ("List", "Mapping", "typing.Dict", "abc.Sequence", "Foo")
+]
+_LITERALS = [
+    0,
+    42,
+    -1,
+    True,
+    False,
+    None,
+    Ellipsis,
+    "'x'",
+    '"foo bar"',
+    "b'x'",
+]
+_NAMES = ["a", "b", "key", "value", "args", "kwargs"]
+_SHORTHANDS: List[Callable[[ste.Steno], ste.Steno]] = [
+    ste.Iterable,
+    ste.Context,
+    ste.Awaitable,
+    ste.AsyncIterable,
+    ste.AsyncContext,
+]
+
+# Some trees do not survive unparsing, and are never generated:
+# - ``?`` and shorthands take an entire union as their base, so only the last
+#   member of a union may be one of them. ``??a`` is not valid at all.
+# - Unions are flattened when parsed, and may not contain signatures.
+_EXCLUDED: Dict[str, FrozenSet[str]] = {
+    "any": frozenset(),
+    "optional": frozenset({"optional"}),
+    "member": frozenset({"union", "signature", "optional", "shorthand"}),
+    "last": frozenset({"union", "signature"}),
+}
+
+
+class Generator:
+    """
+    Seeded generator of random element trees
+
+    :param seed: seed of the random numbers, or :py:data:`None` for a random seed
+    :param max_depth: maximum nesting of constructs, where leaves have depth 0
+    :param max_width: maximum number of members, elements and parameters
+    :param weights: relative frequency of each of :py:data:`~.CONSTRUCTS`,
+        which default to 1; a weight of 0 disables a construct
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        max_depth: int = 4,
+        max_width: int = 3,
+        weights: Optional[Mapping[str, float]] = None,
+    ):
+        unknown = set(weights or ()) - set(CONSTRUCTS)
+        if unknown:
+            raise ValueError(f"Unknown constructs {sorted(unknown)}")
+        self.max_depth = max_depth
+        self.max_width = max_width
+        self.weights = {name: 1.0 for name in CONSTRUCTS}
+        self.weights.update(weights or {})
+        if not any(self.weights[name] > 0 for name in _LEAVES):
+            raise ValueError(f"At least one of {_LEAVES} must have a positive weight")
+        self._random = random.Random(seed)
+        self._builders: Dict[str, Callable[[int], ste.Steno]] = {
+            "identifier": lambda depth: self._random.choice(_IDENTIFIERS),
+            "any": lambda depth: ste.Any(),
+            "literal": lambda depth: ste.Literal(self._random.choice(_LITERALS)),
+            "generic": self._generic,
+            "optional": lambda depth: ste.Optional(self.tree(depth - 1, "optional")),
+            "union": self._union,
+            "tuple": self._tuple,
+            "list": lambda depth: ste.List(self.tree(depth - 1)),
+            "dict": lambda depth: ste.Dict(self.tree(depth - 1), self.tree(depth - 1)),
+            "set": lambda depth: ste.Set(self.tree(depth - 1)),
+            "shorthand": lambda depth: self._random.choice(_SHORTHANDS)(
+                self.tree(depth - 1)
+            ),
+            "signature": self._signature,
+            "callable": self._callable,
+        }
+
+    def tree(self, depth: Optional[int] = None, context: str = "any") -> ste.Steno:
+        """
+        Create a random tree nested at most ``depth`` levels deep
+
+        :param depth: maximum depth, defaults to ``max_depth``
+        :param context: where the tree is used, which excludes some constructs
+        """
+        depth = self.max_depth if depth is None else depth
+        excluded = _EXCLUDED[context]
+        candidates = [
+            name
+            for name in (CONSTRUCTS if depth > 0 else _LEAVES)
+            if self.weights[name] > 0 and name not in excluded
+        ]
+        weights = [self.weights[name] for name in candidates]
+        # random.choices is not available on Python 3.6.0
+        pick = self._random.uniform(0, sum(weights))
+        for name, weight in zip(candidates, weights):
+            pick -= weight
+            if pick <= 0:
+                break
+        return self._builders[name](depth)
+
+    def trees(self, count: int) -> Iterator[ste.Steno]:
+        """Lazily create ``count`` random trees"""
+        for _ in range(count):
+            yield self.tree()
+
+    def strings(self, count: int) -> Iterator[str]:
+        """Lazily create ``count`` random stenotype strings"""
+        for tree in self.trees(count):
+            yield unparse(tree)
+
+    def _width(self, minimum: int = 1) -> int:
+        return self._random.randint(minimum, max(minimum, self.max_width))
+
+    def _several(self, depth: int, minimum: int = 1) -> List[ste.Steno]:
+        return [self.tree(depth - 1) for _ in range(self._width(minimum))]
+
+    def _generic(self, depth: int) -> ste.Generic:
+        return ste.Generic(self._random.choice(_GENERICS), tuple(self._several(depth)))
+
+    def _union(self, depth: int) -> ste.Union:
+        members = [self.tree(depth - 1, "member") for _ in range(self._width(2) - 1)]
+        return ste.Union(*members, self.tree(depth - 1, "last"))
+
+    def _tuple(self, depth: int) -> ste.Tuple:
+        elements: List[Union[ste.Steno, ste.Dots]] = list(self._several(depth))
+        if self._random.random() < 0.25:
+            elements.append(ste.Dots())
+        return ste.Tuple(tuple(elements))
+
+    def _callable(self, depth: int) -> ste.Callable:
+        positional: Union[tuple, ste.Dots] = (
+            ste.Dots() if self._random.random() < 0.25 else tuple(self._several(depth))
+        )
+        return ste.Callable(positional, self.tree(depth - 1))
+
+    def _parameter(self, depth: int, named: Optional[bool] = None) -> ste.Parameter:
+        if named is None:
+            named = self._random.random() < 0.5
+        name = self._random.choice(_NAMES) if named else None
+        return ste.Parameter(name=name, base=self.tree(depth - 1))
+
+    def _parameters(self, depth: int, named: Optional[bool] = None) -> tuple:
+        return tuple(self._parameter(depth, named) for _ in range(self._width(0) // 2))
+
+    def _signature(self, depth: int) -> ste.Signature:
+        chance = self._random.random
+        return ste.Signature(
+            positional=self._parameters(depth),
+            mixed=self._parameters(depth),
+            args=self._parameter(depth) if chance() < 0.3 else None,
+            keywords=self._parameters(depth, named=True),
+            kwargs=self._parameter(depth) if chance() < 0.3 else None,
+            returns=self.tree(depth - 1),
+        )
+
+
+def roundtrip(tree: ste.Steno, engine: Optional[str] = None) -> bool:
+    """
+    Check that ``tree`` is parsed from its own string
+
+    Unlike ``parse(unparse(tree)) == tree``, this also distinguishes elements of
+    different type but equal fields, such as ``List(a)`` and ``Set(a)``.
+    """
+    parsed = parse(unparse(tree), engine)
+    return parsed == tree and repr(parsed) == repr(tree)
+
+
+def write_corpus(
+    target: Union[str, Path, TextIO], count: int, generator: Optional[Generator] = None
+) -> int:
+    """
+    Write ``count`` random stenotype strings to ``target``, one per line
+
+    :param target: a path or a text stream to write to
+    :param count: number of strings to write
+    :param generator: the generator of trees, by default a :py:class:`~.Generator`
+        with seed 0
+    :returns: the number of characters written
+
+    Strings are written as they are created, so that corpora of any size can be
+    written without holding them in memory.
+    """
+    generator = generator if generator is not None else Generator(seed=0)
+    if isinstance(target, (str, Path)):
+        with open(target, "w", encoding="utf-8") as out_stream:
+            return write_corpus(out_stream, count, generator)
+    written = 0
+    for string in generator.strings(count):
+        written += target.write(string + "\n")
+    return written
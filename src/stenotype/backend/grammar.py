@@ -1,417 +1,317 @@
 """
 Grammar for parsing :py:mod:`stenotype` strings to :py:mod:`~stenotype.backend.elements`
+
+The :py:mod:`pyparsing` rules of the grammar are defined in
+:py:mod:`~stenotype.backend.rules`, which is only imported on the first parse with the
+``"pyparsing"`` engine. Importing this module does not build any rules.
 """
-from keyword import kwlist
-from pyparsing import (
-    Word,
-    alphas,
-    Forward,
-    delimitedList,
-    Literal,
-    Keyword,
-    nums,
-    Group,
-    Suppress,
-    OneOrMore,
-    ParseResults,
-    Optional,
-    QuotedString,
-    Combine,
-    MatchFirst,
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    Optional as OptionalT,
 )
 
 from . import elements as ste
+from . import descent
+from .cache import bounded_cache
+from .profiler import RuleProfile, RuleStats, rule_names
+from .limits import Budget, Limits, check as check_limits, current_budget, set_budget
+from ..util import ParseError
 
 
-__all__ = ["parse"]
-
-
-def unpack(results: ParseResults) -> tuple:
-    """Unpack the members of a :py:class:`~.ParseResults` to a :py:class:`tuple`"""
-    return tuple(item[0] for item in results)
-
-
-#: Words that are not valid identifiers
-KEYWORDS = Forward()
-KEYWORDS.setName("KEYWORD")
-KEYWORDS << MatchFirst(tuple(map(Keyword, kwlist)))
-
-#: literal `...`, e.g. in `typing.Tuple[int, ...]`, not an `Ellipsis`
-DOTS = Literal("...").setParseAction(lambda: ste.Dots())
-KEYWORDS << MatchFirst((*KEYWORDS.expr.exprs, DOTS))
-
-#: any valid typing or stenotype expression, such as `List`, `typing.List`, `?List`, ...
-TYPE = Forward()
-TYPE.setName("TYPE")
-TYPE_exclude_UNION = Forward()
-TYPE_exclude_UNION.setName("TYPE_exclude_UNION")
-
-# typing expressions
-# ==================
+if TYPE_CHECKING:  # pragma: no cover
+    from pyparsing import ParserElement
 
-#: a direct or nested reference, such as `List` or `typing.List`
-IDENTIFIER = (
-    delimitedList((~KEYWORDS + Word(alphas)).setName("IDENTIFIER"), delim=".")
-    .setName("NAME")
-    .setParseAction(lambda s, l, toks: ste.Identifier(*toks))
-)
-
-#: a subscribed reference, such as `List[...]`
-GENERIC = (
-    (IDENTIFIER + Suppress("[") + delimitedList(Group(TYPE)) + Suppress("]"))
-    .setName("NAME '[' TYPE {',' TYPE} ']'")
-    .setParseAction(lambda s, loc, toks: ste.Generic(toks[0], unpack(toks[1:])))
-)
-
-# TODO: Should we support aliases to ``typing``?
-CALLABLE_BASE = Optional(Suppress("typing") + Suppress(".")) + Suppress(
-    Keyword("Callable")
-)
-#: a ``typing.Callable``, such as ``Callable[[A, B, C], R]`` or ``Callable[..., R]``
-CALLABLE = (
-    CALLABLE_BASE
-    + Suppress("[")
-    + MatchFirst((Suppress("[") + delimitedList(Group(TYPE)) + Suppress("]"), DOTS))
-    + Suppress(",")
-    + TYPE
-    + Suppress("]")
-).setParseAction(
-    lambda s, loc, toks: ste.Callable(
-        toks[0] if type(toks[0]) == ste.Dots else unpack(toks[:-1]), toks[-1]
+__all__ = [
+    "parse",
+    "ENGINES",
+    "enable_packrat",
+    "disable_packrat",
+    "set_limits",
+    "enable_profile",
+    "disable_profile",
+]
+
+
+# Packrat Mode
+# ============
+
+# The grammar backtracks heavily, e.g. ``UNION`` parses a ``TYPE_exclude_UNION`` before
+# failing over to the other ``TYPE`` alternatives which parse it again. Packrat mode
+# memoizes the result of every rule at every location. Unlike
+# :py:meth:`pyparsing.ParserElement.enablePackrat`, this only affects the stenotype
+# grammar and not any other pyparsing grammars.
+
+
+def iter_rules(root: "ParserElement") -> Iterator["ParserElement"]:
+    """Iterate over all rules reachable from ``root``, including ``root`` itself"""
+    seen = set()
+    stack = [root]
+    while stack:
+        rule = stack.pop()
+        if rule is None or id(rule) in seen:
+            continue
+        seen.add(id(rule))
+        yield rule
+        stack.extend(getattr(rule, "exprs", ()))
+        stack.append(getattr(rule, "expr", None))
+
+
+class PackratMemo(threading.local):
+    """Bounded memo of rule results at each location of the current parse"""
+
+    def __init__(self, maxsize: OptionalT[int]):
+        self.maxsize = maxsize
+        self.entries: OrderedDict = OrderedDict()
+
+    def store(self, key: tuple, value) -> None:
+        entries = self.entries
+        entries[key] = value
+        if self.maxsize is not None and len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+
+def _packrat_parse(rule: "ParserElement", memo: PackratMemo):
+    """Create a memoized replacement for the ``_parse`` method of ``rule``"""
+    from pyparsing import ParseBaseException
+
+    parse_no_cache = rule._parseNoCache
+
+    def _parse(instring, loc, doActions=True, callPreParse=True):
+        key = (rule, loc, doActions, callPreParse)
+        try:
+            value = memo.entries[key]
+        except KeyError:
+            try:
+                value = parse_no_cache(instring, loc, doActions, callPreParse)
+            except ParseBaseException as pe:
+                # cache a copy of the exception, without the traceback
+                memo.store(key, pe.__class__(*pe.args))
+                raise
+            else:
+                memo.store(key, (value[0], value[1].copy()))
+                return value
+        if isinstance(value, Exception):
+            raise value
+        return value[0], value[1].copy()
+
+    return _parse
+
+
+_PACKRAT_MEMO: OptionalT[PackratMemo] = None
+
+
+def _budgeted_parse(parse):
+    """Create a replacement for the ``_parse`` method of a rule spending a step"""
+
+    def _parse(instring, loc, doActions=True, callPreParse=True):
+        budget = current_budget()
+        if budget is not None:
+            budget.spend()
+        return parse(instring, loc, doActions, callPreParse)
+
+    return _parse
+
+
+def _profiled_parse(parse, stats: RuleStats):
+    """Create a replacement for the ``_parse`` method of a rule updating ``stats``"""
+    from pyparsing import ParseBaseException
+
+    perf_counter = time.perf_counter
+
+    def _parse(instring, loc, doActions=True, callPreParse=True):
+        stats.attempts += 1
+        stats.active += 1
+        start = perf_counter()
+        try:
+            result = parse(instring, loc, doActions, callPreParse)
+        except ParseBaseException:
+            stats.failures += 1
+            raise
+        finally:
+            stats.active -= 1
+            if not stats.active:
+                stats.seconds += perf_counter() - start
+        stats.successes += 1
+        return result
+
+    return _parse
+
+
+def _hook_rules() -> None:
+    """
+    Replace the ``_parse`` method of all rules for packrat mode, budgets and profiles
+    """
+    from .rules import TYPE
+
+    budgeted = LIMITS is not None and (
+        LIMITS.max_steps is not None or LIMITS.max_seconds is not None
     )
-)
+    names = rule_names() if _PROFILE is not None else {}
+    for rule in iter_rules(TYPE):
+        rule.__dict__.pop("_parse", None)
+        if _PACKRAT_MEMO is not None:
+            rule._parse = _packrat_parse(rule, _PACKRAT_MEMO)
+        if budgeted:
+            rule._parse = _budgeted_parse(rule._parse)
+        if _PROFILE is not None and id(rule) in names:
+            rule._parse = _profiled_parse(rule._parse, _PROFILE[names[id(rule)]])
+
+
+def enable_packrat(maxsize: OptionalT[int] = 1024) -> None:
+    """
+    Enable packrat mode, memoizing up to ``maxsize`` rule results per parse
+
+    Packrat mode trades memory for avoiding repeated parsing of the same rule at the
+    same location. This mostly benefits nested unions, dicts and signatures.
+    A ``maxsize`` of :py:data:`None` does not limit the number of memoized results.
+    """
+    global _PACKRAT_MEMO
+    _PACKRAT_MEMO = PackratMemo(maxsize)
+    _hook_rules()
+
+
+def disable_packrat() -> None:
+    """Disable packrat mode, see :py:func:`~.enable_packrat`"""
+    global _PACKRAT_MEMO
+    _PACKRAT_MEMO = None
+    _hook_rules()
+
+
+# Resource Limits
+# ===============
+
+
+#: limits of all parsers, see :py:func:`~.set_limits`
+LIMITS: OptionalT[Limits] = None
+
+
+def set_limits(
+    max_length: OptionalT[int] = None,
+    max_depth: OptionalT[int] = None,
+    max_steps: OptionalT[int] = None,
+    max_seconds: OptionalT[float] = None,
+) -> None:
+    """
+    Limit the resources used for parsing each string, see :py:mod:`~.limits`
+
+    :param max_length: maximum number of characters
+    :param max_depth: maximum nesting of brackets and prefixes such as ``?``
+    :param max_steps: maximum number of rules attempted by the ``"pyparsing"``
+        engine, of which even short strings need thousands, or of tokens consumed
+        by the ``"descent"`` engines
+    :param max_seconds: maximum wall time of parsing
+
+    Each limit of :py:data:`None` is not checked; calling this function without
+    arguments removes all limits. Strings exceeding a limit raise
+    :py:exc:`~stenotype.util.LimitExceeded`. Results that are cached already are
+    returned regardless of the limits. Counting steps or time with the
+    ``"pyparsing"`` engine requires its rules, which are built by this function.
+    """
+    global LIMITS
+    limits = Limits(max_length, max_depth, max_steps, max_seconds)
+    budgeted = max_steps is not None or max_seconds is not None
+    was_budgeted = LIMITS is not None and (
+        LIMITS.max_steps is not None or LIMITS.max_seconds is not None
+    )
+    LIMITS = limits if any(limit is not None for limit in limits) else None
+    if budgeted or was_budgeted:
+        _hook_rules()
 
-#: any valid typing expression
-TYPING = MatchFirst((CALLABLE, GENERIC, IDENTIFIER)).setName(
-    "CALLABLE | GENERIC | IDENTIFIER"
-)
 
-# stenotype expressions
-# =====================
-
-# Special Forms
-# -------------
-
-#: `Any` as `_`
-ANY = Keyword("_").setName("'_'").setParseAction(lambda s, loc, toks: ste.Any())
-
-_OPTIONAL_SYMBOL = Literal("?")
-#: `Optional[TP]` as `?TP`
-OPTIONAL = (
-    Suppress(_OPTIONAL_SYMBOL)
-    + ~_OPTIONAL_SYMBOL
-    + Group(TYPE).setParseAction(lambda s, loc, toks: ste.Optional(toks[0][0]))
-).setName("'?' TYPE")
-
-_UNION_SEPARATOR = Keyword("or")
-#: `Union[TA, TB]`` as ``TA or TB``
-UNION = (
-    (TYPE_exclude_UNION + OneOrMore(Suppress(_UNION_SEPARATOR) + TYPE_exclude_UNION))
-    .setName("TYPE 'or' TYPE {'or' TYPE}")
-    .setParseAction(lambda s, loc, toks: ste.Union(*toks))
-)
+# Rule Profiles
+# =============
 
-KEYWORDS << MatchFirst((*KEYWORDS.expr.exprs, _UNION_SEPARATOR))
-#: all special forms
-SPECIALS = MatchFirst((UNION, ANY, OPTIONAL)).setName("UNION | ANY | OPTIONAL")
 
-# Containers
-# ----------
+_PROFILE: OptionalT[RuleProfile] = None
 
-#: `Tuple[TA, TB, ...]` as `(TA, TB, ...)`
-TUPLE = (
-    (
-        Suppress("(")
-        + delimitedList(TYPE)
-        + Optional(Suppress(",") + DOTS)
-        + Suppress(")")
-    )
-    .setName("'(' TYPE {',' TYPE} [',' '...'] ')'")
-    .setParseAction(lambda s, loc, toks: ste.Tuple(tuple(toks)))
-)
-#: `List[TA]` as `[TA]`
-LIST = (
-    (Suppress("[") + TYPE + Suppress("]"))
-    .setName("'[' TYPE ']'")
-    .setParseAction(lambda s, loc, toks: ste.List(toks[0]))
-)
-#: `Dict[TK, TV]` as `{TK: TV}`
-DICT = (
-    (Suppress("{") + TYPE + Suppress(":") + TYPE + Suppress("}"))
-    .setName("'{' TYPE ':' TYPE '}'")
-    .setParseAction(lambda s, loc, toks: ste.Dict(toks[0], toks[1]))
-)
-#: `Set[TA]` as `{TA}`
-SET = (
-    (Suppress("{") + TYPE + Suppress("}"))
-    .setName("'{' TYPE '}'")
-    .setParseAction(lambda s, loc, toks: ste.Set(toks[0]))
-)
 
-#: all container literals
-CONTAINERS = MatchFirst((TUPLE, LIST, DICT, SET)).setName("TUPLE | LIST | DICT | SET")
+def enable_profile() -> RuleProfile:
+    """
+    Profile the rules of the ``"pyparsing"`` engine, see :py:mod:`~.profiler`
 
-# Literals
-# --------
+    :returns: the profile, which is updated by every parse until profiling is disabled
 
-#: a literal bool, i.e. `True` or `False`
-LITERAL_BOOL = (
-    (Keyword("True") | Keyword("False"))
-    .setName("'True' | 'False'")
-    .setParseAction(
-        lambda s, loc, toks: ste.Literal(True)
-        if toks[0] == "True"
-        else ste.Literal(False)
-    )
-)
-#: a literal `None`
-LITERAL_NONE = (
-    (Keyword("None"))
-    .setName("'None'")
-    .setParseAction(lambda s, loc, toks: ste.Literal(None))
-)
-#: a literal `Ellipsis` or `...`
-LITERAL_ELLIPSIS = (
-    (Keyword("Ellipsis"))
-    .setName("'Ellipsis'")
-    .setParseAction(lambda s, loc, toks: ste.Literal(Ellipsis))
-)
-#: any literal `int`
-LITERAL_INT = (
-    (Combine(Optional("-") + Word(nums)))
-    .setName("INTEGER")
-    .setParseAction(lambda s, loc, toks: ste.Literal(int(toks[0])))
-)
-_string_opts = dict(unquoteResults=False, convertWhitespaceEscapes=False)
-#: any literal `str`
-LITERAL_STR = (
-    (
-        QuotedString('"', escChar="\\", **_string_opts)
-        | QuotedString("'", escChar="\\", **_string_opts)
-    )
-    .setName("STRING")
-    .setParseAction(lambda s, loc, toks: ste.Literal(toks[0]))
-)
-#: any literal `bytes`
-LITERAL_BYTES = (
-    (
-        "b"
-        + (
-            QuotedString('"', escChar="\\", **_string_opts)
-            | QuotedString("'", escChar="\\", **_string_opts)
-        )
-    )
-    .setName("BYTES")
-    .setParseAction(lambda s, loc, toks: ste.Literal("b" + toks[1]))
-)
-# TODO: float (does this even make sense? float is notoriously bad for precise values)
+    Only strings that are actually parsed are profiled, not results that are cached
+    already. Profiling builds the rules of the ``"pyparsing"`` engine.
+    """
+    global _PROFILE
+    _PROFILE = RuleProfile()
+    _hook_rules()
+    return _PROFILE
 
-KEYWORDS << MatchFirst(
-    (*KEYWORDS.expr.exprs, LITERAL_BOOL, LITERAL_NONE, LITERAL_ELLIPSIS)
-)
-#: all literal values
-LITERALS = MatchFirst(
-    (
-        LITERAL_BOOL,
-        LITERAL_NONE,
-        LITERAL_ELLIPSIS,
-        LITERAL_INT,
-        LITERAL_STR,
-        LITERAL_BYTES,
-    )
-).setName(
-    " | ".join(
-        (
-            "LITERAL_BOOL",
-            "LITERAL_NONE",
-            "LITERAL_ELLIPSIS",
-            "LITERAL_INT",
-            "LITERAL_STR",
-        )
-    )
-)
 
-# Shorthands
-# ----------
+def disable_profile() -> None:
+    """Disable profiling, see :py:func:`~.enable_profile`"""
+    global _PROFILE
+    _PROFILE = None
+    _hook_rules()
 
-#: `Iterable[T]` as `iter T`
-ITERABLE = (
-    (Keyword("iter") + TYPE)
-    .setName("'iter' TYPE")
-    .setParseAction(lambda s, loc, toks: ste.Iterable(toks[1]))
-)
-#: `ContextManager[T]` as `with T`
-CONTEXT = (
-    (Keyword("with") + TYPE)
-    .setName("'with' TYPE")
-    .setParseAction(lambda s, loc, toks: ste.Context(toks[1]))
-)
-#: `Awaitable[T]` as `await T`
-AWAITABLE = (
-    (Keyword("await") + TYPE)
-    .setName("'await' TYPE")
-    .setParseAction(lambda s, loc, toks: ste.Awaitable(toks[1]))
-)
-#: `AsyncIterable[T]` as `async iter T`
-ASYNC_ITERABLE = (
-    (Keyword("async iter") + TYPE)
-    .setName("'async iter' TYPE")
-    .setParseAction(lambda s, loc, toks: ste.AsyncIterable(toks[1]))
-)
-#: `AsyncContextManager[T]` as `async with T`
-ASYNC_CONTEXT = (
-    (Keyword("async with") + TYPE)
-    .setName("'async with' TYPE")
-    .setParseAction(lambda s, loc, toks: ste.AsyncContext(toks[1]))
-)
 
-KEYWORDS << MatchFirst(
-    (
-        *KEYWORDS.expr.exprs,
-        ITERABLE.exprs[0],
-        CONTEXT.exprs[0],
-        AWAITABLE.exprs[0],
-        ASYNC_ITERABLE.exprs[0],
-        ASYNC_CONTEXT.exprs[0],
-    )
-)
-#: all shorthand notations
-SHORTHANDS = MatchFirst(
-    (ITERABLE, CONTEXT, AWAITABLE, ASYNC_ITERABLE, ASYNC_CONTEXT)
-).setName(
-    " | ".join(("ITERABLE", "CONTEXT", "AWAITABLE", "ASYNC_ITERABLE", "ASYNC_CONTEXT"))
-)
+# Parser Engines
+# ==============
 
-# Callable
-# ----------
 
-#: `Callable[[A, B], R]` as `(A, B) -> R`
-#: `Protocol.__call__(a: A, b: B, /, c: C, d: D, *args) -> R`
+def parse_pyparsing(steno_string: str) -> ste.Steno:
+    """Parse a stenotype or typing string using the :py:mod:`pyparsing` grammar"""
+    from pyparsing import ParseBaseException
+    from .rules import TYPE
 
-# Parsing the signature is tricky, because delimiters depend on whether
-# two complex elements are joined. The parse rules thus are built from
-# individual complex elements, arranged in various combinations.
+    if _PACKRAT_MEMO is not None:
+        _PACKRAT_MEMO.entries.clear()
+    try:
+        return TYPE.parseString(steno_string, parseAll=True)[0]  # type: ignore
+    except ParseBaseException as err:
+        raise ParseError(err.msg, steno_string, err.loc) from err
 
-# Individual parameters as `A` or `a: A`
-NAME = (~KEYWORDS + Word(alphas)).setName("NAME")
-PARAMETER = (
-    (Optional(NAME + Suppress(":"), default=None) + TYPE)
-    .setName("[NAME ':'] TYPE")
-    .setParseAction(lambda s, loc, toks: ste.Parameter(name=toks[0], base=toks[1]))
-)
-NAMED_PARAMETER = (
-    (NAME + Suppress(":") + TYPE)
-    .setName("NAME ':' TYPE")
-    .setParseAction(lambda s, loc, toks: ste.Parameter(name=toks[0], base=toks[1]))
-)
 
-# Individual parts of the signature
-SIGNATURE_POSITIONAL = (
-    (delimitedList(PARAMETER) + Suppress(",") + Suppress("/"))
-    .setName("[NAME ':'] TYPE {',' [NAME ':'] TYPE} ',' '/'")
-    .setResultsName("positional")
-)
-SIGNATURE_MIXED = (
-    delimitedList(PARAMETER)
-    .setName("[NAME ':'] TYPE {',' [NAME ':'] TYPE}")
-    .setResultsName("mixed")
-)
-SIGNATURE_ARGS = (
-    Suppress("*") + (Optional(PARAMETER, default=None).setResultsName("args"))
-).setName("'*' [TYPE]")
-SIGNATURE_KEYWORDS = (
-    delimitedList(NAMED_PARAMETER)
-    .setName("NAME ':' TYPE {',' NAME ':' TYPE}")
-    .setResultsName("keywords")
-)
-SIGNATURE_KWARGS = (Suppress("**") + Group(PARAMETER).setResultsName("kwargs")).setName(
-    "'**' TYPE"
-)
-SIGNATURE_RETURN = Suppress("->") + TYPE.setResultsName("returns").setName("-> TYPE")
-
-# Match for the entire parameter list
-# This does a recursive ``head + Optional(delimiter + tail) or tail``. This
-# creates any combination of optional tails starting from any head.
-# Based on the Python 3.8 Function Definitions grammar
-PARAMETER_LIST_STARARGS = MatchFirst(
-    (
-        SIGNATURE_ARGS
-        + Optional(Suppress(",") + SIGNATURE_KEYWORDS)
-        + Optional(Suppress(",") + SIGNATURE_KWARGS),
-        SIGNATURE_KWARGS,
-    )
-)
-PARAMETER_LIST_NO_POSONLY = MatchFirst(
-    (
-        SIGNATURE_MIXED + Optional(Suppress(",") + PARAMETER_LIST_STARARGS),
-        PARAMETER_LIST_STARARGS,
-    )
-)
-PARAMETER_LIST = MatchFirst(
-    (
-        SIGNATURE_POSITIONAL + Optional(Suppress(",") + PARAMETER_LIST_NO_POSONLY),
-        PARAMETER_LIST_NO_POSONLY,
-    )
-)
+#: engines available to :py:func:`~.parse`
+ENGINES: Dict[str, Callable[[str], ste.Steno]] = {
+    "pyparsing": parse_pyparsing,
+    "descent": descent.parse,
+    "deep": descent.parse_deep,
+}
 
-# The actual call signature
-SIGNATURE = (
-    (Suppress("(") + PARAMETER_LIST + Suppress(")") + SIGNATURE_RETURN)
-    .setName(
-        # This does not exactly replicate leading/trailing
-        # comma separators, but is much more readable.
-        "'(' "
-        "[{[NAME ':'] TYPE ','} '/' ','] "
-        "{[NAME ':'] TYPE ','} "
-        "[* [[NAME ':' ] TYPE] ','] "
-        "{NAME ':' TYPE ','} "
-        "[** [[NAME ':'] TYPE]] "
-        "')' '->' TYPE"
-    )
-    .setParseAction(
-        lambda s, loc, toks: ste.Signature(
-            positional=tuple(toks.positional),
-            mixed=tuple(toks.mixed),
-            args=toks.args[0] if toks.args else None,
-            keywords=tuple(toks.keywords),
-            kwargs=toks.kwargs[0] if toks.kwargs else None,
-            returns=toks.returns,
-        )
-    )
-)
+#: the engine used by :py:func:`~.parse` if none is selected explicitly
+DEFAULT_ENGINE = "pyparsing"
 
-#: `Callable[..., R]` as `(...) -> R`, alias for ``(*_) -> R``
-SIGNATURE_ANY = (
-    (Suppress("(") + DOTS + Suppress(")") + SIGNATURE_RETURN)
-    .setName("'(' '...' ')' '->' TYPE")
-    .setParseAction(
-        lambda s, loc, toks: ste.Signature(
-            positional=(),
-            mixed=(),
-            args=ste.Parameter(name=None, base=ste.Any()),
-            keywords=(),
-            kwargs=None,
-            returns=toks.returns,
-        )
-    )
-)
 
-#: any valid stenotype expression
-STENOTYPE = MatchFirst(
-    (
-        SIGNATURE_ANY,
-        SIGNATURE,
-        *SPECIALS.exprs,
-        *CONTAINERS.exprs,
-        *LITERALS.exprs,
-        *SHORTHANDS.exprs,
-    )
-).setName("SPECIALS | CONTAINERS | LITERALS | SHORTHANDS")
+def _engine_key(steno_string: str, engine: OptionalT[str] = None) -> Hashable:
+    """Cache key of a call with ``engine`` resolved to the engine actually used"""
+    return steno_string, engine or DEFAULT_ENGINE
+
 
-TYPE << MatchFirst((*STENOTYPE.exprs, *TYPING.exprs))
-TYPE_exclude_UNION << (CONTAINERS | LITERALS | SHORTHANDS | ANY | OPTIONAL | TYPING)
+@bounded_cache(maxsize=4096, maxbytes=16 * 1024 * 1024, key=_engine_key)
+def parse(steno_string: str, engine: OptionalT[str] = None) -> ste.Steno:
+    """
+    Parse a stenotype or typing string to element representation
 
+    :param steno_string: the string to parse
+    :param engine: name of the parser engine in :py:data:`~.ENGINES`,
+        defaults to :py:data:`~.DEFAULT_ENGINE`
+    :raises ParseError: if ``steno_string`` is not a valid expression
 
-def parse(steno_string: str) -> ste.Steno:
-    """Parse a stenotype or typing string to element representation"""
-    return TYPE.parseString(steno_string, parseAll=True)[0]  # type: ignore
+    All engines produce the same elements: ``"pyparsing"`` uses the rules of this
+    module, while ``"descent"`` uses the faster :py:mod:`~stenotype.backend.descent`
+    parser and ``"deep"`` uses the same parser for strings nested thousands of
+    levels deep. Results are memoized in a bounded cache, which can be inspected via
+    ``parse.cache_info()`` and reset via ``parse.cache_clear()``.
+    """
+    parse_engine = ENGINES[engine or DEFAULT_ENGINE]
+    limits = LIMITS
+    if limits is None:
+        return parse_engine(steno_string)
+    check_limits(steno_string, limits)
+    if limits.max_steps is None and limits.max_seconds is None:
+        return parse_engine(steno_string)
+    set_budget(Budget(steno_string, limits))
+    try:
+        return parse_engine(steno_string)
+    finally:
+        set_budget(None)
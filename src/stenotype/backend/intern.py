@@ -0,0 +1,148 @@
+"""
+Hash-consing of :py:mod:`~stenotype.backend.elements` trees
+
+Interning an element replaces it and all its children by canonical instances, so
+that structurally equal elements are represented by the same object. A corpus of
+many similar annotations then shares its common sub-trees, such as
+``Identifier('typing', 'List')``, instead of holding one copy each.
+
+Interned elements are equal exactly if they are identical: comparing them via
+``is`` is a constant time check, and even ``==`` only compares their children
+by identity. Unlike ``==`` on plain elements, identity also distinguishes
+elements of different type but equal fields, such as ``Identifier('a')`` and
+``Literal('a')``.
+
+Elements are tuples, which cannot be weakly referenced. Instead, an
+:py:class:`~.Interner` holds a bounded number of canonical instances and
+evicts the least recently used ones, so that memory is reclaimed once no
+interned tree uses them anymore. Since the table of an interner takes about as
+much memory as the elements themselves, an interner should be cleared or
+discarded once a corpus is interned; the interned trees keep sharing their
+children.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional, TypeVar, cast
+
+from . import elements as ste
+
+
+__all__ = ["Interner", "InternInfo", "intern"]
+
+
+E = TypeVar("E")
+
+
+class InternInfo(NamedTuple):
+    """Statistics of an :py:class:`~.Interner`"""
+
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class Interner:
+    """
+    Table of canonical elements, sharing one instance per structurally equal element
+
+    :param maxsize: maximum number of canonical instances, or :py:data:`None`
+        for no limit
+
+    .. code:: python
+
+        interner = Interner()
+        first = interner(parse("?[int] or [str]"))
+        second = interner(parse("?[int]"))
+        assert second is first[0]
+
+    Evicting an instance does not affect any interned tree, but a later equal
+    element gets a new canonical instance. Elements interned by different
+    interners are never identical.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 65536):
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._table: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __call__(self, element: E) -> E:
+        """Get the canonical instance of ``element`` and all its children"""
+        with self._lock:
+            return cast(E, self._intern(element))
+
+    def _intern(self, value: Any) -> Any:
+        if isinstance(value, tuple):
+            children = tuple(map(self._intern, value))
+            # children are canonical, so their identity identifies them. The canonical
+            # parent keeps them alive, so their ids are not reused while it is stored.
+            key: Hashable = (type(value), *map(id, children))
+        elif isinstance(value, (ste.Dots, ste.Any)):
+            # these have no fields and are not hashable
+            key = (type(value),)
+        else:
+            # leaves are strings, numbers and the like, but True == 1 == 1.0
+            key = type(value), value
+        table = self._table
+        try:
+            canonical = table[key]
+        except KeyError:
+            self._misses += 1
+        else:
+            self._hits += 1
+            table.move_to_end(key)
+            return canonical
+        if isinstance(value, tuple) and any(
+            new is not old for new, old in zip(children, value)
+        ):
+            value = _rebuild(value, children)
+        table[key] = value
+        if self._maxsize is not None and len(table) > self._maxsize:
+            table.popitem(last=False)
+        return value
+
+    def info(self) -> InternInfo:
+        """Report statistics and bounds of the interner"""
+        with self._lock:
+            return InternInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self._maxsize,
+                currsize=len(self._table),
+            )
+
+    def clear(self) -> None:
+        """Forget all canonical instances and reset the statistics"""
+        with self._lock:
+            self._table.clear()
+            self._hits = self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+
+def _rebuild(value: tuple, children: tuple) -> tuple:
+    """Create a tuple of the same type as ``value`` from ``children``"""
+    cls = type(value)
+    if cls is tuple:
+        return children
+    if hasattr(cls, "_make"):
+        return cls._make(children)  # type: ignore
+    # tuple types with variadic constructor, such as Identifier and Union
+    return cls(*children)
+
+
+#: the default interner used by :py:func:`~.intern`
+INTERNER = Interner()
+
+
+def intern(element: E) -> E:
+    """
+    Get the canonical instance of ``element`` and all its children
+
+    This uses a process wide :py:class:`~.Interner`, which keeps up to 65536
+    canonical instances.
+    """
+    return INTERNER(element)
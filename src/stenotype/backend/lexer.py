@@ -0,0 +1,98 @@
+"""
+Lexer splitting :py:mod:`stenotype` strings into tokens
+
+All tokens are matched by a single compiled regular expression. Words are
+classified as names or keywords by a dictionary lookup, instead of trying to
+match each keyword in turn.
+"""
+import re
+from keyword import kwlist
+from typing import Dict, FrozenSet, Iterator, NamedTuple, cast
+
+from ..util import ParseError
+
+
+__all__ = ["Token", "tokenize", "KEYWORDS"]
+
+
+class Token(NamedTuple):
+    """A token of kind ``kind`` with text ``value`` at ``string[start:end]``"""
+
+    #: ``"NAME"``, ``"INT"``, ``"STRING"``, ``"BYTES"``, ``"KEYWORD"`` or ``"END"``,
+    #: otherwise the text of a keyword or symbol such as ``"or"`` or ``"->"``
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+#: kinds of all words that cannot be used as names
+KEYWORDS: Dict[str, str] = {
+    **{word: "KEYWORD" for word in kwlist},
+    "or": "or",
+    "True": "True",
+    "False": "False",
+    "None": "None",
+    "Ellipsis": "Ellipsis",
+    "iter": "iter",
+    "with": "with",
+    "await": "await",
+}
+
+#: characters that may not directly follow a keyword, as for :py:class:`pyparsing.Keyword`
+IDENT_CHARS: FrozenSet[str] = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$"
+)
+
+_TOKENS = re.compile(
+    r"""
+    [ \t\n\r]*
+    (?:
+        (?P<SHORTHAND>async[ ](?:iter|with))(?![A-Za-z0-9_$])
+      | (?P<BYTES>b[ \t\n\r]*(?:"(?:[^"\n\r\\]|\\.)*"|'(?:[^'\n\r\\]|\\.)*'))
+      | (?P<WORD>[A-Za-z]+)
+      | (?P<INT>-?[0-9]+)
+      | (?P<STRING>"(?:[^"\n\r\\]|\\.)*"|'(?:[^'\n\r\\]|\\.)*')
+      | (?P<SYMBOL>->|\.\.\.|\*\*|[()\[\]{},:?/*._])
+      | (?P<END>\Z)
+    )
+    """,
+    re.VERBOSE,
+)
+
+
+def classify(string: str, start: int, end: int) -> str:
+    """Get the kind of the word at ``string[start:end]``"""
+    if string[end : end + 1] in IDENT_CHARS:
+        # keywords must not be directly followed by an identifier character
+        return "NAME"
+    return KEYWORDS.get(string[start:end], "NAME")
+
+
+def tokenize(string: str) -> Iterator[Token]:
+    """
+    Split ``string`` into tokens, ending with an ``"END"`` token
+
+    :raises ParseError: if ``string`` contains a character that starts no token
+    """
+    pos = 0
+    match = _TOKENS.match
+    while True:
+        token = match(string, pos)
+        if token is None:
+            pos = len(string) - len(string[pos:].lstrip(" \t\n\r"))
+            raise ParseError(f"Unexpected character {string[pos]!r}", string, pos)
+        group = cast(str, token.lastgroup)
+        start, pos = token.span(group)
+        value = token.group(group)
+        if group == "WORD":
+            yield Token(classify(string, start, pos), value, start, pos)
+        elif group == "SYMBOL" or group == "SHORTHAND":
+            if value == "_" and string[pos : pos + 1] in IDENT_CHARS:
+                raise ParseError("Unexpected character '_'", string, start)
+            yield Token(value, value, start, pos)
+        elif group == "END":
+            yield Token("END", value, start, pos)
+            return
+        else:
+            yield Token(group, value, start, pos)
@@ -0,0 +1,120 @@
+"""
+Limits on the resources used for parsing untrusted strings
+
+Parsing costs grow with the length and nesting of a string; for the backtracking
+``"pyparsing"`` engine, nested brackets and unions may even cost exponential time.
+:py:func:`~stenotype.backend.grammar.set_limits` configures :py:class:`~.Limits`
+for all parsers, and strings that exceed them fail with a
+:py:exc:`~stenotype.util.LimitExceeded` error:
+
+* the length and nesting depth of a string are checked before parsing it,
+* the steps and time of parsing are counted while parsing, and parsing is aborted
+  when either budget is spent. A step is a rule attempted by the ``"pyparsing"``
+  engine, or a token consumed by the ``"descent"`` engines.
+
+No limits are set by default, and checks are skipped entirely while they are unset.
+"""
+import threading
+import time
+from typing import Iterator, NamedTuple, Optional
+
+from .lexer import Token, tokenize
+from ..util import LimitExceeded
+
+
+__all__ = ["Limits", "Budget", "check", "nesting_depth", "current_budget"]
+
+
+class Limits(NamedTuple):
+    """Limits for parsing a single string, each of which may be :py:data:`None`"""
+
+    #: maximum number of characters
+    max_length: Optional[int] = None
+    #: maximum nesting of brackets and prefixes such as ``?`` and ``iter``
+    max_depth: Optional[int] = None
+    #: maximum number of parser steps
+    max_steps: Optional[int] = None
+    #: maximum wall time in seconds
+    max_seconds: Optional[float] = None
+
+
+#: tokens that nest the following tokens one level deeper
+_OPEN = {"(", "[", "{"}
+_CLOSE = {")", "]", "}"}
+_PREFIXES = {"?", "iter", "with", "await", "async iter", "async with"}
+
+
+def nesting_depth(string: str) -> int:
+    """Compute the maximum nesting of brackets and prefixes of ``string``"""
+    depth, prefixes, deepest = 0, 0, 0
+    for token in tokenize(string):
+        kind = token.kind
+        if kind in _PREFIXES:
+            # prefixes apply until the end of their operand
+            prefixes += 1
+            deepest = max(deepest, depth + prefixes)
+            continue
+        if kind in _OPEN:
+            depth += 1
+            deepest = max(deepest, depth + prefixes)
+        elif kind in _CLOSE:
+            depth -= 1
+        prefixes = 0
+    return deepest
+
+
+def check(string: str, limits: Limits) -> None:
+    """Check the length and depth of ``string`` against ``limits``"""
+    if limits.max_length is not None and len(string) > limits.max_length:
+        raise LimitExceeded("maximum length", limits.max_length, string)
+    if limits.max_depth is not None and nesting_depth(string) > limits.max_depth:
+        raise LimitExceeded("maximum depth", limits.max_depth, string)
+
+
+class Budget:
+    """Steps and time remaining for parsing ``string``"""
+
+    __slots__ = ("string", "steps", "max_steps", "max_seconds", "deadline")
+
+    def __init__(self, string: str, limits: Limits):
+        self.string = string
+        self.steps = 0
+        self.max_steps = limits.max_steps
+        self.max_seconds = 0.0
+        self.deadline: Optional[float] = None
+        if limits.max_seconds is not None:
+            self.max_seconds = limits.max_seconds
+            self.deadline = time.perf_counter() + limits.max_seconds
+
+    def spend(self) -> None:
+        """Spend a step, failing if the steps or time are used up"""
+        self.steps += 1
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise LimitExceeded("maximum steps", self.max_steps, self.string)
+        # checking the time is comparatively expensive
+        if self.deadline is not None and not self.steps & 63:
+            if time.perf_counter() > self.deadline:
+                raise LimitExceeded("maximum seconds", self.max_seconds, self.string)
+
+    def metered(self, tokens: Iterator[Token]) -> Iterator[Token]:
+        """Spend a step for each of the ``tokens``"""
+        for token in tokens:
+            self.spend()
+            yield token
+
+
+class _Current(threading.local):
+    budget: Optional[Budget] = None
+
+
+_CURRENT = _Current()
+
+
+def current_budget() -> Optional[Budget]:
+    """Get the budget of the string parsed by the current thread, if any"""
+    return _CURRENT.budget
+
+
+def set_budget(budget: Optional[Budget]) -> None:
+    """Set the budget of the string parsed by the current thread"""
+    _CURRENT.budget = budget
@@ -0,0 +1,232 @@
+"""
+Parallel conversion of many strings using a pool of worker processes
+
+Parsing is CPU bound, so a single process is limited to a single core.
+The workers of a :py:class:`~.ProcessConverter` each prepare the backend once
+when they start, and then convert chunks of strings via
+:py:func:`~stenotype.backend.pipeline.convert_many`.
+"""
+import functools
+import itertools
+import multiprocessing
+import queue
+from collections import deque
+from typing import (
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from . import grammar
+from .limits import Limits
+from .pipeline import convert_many, shorten_many
+
+
+__all__ = ["ProcessConverter", "convert_parallel", "shorten_parallel"]
+
+
+Outcome = Tuple[str, Union[str, Exception]]
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _initialize(engine: str, limits: Optional[Limits] = None) -> None:
+    """Prepare a worker process for conversion"""
+    grammar.DEFAULT_ENGINE = engine
+    if limits is not None:
+        grammar.set_limits(*limits)
+    # parse once, so that any lazily prepared state is not prepared per task
+    grammar.parse.__wrapped__("_")
+
+
+def _convert_chunk(chunk: List[str]) -> List[Outcome]:
+    return list(convert_many(chunk))
+
+
+def _shorten_chunk(chunk: List[str]) -> List[Outcome]:
+    return list(shorten_many(chunk))
+
+
+def _map_chunk(function: Callable[[T], R], chunk: List[T]) -> List[R]:
+    return [function(item) for item in chunk]
+
+
+def _chunked(items: Iterable[T], chunksize: int) -> Iterator[List[T]]:
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ProcessConverter:
+    """
+    Pool of worker processes to convert stenotype strings
+
+    :param jobs: number of worker processes, defaults to the number of CPUs
+    :param chunksize: number of strings sent to a worker at once
+    :param engine: parser engine of the workers, see :py:func:`~.grammar.parse`
+
+    The workers use the limits of :py:func:`~.grammar.set_limits` that are set when
+    the pool is created.
+
+    The pool should be used as a context manager, which shuts down the workers
+    when done. Each pool may be used for any number of conversions:
+
+    .. code:: python
+
+        with ProcessConverter(jobs=4) as converter:
+            for steno, typing in converter.convert_many(annotations):
+                ...
+    """
+
+    def __init__(
+        self,
+        jobs: Optional[int] = None,
+        chunksize: int = 256,
+        engine: Optional[str] = None,
+    ):
+        engine = engine or grammar.DEFAULT_ENGINE
+        if engine not in grammar.ENGINES:
+            raise ValueError(f"Unknown parser engine {engine!r}")
+        self.jobs = jobs or multiprocessing.cpu_count()
+        self.chunksize = chunksize
+        self._pool = multiprocessing.Pool(
+            self.jobs, initializer=_initialize, initargs=(engine, grammar.LIMITS)
+        )
+
+    def convert_many(
+        self, steno_strings: Iterable[str], ordered: bool = True
+    ) -> Iterator[Outcome]:
+        """
+        Lazily convert many strings, pairing each input with its typing string or error
+
+        :param steno_strings: any iterable of strings, which is consumed lazily
+        :param ordered: whether to produce results in the order of inputs,
+            or as soon as they are available
+
+        Invalid inputs are handled as by
+        :py:func:`~stenotype.backend.pipeline.convert_many`. Only a few chunks per
+        worker are in flight at any time, so unbounded inputs do not grow memory.
+        """
+        return self._dispatch(_convert_chunk, steno_strings, ordered)
+
+    def shorten_many(
+        self, typing_strings: Iterable[str], ordered: bool = True
+    ) -> Iterator[Outcome]:
+        """
+        Lazily shorten many strings, pairing each input with its stenotype string or error
+
+        See :py:meth:`~.convert_many` for the parameters and the handling of inputs.
+        """
+        return self._dispatch(_shorten_chunk, typing_strings, ordered)
+
+    def map(
+        self, function: Callable[[T], R], items: Iterable[T], ordered: bool = True
+    ) -> Iterator[R]:
+        """
+        Lazily apply ``function`` to each of ``items`` in the worker processes
+
+        :param function: a function that can be pickled, such as a module function
+        :param items: any iterable of items that can be pickled
+        :param ordered: whether to produce results in the order of items,
+            or as soon as they are available
+
+        Unlike :py:meth:`~.convert_many`, exceptions are not paired with their item
+        but raised, aborting the iteration.
+        """
+        return self._dispatch(functools.partial(_map_chunk, function), items, ordered)
+
+    def _dispatch(
+        self, task: Callable[[List[T]], List[R]], items: Iterable[T], ordered: bool,
+    ) -> Iterator[R]:
+        chunks = _chunked(items, self.chunksize)
+        if ordered:
+            return self._ordered(task, chunks, 2 * self.jobs)
+        return self._unordered(task, chunks, 2 * self.jobs)
+
+    def _ordered(
+        self, task: Callable[[List[T]], List[R]], chunks: Iterator[List[T]], limit: int
+    ) -> Iterator[R]:
+        pending: Deque[multiprocessing.pool.AsyncResult] = deque()
+        for chunk in chunks:
+            pending.append(self._pool.apply_async(task, (chunk,)))
+            if len(pending) >= limit:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+    def _unordered(
+        self, task: Callable[[List[T]], List[R]], chunks: Iterator[List[T]], limit: int
+    ) -> Iterator[R]:
+        done: "queue.Queue[Union[List[R], BaseException]]" = queue.Queue()
+
+        def completed() -> List[R]:
+            outcomes = done.get()
+            if isinstance(outcomes, BaseException):
+                raise outcomes
+            return outcomes
+
+        in_flight = 0
+        for chunk in chunks:
+            self._pool.apply_async(
+                task, (chunk,), callback=done.put, error_callback=done.put
+            )
+            in_flight += 1
+            if in_flight >= limit:
+                in_flight -= 1
+                yield from completed()
+        for _ in range(in_flight):
+            yield from completed()
+
+    def close(self) -> None:
+        """Shut down all worker processes"""
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self) -> "ProcessConverter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def convert_parallel(
+    steno_strings: Iterable[str],
+    jobs: Optional[int] = None,
+    chunksize: int = 256,
+    ordered: bool = True,
+    engine: Optional[str] = None,
+) -> Iterator[Outcome]:
+    """
+    Lazily convert many strings using a temporary :py:class:`~.ProcessConverter`
+
+    See :py:class:`~.ProcessConverter` and :py:meth:`~.ProcessConverter.convert_many`
+    for the parameters.
+    """
+    with ProcessConverter(jobs=jobs, chunksize=chunksize, engine=engine) as converter:
+        yield from converter.convert_many(steno_strings, ordered=ordered)
+
+
+def shorten_parallel(
+    typing_strings: Iterable[str],
+    jobs: Optional[int] = None,
+    chunksize: int = 256,
+    ordered: bool = True,
+    engine: Optional[str] = None,
+) -> Iterator[Outcome]:
+    """
+    Lazily shorten many strings using a temporary :py:class:`~.ProcessConverter`
+
+    See :py:class:`~.ProcessConverter` and :py:meth:`~.ProcessConverter.shorten_many`
+    for the parameters.
+    """
+    with ProcessConverter(jobs=jobs, chunksize=chunksize, engine=engine) as converter:
+        yield from converter.shorten_many(typing_strings, ordered=ordered)
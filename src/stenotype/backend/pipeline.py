@@ -0,0 +1,108 @@
+"""
+Pipelines chaining the individual passes of the :py:mod:`~stenotype.backend`
+"""
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, Optional, Tuple, TypeVar, Union
+
+from . import elements as ste
+from .cache import bounded_cache
+from .compiler import to_typing
+from .grammar import parse, _engine_key
+from .reverse import denormalize
+from .steno import unparse
+from ..util import StenotypeException
+
+
+__all__ = ["convert", "shorten", "parse_many", "convert_many", "shorten_many", "ERRORS"]
+
+
+R = TypeVar("R")
+
+#: errors that mark an input as invalid, instead of a failure of the pipeline itself
+ERRORS = (StenotypeException, ValueError, NotImplementedError, RecursionError)
+
+
+@bounded_cache(maxsize=4096, maxbytes=4 * 1024 * 1024, key=_engine_key)
+def convert(steno_string: str, engine: Optional[str] = None) -> str:
+    """
+    Convert a stenotype or typing string to the equivalent typing string
+
+    This is the full ``parse``, ``normalize`` and ``unparse`` pipeline,
+    using the parser ``engine`` as for :py:func:`~.grammar.parse`; the last two
+    passes are done at once by :py:func:`~.compiler.to_typing`.
+    Results are memoized in a bounded cache, which can be inspected via
+    ``convert.cache_info()`` and reset via ``convert.cache_clear()``.
+    """
+    return to_typing(parse(steno_string, engine))
+
+
+@bounded_cache(maxsize=4096, maxbytes=4 * 1024 * 1024, key=_engine_key)
+def shorten(typing_string: str, engine: Optional[str] = None) -> str:
+    """
+    Convert a typing or stenotype string to the equivalent stenotype string
+
+    This is the inverse of :py:func:`~.convert`, chaining the ``parse``,
+    :py:func:`~.reverse.denormalize` and ``unparse`` passes. Results are memoized
+    in a bounded cache like those of :py:func:`~.convert`.
+    """
+    return unparse(denormalize(parse(typing_string, engine)))
+
+
+def _map_many(
+    function: Callable[[str], R], steno_strings: Iterable[str], window: int
+) -> Iterator[Tuple[str, Union[R, Exception]]]:
+    """Apply ``function`` to each string, reusing the last ``window`` outcomes"""
+    recent: "OrderedDict[str, Union[R, Exception]]" = OrderedDict()
+    for steno_string in steno_strings:
+        try:
+            outcome = recent[steno_string]
+        except KeyError:
+            try:
+                outcome = function(steno_string)
+            except ERRORS as err:
+                outcome = err
+            recent[steno_string] = outcome
+            if len(recent) > window:
+                recent.popitem(last=False)
+        else:
+            recent.move_to_end(steno_string)
+        yield steno_string, outcome
+
+
+def parse_many(
+    steno_strings: Iterable[str], engine: Optional[str] = None, window: int = 1024
+) -> Iterator[Tuple[str, Union[ste.Steno, Exception]]]:
+    """
+    Lazily parse many strings, pairing each input with its element or error
+
+    :param steno_strings: any iterable of strings, which is consumed lazily
+    :param engine: name of the parser engine, see :py:func:`~.grammar.parse`
+    :param window: number of recent distinct inputs whose outcome is reused
+
+    Results are produced in the order of inputs. Invalid inputs do not abort the
+    batch; their exception is paired with the input instead of a result.
+    Repeated inputs share the same result or exception object.
+    """
+    return _map_many(lambda string: parse(string, engine), steno_strings, window)
+
+
+def convert_many(
+    steno_strings: Iterable[str], engine: Optional[str] = None, window: int = 1024
+) -> Iterator[Tuple[str, Union[str, Exception]]]:
+    """
+    Lazily convert many strings, pairing each input with its typing string or error
+
+    See :py:func:`~.parse_many` for the parameters and the handling of inputs and errors.
+    """
+    return _map_many(lambda string: convert(string, engine), steno_strings, window)
+
+
+def shorten_many(
+    typing_strings: Iterable[str], engine: Optional[str] = None, window: int = 1024
+) -> Iterator[Tuple[str, Union[str, Exception]]]:
+    """
+    Lazily shorten many strings, pairing each input with its stenotype string or error
+
+    See :py:func:`~.parse_many` for the parameters and the handling of inputs and errors.
+    """
+    return _map_many(lambda string: shorten(string, engine), typing_strings, window)
@@ -0,0 +1,114 @@
+"""
+Profile the rules of the :py:mod:`pyparsing` grammar while parsing
+
+When an expression is slow to parse, the profile of each rule of
+:py:mod:`~stenotype.backend.rules` tells where the time goes, for example into the
+retries of ``UNION`` or the alternatives of ``SIGNATURE``:
+
+.. code:: python
+
+    profile = grammar.enable_profile()
+    grammar.parse("(a: A, *, b: B) -> ?[R]")
+    grammar.disable_profile()
+    print(profile.table())
+
+Rules are named as in :py:mod:`~stenotype.backend.rules`. The time of a rule includes
+the time of the rules it tries, and a rule that recursively tries itself, such as
+``TYPE``, is timed only once. Rules are wrapped only while profiling, so disabled
+profiling costs nothing. Profiles are not meant to be shared by several threads.
+"""
+import json
+from typing import Dict, Iterator, Tuple
+
+__all__ = ["RuleStats", "RuleProfile", "rule_names"]
+
+
+class RuleStats:
+    """Attempts, successes, failures and cumulative seconds of a single rule"""
+
+    __slots__ = ("attempts", "successes", "failures", "seconds", "active")
+
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.seconds = 0.0
+        #: number of attempts in progress, which are nested for recursive rules
+        self.active = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "failures": self.failures,
+            "seconds": self.seconds,
+        }
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(attempts={self.attempts},"
+            f" successes={self.successes}, failures={self.failures},"
+            f" seconds={self.seconds:.6f})"
+        )
+
+
+class RuleProfile:
+    """Statistics of the grammar rules, by the name of each rule"""
+
+    def __init__(self):
+        self.stats: Dict[str, RuleStats] = {}
+
+    def __getitem__(self, name: str) -> RuleStats:
+        try:
+            return self.stats[name]
+        except KeyError:
+            stats = self.stats[name] = RuleStats()
+            return stats
+
+    def sorted(self) -> Iterator[Tuple[str, RuleStats]]:
+        """Iterate over the rules that were attempted, the most expensive first"""
+        attempted = (item for item in self.stats.items() if item[1].attempts)
+        yield from sorted(
+            attempted, key=lambda item: (-item[1].seconds, -item[1].attempts, item[0])
+        )
+
+    def table(self) -> str:
+        """Format the statistics as a table of the rules, the most expensive first"""
+        rows = [("rule", "attempts", "successes", "failures", "seconds")]
+        for name, stats in self.sorted():
+            rows.append(
+                (
+                    name,
+                    str(stats.attempts),
+                    str(stats.successes),
+                    str(stats.failures),
+                    f"{stats.seconds:.6f}",
+                )
+            )
+        width = max(len(row[0]) for row in rows)
+        return "\n".join(
+            row[0].ljust(width) + "".join(cell.rjust(11) for cell in row[1:])
+            for row in rows
+        )
+
+    def to_json(self) -> str:
+        """Format the statistics as a JSON object, the most expensive rule first"""
+        return json.dumps({name: stats.as_dict() for name, stats in self.sorted()})
+
+    def clear(self) -> None:
+        """Reset the statistics of all rules"""
+        for stats in self.stats.values():
+            stats.attempts = stats.successes = stats.failures = 0
+            stats.seconds = 0.0
+
+
+def rule_names() -> Dict[int, str]:
+    """Get the names of the rules in :py:mod:`~stenotype.backend.rules`, by their id"""
+    from pyparsing import ParserElement
+    from . import rules
+
+    return {
+        id(rule): name
+        for name, rule in vars(rules).items()
+        if isinstance(rule, ParserElement)
+    }
@@ -0,0 +1,269 @@
+"""
+Reverse of :py:func:`~stenotype.backend.typing.normalize`, from typing to stenotype
+
+:py:func:`~.denormalize` replaces the generics of :py:mod:`typing`, such as
+``typing.Optional[int]`` or ``List[int]``, with the equivalent stenotype elements,
+such as ``?int`` and ``[int]``. Generics are looked up by their base identifier in
+:py:data:`~.GENERICS`, both with and without the ``typing.`` prefix; generics that
+have no stenotype form, or the wrong number of parameters, are kept as they are. For
+example, ``typing.Tuple[int, ...]`` is shortened to ``(int, ...)``, while
+``typing.Literal[1, 2]`` is kept, since its values are converted back as they are.
+
+Some equivalent forms are merged into the shortest one, so converting the result
+back to typing may give a different but equivalent expression:
+
+* members ``None`` and ``Optional[T]`` of a union make the entire union optional,
+  as in ``Union[int, None]`` to ``?int``, and ``Optional[None]`` adds no member,
+* nested unions are flattened, and ``Optional`` of ``Optional`` is collapsed.
+
+Since ``?`` and shorthands apply to an entire union, shorthands are only used for the
+last member of a union. Signatures are never members of a union.
+"""
+from operator import attrgetter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple as TupleT, TypeVar
+
+from . import elements as ste
+from .dispatch import typedispatch
+from .typing import SHORTHAND as TYPING_SHORTHAND
+
+
+__all__ = ["denormalize", "GENERICS", "IDENTIFIERS"]
+
+
+@typedispatch
+def denormalize(element: ste.Steno) -> ste.Steno:
+    """Replace typing expressions by the equivalent stenotype expressions"""
+    raise NotImplementedError(
+        f"{element.__class__.__name__!r} cannot be represented as a stenotype yet"
+    )
+
+
+@denormalize.register(ste.Dots)
+@denormalize.register(ste.Any)
+@denormalize.register(ste.Literal)
+def denormalize_identity(element: ste.Steno) -> ste.Steno:
+    return element
+
+
+# Building Blocks
+# ===============
+
+
+def _optional(base: ste.Steno) -> ste.Optional:
+    return base if type(base) is ste.Optional else ste.Optional(base)
+
+
+def _as_callable(signature: ste.Signature) -> ste.Callable:
+    """Reverse a signature created from a ``typing.Callable``"""
+    if signature.args is not None:
+        return ste.Callable(positional=ste.Dots(), returns=signature.returns)
+    bases = tuple(parameter.base for parameter in signature.mixed)
+    return ste.Callable(positional=bases, returns=signature.returns)
+
+
+def _union(members: Sequence[ste.Steno]) -> ste.Steno:
+    flat: List[ste.Steno] = []
+    optional = False
+    for member in members:
+        if type(member) is ste.Optional:
+            optional, member = True, member.base
+        if type(member) is ste.Literal and member.value is None:
+            optional = True
+            continue
+        if type(member) is ste.Union:
+            flat.extend(member)
+        else:
+            flat.append(member)
+    if not flat:
+        return ste.Literal(None)
+    if len(flat) == 1:
+        union = flat[0]
+    else:
+        # shorthands would take all following members as their base
+        for index, member in enumerate(flat):
+            if type(member) is ste.Signature:
+                flat[index] = _as_callable(member)
+            elif type(member) in TYPING_SHORTHAND and index < len(flat) - 1:
+                flat[index] = ste.Generic(
+                    TYPING_SHORTHAND[type(member)], (member.base,)  # type: ignore
+                )
+        union = ste.Union(*flat)
+    return _optional(union) if optional else union
+
+
+def _unary(element: Callable[[ste.Steno], ste.Steno]) -> Callable:
+    def build(parameters: TupleT[ste.Steno, ...]) -> Optional[ste.Steno]:
+        return element(parameters[0]) if len(parameters) == 1 else None
+
+    return build
+
+
+def _dict(parameters: TupleT[ste.Steno, ...]) -> Optional[ste.Steno]:
+    return ste.Dict(*parameters) if len(parameters) == 2 else None
+
+
+def _tuple(parameters: TupleT[ste.Steno, ...]) -> Optional[ste.Steno]:
+    # ``...`` is only valid as the last element of a stenotype tuple
+    if not parameters or any(type(item) is ste.Dots for item in parameters[:-1]):
+        return None
+    if len(parameters) == 1 and type(parameters[0]) is ste.Dots:
+        return None
+    return ste.Tuple(parameters)
+
+
+def _literal(parameters: TupleT[ste.Steno, ...]) -> Optional[ste.Steno]:
+    # ``Literal[a, b]`` is not equal to ``Union[Literal[a], Literal[b]]`` at runtime
+    if len(parameters) != 1 or type(parameters[0]) is not ste.Literal:
+        return None
+    return parameters[0]
+
+
+V = TypeVar("V")
+
+
+def _prefixed(table: Dict[str, V]) -> Dict[ste.Identifier, V]:
+    """Key ``table`` by both the plain and ``typing.`` prefixed identifiers"""
+    prefixed = {}
+    for name, value in table.items():
+        prefixed[ste.Identifier(name)] = value
+        prefixed[ste.Identifier("typing", name)] = value
+    return prefixed
+
+
+#: stenotype elements replacing plain identifiers
+IDENTIFIERS: Dict[ste.Identifier, ste.Steno] = _prefixed({"Any": ste.Any()})
+
+#: builders of stenotype elements from the parameters of generics, keyed by their base;
+#: a builder returns :py:data:`None` if the parameters do not fit
+GENERICS: Dict[
+    ste.Identifier, Callable[[TupleT[ste.Steno, ...]], Optional[ste.Steno]]
+] = _prefixed(
+    {
+        "Optional": _unary(_optional),
+        "Union": lambda parameters: _union(parameters) if parameters else None,
+        "Tuple": _tuple,
+        "List": _unary(ste.List),
+        "Dict": _dict,
+        "Set": _unary(ste.Set),
+        "Literal": _literal,
+        "Iterable": _unary(ste.Iterable),
+        "ContextManager": _unary(ste.Context),
+        "Awaitable": _unary(ste.Awaitable),
+        "AsyncIterable": _unary(ste.AsyncIterable),
+        "AsyncContextManager": _unary(ste.AsyncContext),
+    }
+)
+
+
+# typing expressions
+# ==================
+
+
+@denormalize.register(ste.Identifier)
+def denormalize_identifier(element: ste.Identifier) -> ste.Steno:
+    return IDENTIFIERS.get(element, element)
+
+
+@denormalize.register_fold(ste.Generic, attrgetter("parameters"))
+def denormalize_generic(element: ste.Generic, parameters: List) -> ste.Steno:
+    build = GENERICS.get(element.base)
+    shortened = build(tuple(parameters)) if build is not None else None
+    if shortened is None:
+        return ste.Generic(base=element.base, parameters=tuple(parameters))
+    return shortened
+
+
+def _callable_children(element: ste.Callable) -> TupleT[ste.Steno, ...]:
+    if isinstance(element.positional, ste.Dots):
+        return (element.returns,)
+    return (*element.positional, element.returns)
+
+
+@denormalize.register_fold(ste.Callable, _callable_children)
+def denormalize_callable(element: ste.Callable, children: List) -> ste.Signature:
+    if isinstance(element.positional, ste.Dots):
+        args: Optional[ste.Parameter] = ste.Parameter(name=None, base=ste.Any())
+        mixed: TupleT[ste.Parameter, ...] = ()
+    else:
+        args = None
+        mixed = tuple(ste.Parameter(name=None, base=base) for base in children[:-1])
+    return ste.Signature(
+        positional=(),
+        mixed=mixed,
+        args=args,
+        keywords=(),
+        kwargs=None,
+        returns=children[-1],
+    )
+
+
+# stenotype expressions
+# =====================
+#
+# Stenotype elements are kept, but their children may be typing expressions.
+
+
+def _base(element) -> TupleT[ste.Steno]:
+    return (element.base,)
+
+
+@denormalize.register_fold(ste.Optional, _base)
+def denormalize_optional(element: ste.Optional, children: List) -> ste.Steno:
+    return _optional(children[0])
+
+
+@denormalize.register_fold(ste.Union, tuple)
+def denormalize_union(element: ste.Union, members: List) -> ste.Steno:
+    return _union(members)
+
+
+@denormalize.register_fold(ste.Tuple, attrgetter("elements"))
+def denormalize_tuple(element: ste.Tuple, elements: List) -> ste.Tuple:
+    return ste.Tuple(tuple(elements))
+
+
+@denormalize.register_fold(ste.List, lambda element: (element.values,))
+@denormalize.register_fold(ste.Set, lambda element: (element.values,))
+@denormalize.register_fold(ste.Iterable, _base)
+@denormalize.register_fold(ste.Context, _base)
+@denormalize.register_fold(ste.Awaitable, _base)
+@denormalize.register_fold(ste.AsyncIterable, _base)
+@denormalize.register_fold(ste.AsyncContext, _base)
+def denormalize_unary(element: ste.Steno, children: List) -> ste.Steno:
+    return element.__class__(children[0])  # type: ignore
+
+
+@denormalize.register_fold(ste.Dict, lambda element: (element.keys, element.values))
+def denormalize_dict(element: ste.Dict, children: List) -> ste.Dict:
+    return ste.Dict(*children)
+
+
+def _parameters(element: ste.Signature) -> List[ste.Parameter]:
+    return [
+        *element.positional,
+        *element.mixed,
+        *([element.args] if element.args is not None else []),
+        *element.keywords,
+        *([element.kwargs] if element.kwargs is not None else []),
+    ]
+
+
+def _signature_children(element: ste.Signature) -> TupleT[ste.Steno, ...]:
+    return (*(parameter.base for parameter in _parameters(element)), element.returns)
+
+
+@denormalize.register_fold(ste.Signature, _signature_children)
+def denormalize_signature(element: ste.Signature, children: List) -> ste.Signature:
+    bases = iter(children)
+
+    def replace(parameters: TupleT[ste.Parameter, ...]) -> TupleT[ste.Parameter, ...]:
+        return tuple(parameter._replace(base=next(bases)) for parameter in parameters)
+
+    return ste.Signature(
+        positional=replace(element.positional),
+        mixed=replace(element.mixed),
+        args=replace((element.args,))[0] if element.args is not None else None,
+        keywords=replace(element.keywords),
+        kwargs=replace((element.kwargs,))[0] if element.kwargs is not None else None,
+        returns=next(bases),
+    )
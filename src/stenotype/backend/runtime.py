@@ -0,0 +1,185 @@
+"""
+Evaluation of :py:mod:`~stenotype.backend.elements` to runtime :py:mod:`typing` objects
+
+Validation frameworks need the actual ``typing.List[int]`` instead of the string
+``"typing.List[int]"``. Instead of unparsing an element and calling :py:func:`eval`
+on the result, :py:func:`~.to_runtime` builds the typing objects directly from the
+elements. This is faster, and never executes any code contained in a string:
+
+.. code:: python
+
+    >>> to_runtime(parse("?[int] or {str: _}"))
+    typing.Union[typing.List[int], typing.Dict[str, typing.Any], NoneType]
+
+Identifiers are resolved in a namespace, such as the globals of a module, then in
+:py:mod:`builtins`, and then in the modules that are already imported, such as
+``typing`` for ``typing.List``. No modules are imported while resolving.
+A :py:class:`~.Resolver` caches the objects of identifiers and memoizes the typing
+objects it builds, so that repeated sub-trees such as ``typing.Optional[str]`` are
+built only once.
+"""
+import ast
+import builtins
+import sys
+import threading
+import typing
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Any, Hashable, List, Mapping, Optional, Tuple as TupleT
+
+from . import elements as ste
+from .cache import LRUCache
+from .dispatch import TypeDispatcher
+from .typing import normalize
+
+
+__all__ = ["Resolver", "to_runtime"]
+
+
+def _unsupported(element: ste.Steno) -> Any:
+    raise NotImplementedError(
+        f"{element.__class__.__name__!r} cannot be represented at runtime yet"
+    )
+
+
+def _literal_value(element: ste.Literal) -> Any:
+    """Get the value of a literal, of which strings and bytes are kept as source"""
+    if isinstance(element.value, str):
+        return ast.literal_eval(element.value)
+    return element.value
+
+
+def _callable_children(element: ste.Callable) -> TupleT[ste.Steno, ...]:
+    if isinstance(element.positional, ste.Dots):
+        return (element.returns,)
+    return (*element.positional, element.returns)
+
+
+class Resolver:
+    """
+    Builder of runtime typing objects, resolving identifiers in ``namespace``
+
+    :param namespace: names to resolve first, such as the ``__dict__`` of a module
+    :param maxsize: maximum number of memoized typing objects
+
+    Objects of identifiers are cached on first use, so the namespace should not
+    rebind names once they are resolved. Identifiers that cannot be resolved raise
+    a :py:exc:`NameError`, and are not cached.
+    """
+
+    def __init__(
+        self, namespace: Optional[Mapping[str, Any]] = None, maxsize: int = 4096
+    ):
+        self.namespace: Mapping[str, Any] = namespace if namespace is not None else {}
+        self._identifiers = LRUCache(maxsize=maxsize)
+        self._objects = LRUCache(maxsize=maxsize)
+        self._build: TypeDispatcher[Any] = TypeDispatcher(_unsupported)
+        self._build.register(ste.Dots, lambda element: Ellipsis)
+        self._build.register(ste.Identifier, self.resolve)
+        # literals only appear as parameters in normalized trees
+        self._build.register(ste.Literal, _literal_value)
+        self._build.register_fold(
+            ste.Generic, attrgetter("parameters"), self._build_generic
+        )
+        self._build.register_fold(
+            ste.Callable, _callable_children, self._build_callable
+        )
+
+    def __call__(self, element: ste.Steno) -> Any:
+        """Build the typing object of ``element``"""
+        return self._build(normalize(element))
+
+    def resolve(self, identifier: ste.Identifier) -> Any:
+        """Get the object named by ``identifier``"""
+        obj = self._identifiers.get(identifier, self)
+        if obj is self:
+            obj = self._lookup(identifier)
+            self._identifiers.put(identifier, obj)
+        return obj
+
+    def _lookup(self, identifier: ste.Identifier) -> Any:
+        head, *tail = identifier
+        if head in self.namespace:
+            obj = self.namespace[head]
+        elif hasattr(builtins, head):
+            obj = getattr(builtins, head)
+        elif head in sys.modules:
+            obj = sys.modules[head]
+        else:
+            raise NameError(f"name {'.'.join(identifier)!r} is not defined")
+        for name in tail:
+            try:
+                obj = getattr(obj, name)
+            except AttributeError:
+                raise NameError(f"name {'.'.join(identifier)!r} is not defined")
+        return obj
+
+    def _memoized(self, key: Hashable, build: typing.Callable[[], Any]) -> Any:
+        try:
+            obj = self._objects.get(key, self)
+        except TypeError:
+            # some objects of a namespace may not be hashable
+            return build()
+        if obj is self:
+            obj = build()
+            self._objects.put(key, obj)
+        return obj
+
+    def _build_generic(self, element: ste.Generic, parameters: List) -> Any:
+        base = self.resolve(element.base)
+        # bool and int literals are equal, but their typing objects are not
+        key = (ste.Generic, base, *((type(param), param) for param in parameters))
+        if len(parameters) == 1:
+            return self._memoized(key, lambda: base[parameters[0]])
+        return self._memoized(key, lambda: base[tuple(parameters)])
+
+    def _build_callable(self, element: ste.Callable, children: List) -> Any:
+        if isinstance(element.positional, ste.Dots):
+            key: tuple = (ste.Callable, Ellipsis, children[-1])
+            return self._memoized(key, lambda: typing.Callable[..., children[-1]])
+        key = (ste.Callable, tuple(children[:-1]), children[-1])
+        return self._memoized(
+            key, lambda: typing.Callable[list(children[:-1]), children[-1]]
+        )
+
+
+#: resolver for elements without a namespace
+_RESOLVER = Resolver()
+#: resolvers of recently used namespaces, by the identity of the namespace
+_RESOLVERS: "OrderedDict[int, TupleT[Mapping[str, Any], Resolver]]" = OrderedDict()
+_RESOLVERS_SIZE = 64
+_RESOLVERS_LOCK = threading.Lock()
+
+
+def _resolver(namespace: Mapping[str, Any]) -> Resolver:
+    key = id(namespace)
+    with _RESOLVERS_LOCK:
+        try:
+            # the entry holds the namespace, so its id cannot be reused meanwhile
+            _, resolver = _RESOLVERS[key]
+        except KeyError:
+            resolver = Resolver(namespace)
+            _RESOLVERS[key] = namespace, resolver
+            if len(_RESOLVERS) > _RESOLVERS_SIZE:
+                _RESOLVERS.popitem(last=False)
+        else:
+            _RESOLVERS.move_to_end(key)
+        return resolver
+
+
+def to_runtime(
+    element: ste.Steno, namespace: Optional[Mapping[str, Any]] = None
+) -> Any:
+    """
+    Build the typing object of ``element``, resolving identifiers in ``namespace``
+
+    :param element: the element to build, which is normalized first
+    :param namespace: names to resolve first, such as the ``__dict__`` of a module
+    :raises NameError: if an identifier cannot be resolved
+
+    The :py:class:`~.Resolver` of each of the 64 most recently used namespaces is
+    kept, so that repeated calls with the same namespace share its caches.
+    """
+    if namespace is None:
+        return _RESOLVER(element)
+    return _resolver(namespace)(element)
@@ -1,10 +1,11 @@
-from functools import singledispatch
-from typing import Union
+from operator import attrgetter
+from typing import List, Tuple as TupleT, Union
 
 from . import elements as ste
+from .dispatch import typedispatch
 
 
-@singledispatch
+@typedispatch
 def unparse(element: ste.Steno) -> str:
     """Unparse element representation to a stenotype string"""
     raise NotImplementedError(
@@ -12,6 +13,11 @@ def unparse(element: ste.Steno) -> str:
     )
 
 
+def _base(element) -> TupleT[ste.Steno]:
+    """Children of an element with a single ``base``, for folds of the dispatcher"""
+    return (element.base,)
+
+
 @unparse.register(ste.Dots)
 def unparse_dots(element: ste.Dots) -> str:
     return "..."
@@ -26,21 +32,23 @@ def unparse_identifier(element: ste.Identifier) -> str:
     return ".".join(element)
 
 
-@unparse.register(ste.Generic)
-def unparse_generic(element: ste.Generic) -> str:
-    return f'{unparse(element.base)}[{", ".join(map(unparse, element.parameters))}]'
+@unparse.register_fold(ste.Generic, attrgetter("parameters"))
+def unparse_generic(element: ste.Generic, parameters: List[str]) -> str:
+    return f'{unparse(element.base)}[{", ".join(parameters)}]'
 
 
-@unparse.register(ste.Callable)
-def unparse_callable(element: ste.Callable) -> str:
+def _callable_children(element: ste.Callable) -> TupleT[ste.Steno, ...]:
+    if isinstance(element.positional, ste.Dots):
+        return (element.returns,)
+    return (*element.positional, element.returns)
+
+
+@unparse.register_fold(ste.Callable, _callable_children)
+def unparse_callable(element: ste.Callable, children: List[str]) -> str:
     base = ste.Identifier("typing", "Callable")
     if isinstance(element.positional, ste.Dots):
-        return f"{unparse(base)}[..., {unparse(element.returns)}]"
-    return (
-        f"{unparse(base)}["
-        + f'[{", ".join(map(unparse, element.positional))}]'
-        + f", {unparse(element.returns)}]"
-    )
+        return f"{unparse(base)}[..., {children[-1]}]"
+    return f'{unparse(base)}[[{", ".join(children[:-1])}], {children[-1]}]'
 
 
 # stenotype expressions
@@ -55,38 +63,38 @@ def unparse_any(element: ste.Any) -> str:
     return "_"
 
 
-@unparse.register(ste.Optional)
-def unparse_optional(element: ste.Optional) -> str:
-    return "?" + unparse(element.base)
+@unparse.register_fold(ste.Optional, _base)
+def unparse_optional(element: ste.Optional, children: List[str]) -> str:
+    return "?" + children[0]
 
 
-@unparse.register(ste.Union)
-def unparse_union(element: ste.Union) -> str:
-    return " or ".join(map(unparse, element))
+@unparse.register_fold(ste.Union, tuple)
+def unparse_union(element: ste.Union, members: List[str]) -> str:
+    return " or ".join(members)
 
 
 # Containers
 # ----------
 
 
-@unparse.register(ste.Tuple)
-def unparse_tuple(element: ste.Tuple) -> str:
-    return f'({", ".join(map(unparse, element.elements))})'
+@unparse.register_fold(ste.Tuple, attrgetter("elements"))
+def unparse_tuple(element: ste.Tuple, elements: List[str]) -> str:
+    return f'({", ".join(elements)})'
 
 
-@unparse.register(ste.List)
-def unparse_list(element: ste.List) -> str:
-    return f"[{unparse(element.values)}]"
+@unparse.register_fold(ste.List, lambda element: (element.values,))
+def unparse_list(element: ste.List, children: List[str]) -> str:
+    return f"[{children[0]}]"
 
 
-@unparse.register(ste.Dict)
-def unparse_dict(element: ste.Dict) -> str:
-    return f"{{{unparse(element.keys)}: {unparse(element.values)}}}"
+@unparse.register_fold(ste.Dict, lambda element: (element.keys, element.values))
+def unparse_dict(element: ste.Dict, children: List[str]) -> str:
+    return f"{{{children[0]}: {children[1]}}}"
 
 
-@unparse.register(ste.Set)
-def unparse_set(element: ste.Set) -> str:
-    return f"{{{unparse(element.values)}}}"
+@unparse.register_fold(ste.Set, lambda element: (element.values,))
+def unparse_set(element: ste.Set, children: List[str]) -> str:
+    return f"{{{children[0]}}}"
 
 
 # Literals
@@ -111,14 +119,60 @@ SHORTHAND = {
 }
 
 
-@unparse.register(ste.Iterable)
-@unparse.register(ste.Context)
-@unparse.register(ste.Awaitable)
-@unparse.register(ste.AsyncIterable)
-@unparse.register(ste.AsyncContext)
+@unparse.register_fold(ste.Iterable, _base)
+@unparse.register_fold(ste.Context, _base)
+@unparse.register_fold(ste.Awaitable, _base)
+@unparse.register_fold(ste.AsyncIterable, _base)
+@unparse.register_fold(ste.AsyncContext, _base)
 def unparse_shorthand(
     element: Union[
         ste.Iterable, ste.Context, ste.Awaitable, ste.AsyncIterable, ste.AsyncContext
-    ]
+    ],
+    children: List[str],
 ) -> str:
-    return f"{SHORTHAND[type(element)]} {unparse(element.base)}"
+    return f"{SHORTHAND[type(element)]} {children[0]}"
+
+
+# Callables
+# ---------
+
+
+def _parameters(element: ste.Signature) -> List[ste.Parameter]:
+    """All parameters of a signature, in order"""
+    return [
+        *element.positional,
+        *element.mixed,
+        *([element.args] if element.args is not None else []),
+        *element.keywords,
+        *([element.kwargs] if element.kwargs is not None else []),
+    ]
+
+
+def _signature_children(element: ste.Signature) -> TupleT[ste.Steno, ...]:
+    return (*(parameter.base for parameter in _parameters(element)), element.returns)
+
+
+@unparse.register_fold(ste.Signature, _signature_children)
+def unparse_signature(element: ste.Signature, children: List[str]) -> str:
+    bases = iter(children)
+
+    def items(parameters: TupleT[ste.Parameter, ...], prefix: str = "") -> List[str]:
+        return [
+            f"{prefix}{parameter.name}: {next(bases)}"
+            if parameter.name is not None
+            else f"{prefix}{next(bases)}"
+            for parameter in parameters
+        ]
+
+    parameters = items(element.positional)
+    if parameters:
+        parameters.append("/")
+    parameters += items(element.mixed)
+    if element.args is not None:
+        parameters += items((element.args,), "*")
+    elif element.keywords or element.kwargs is not None or not parameters:
+        parameters.append("*")
+    parameters += items(element.keywords)
+    if element.kwargs is not None:
+        parameters += items((element.kwargs,), "**")
+    return f"({', '.join(parameters)}) -> {next(bases)}"
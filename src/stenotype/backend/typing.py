@@ -1,12 +1,13 @@
-from functools import singledispatch
-from typing import Union, TypeVar
+from operator import attrgetter
+from typing import List, Tuple as TupleT, Union, TypeVar
 
 from . import elements as ste
+from .dispatch import typedispatch
 
 
-@singledispatch
+@typedispatch
 def normalize(
-    element: ste.Steno
+    element: ste.Steno,
 ) -> Union[ste.Dots, ste.Identifier, ste.Generic, ste.Callable]:
     """Normalize any element representation to the subset supported by typing"""
     raise NotImplementedError(
@@ -16,6 +17,26 @@ def normalize(
 
 ID = TypeVar("ID", ste.Dots, ste.Identifier)
 
+#: names of the :py:mod:`typing` module, shared by all normalized elements
+_TYPING = {
+    name: ste.Identifier("typing", name)
+    for name in (
+        "Any",
+        "AsyncContextManager",
+        "AsyncIterable",
+        "Awaitable",
+        "ContextManager",
+        "Dict",
+        "Iterable",
+        "List",
+        "Literal",
+        "Optional",
+        "Set",
+        "Tuple",
+        "Union",
+    )
+}
+
 
 @normalize.register(ste.Dots)
 @normalize.register(ste.Identifier)
@@ -25,22 +46,48 @@ def normalize_identity(element: ID) -> ID:
 
 # typing expressions
 # ==================
+#
+# Elements with children are registered as folds, which receive the normalized
+# children instead of normalizing them recursively; see :py:mod:`~.dispatch`.
 
 
-@normalize.register(ste.Generic)
-def normalize_generic(element: ste.Generic) -> ste.Generic:
-    return ste.Generic(
-        base=element.base, parameters=tuple(map(normalize, element.parameters))
-    )
+def _base(element) -> TupleT[ste.Steno]:
+    return (element.base,)
 
 
-@normalize.register(ste.Callable)
-def normalize_callable(element: ste.Callable) -> ste.Callable:
-    if isinstance(element.positional, ste.Dots):
+#: bases whose parameters are values, not types
+_LITERAL_BASES = {
+    ste.Identifier("Literal"),
+    _TYPING["Literal"],
+    ste.Identifier("typing_extensions", "Literal"),
+}
+
+
+def _generic_children(element: ste.Generic) -> TupleT[ste.Steno, ...]:
+    # the values of ``typing.Literal[1, 2]`` are already normalized
+    if element.base in _LITERAL_BASES:
+        return ()
+    return element.parameters
+
+
+@normalize.register_fold(ste.Generic, _generic_children)
+def normalize_generic(element: ste.Generic, parameters: List) -> ste.Generic:
+    if element.base in _LITERAL_BASES:
         return element
-    return ste.Callable(
-        positional=tuple(map(normalize, element.positional)), returns=element.returns
-    )
+    return ste.Generic(base=element.base, parameters=tuple(parameters))
+
+
+def _callable_children(element: ste.Callable) -> TupleT[ste.Steno, ...]:
+    if isinstance(element.positional, ste.Dots):
+        return (element.returns,)
+    return (*element.positional, element.returns)
+
+
+@normalize.register_fold(ste.Callable, _callable_children)
+def normalize_callable(element: ste.Callable, children: List) -> ste.Callable:
+    if isinstance(element.positional, ste.Dots):
+        return ste.Callable(positional=element.positional, returns=children[-1])
+    return ste.Callable(positional=tuple(children[:-1]), returns=children[-1])
 
 
 # stenotype expressions
@@ -52,56 +99,41 @@ def normalize_callable(element: ste.Callable) -> ste.Callable:
 
 @normalize.register(ste.Any)
 def normalize_any(element: ste.Any) -> ste.Identifier:
-    return ste.Identifier("typing", "Any")
+    return _TYPING["Any"]
 
 
-@normalize.register(ste.Optional)
-def normalize_optional(element: ste.Optional) -> ste.Generic:
-    return ste.Generic(
-        base=ste.Identifier("typing", "Optional"), parameters=(normalize(element.base),)
-    )
+@normalize.register_fold(ste.Optional, _base)
+def normalize_optional(element: ste.Optional, children: List) -> ste.Generic:
+    return ste.Generic(base=_TYPING["Optional"], parameters=tuple(children))
 
 
-@normalize.register(ste.Union)
-def normalize_union(element: ste.Union) -> ste.Generic:
-    return ste.Generic(
-        base=ste.Identifier("typing", "Union"),
-        parameters=tuple(map(normalize, element)),
-    )
+@normalize.register_fold(ste.Union, tuple)
+def normalize_union(element: ste.Union, members: List) -> ste.Generic:
+    return ste.Generic(base=_TYPING["Union"], parameters=tuple(members))
 
 
 # Containers
 # ----------
 
 
-@normalize.register(ste.Tuple)
-def normalize_tuple(element: ste.Tuple) -> ste.Generic:
-    return ste.Generic(
-        base=ste.Identifier("typing", "Tuple"),
-        parameters=tuple(map(normalize, element.elements)),
-    )
+@normalize.register_fold(ste.Tuple, attrgetter("elements"))
+def normalize_tuple(element: ste.Tuple, elements: List) -> ste.Generic:
+    return ste.Generic(base=_TYPING["Tuple"], parameters=tuple(elements))
 
 
-@normalize.register(ste.List)
-def normalize_list(element: ste.List) -> ste.Generic:
-    return ste.Generic(
-        base=ste.Identifier("typing", "List"), parameters=(normalize(element.values),)
-    )
+@normalize.register_fold(ste.List, lambda element: (element.values,))
+def normalize_list(element: ste.List, children: List) -> ste.Generic:
+    return ste.Generic(base=_TYPING["List"], parameters=tuple(children))
 
 
-@normalize.register(ste.Dict)
-def normalize_dict(element: ste.Dict) -> ste.Generic:
-    return ste.Generic(
-        base=ste.Identifier("typing", "Dict"),
-        parameters=(normalize(element.keys), normalize(element.values)),
-    )
+@normalize.register_fold(ste.Dict, lambda element: (element.keys, element.values))
+def normalize_dict(element: ste.Dict, children: List) -> ste.Generic:
+    return ste.Generic(base=_TYPING["Dict"], parameters=tuple(children))
 
 
-@normalize.register(ste.Set)
-def normalize_set(element: ste.Set) -> ste.Generic:
-    return ste.Generic(
-        base=ste.Identifier("typing", "Set"), parameters=(normalize(element.values),)
-    )
+@normalize.register_fold(ste.Set, lambda element: (element.values,))
+def normalize_set(element: ste.Set, children: List) -> ste.Generic:
+    return ste.Generic(base=_TYPING["Set"], parameters=tuple(children))
 
 
 # Literals
@@ -110,7 +142,7 @@ def normalize_set(element: ste.Set) -> ste.Generic:
 
 @normalize.register(ste.Literal)
 def normalize_literal(element: ste.Literal) -> ste.Generic:
-    return ste.Generic(base=ste.Identifier("typing", "Literal"), parameters=(element,))
+    return ste.Generic(base=_TYPING["Literal"], parameters=(element,))
 
 
 # Shorthands
@@ -118,40 +150,34 @@ def normalize_literal(element: ste.Literal) -> ste.Generic:
 
 
 SHORTHAND = {
-    ste.Iterable: ste.Identifier("typing", "Iterable"),
-    ste.Context: ste.Identifier("typing", "ContextManager"),
-    ste.Awaitable: ste.Identifier("typing", "Awaitable"),
-    ste.AsyncIterable: ste.Identifier("typing", "AsyncIterable"),
-    ste.AsyncContext: ste.Identifier("typing", "AsyncContextManager"),
+    ste.Iterable: _TYPING["Iterable"],
+    ste.Context: _TYPING["ContextManager"],
+    ste.Awaitable: _TYPING["Awaitable"],
+    ste.AsyncIterable: _TYPING["AsyncIterable"],
+    ste.AsyncContext: _TYPING["AsyncContextManager"],
 }
 
 
-@normalize.register(ste.Iterable)
-@normalize.register(ste.Context)
-@normalize.register(ste.Awaitable)
-@normalize.register(ste.AsyncIterable)
-@normalize.register(ste.AsyncContext)
+@normalize.register_fold(ste.Iterable, _base)
+@normalize.register_fold(ste.Context, _base)
+@normalize.register_fold(ste.Awaitable, _base)
+@normalize.register_fold(ste.AsyncIterable, _base)
+@normalize.register_fold(ste.AsyncContext, _base)
 def normalize_shorthand(
     element: Union[
         ste.Iterable, ste.Context, ste.Awaitable, ste.AsyncIterable, ste.AsyncContext
-    ]
+    ],
+    children: List,
 ) -> ste.Generic:
-    return ste.Generic(
-        base=SHORTHAND[type(element)], parameters=(normalize(element.base),)
-    )
+    return ste.Generic(base=SHORTHAND[type(element)], parameters=tuple(children))
 
 
 # Callables
 # ---------
 
 
-@normalize.register(ste.Signature)
-def normalize_signature(element: ste.Signature):
-    # TODO: declare a ``Protocol`` if ``Callable`` is not enough
-    return _normalize_callable(element)
-
-
-def _normalize_callable(element: ste.Signature) -> ste.Callable:
+def _signature_children(element: ste.Signature) -> TupleT[ste.Steno, ...]:
+    """Check that ``element`` fits ``typing.Callable`` before normalizing children"""
     if element.keywords or element.kwargs:
         raise ValueError("'typing.Callable' does not support keyword arguments")
     if element.args:
@@ -164,12 +190,16 @@ def _normalize_callable(element: ste.Signature) -> ste.Callable:
             raise ValueError(
                 "'typing.Callable' does not support explicit and variadic arguments"
             )
-        return ste.Callable(positional=ste.Dots(), returns=element.returns)
-    else:
-        # names of arguments may be relevant, do not discard
-        if any(arg.name is not None for arg in element.positional + element.mixed):
-            raise ValueError("'typing.Callable' does not support named arguments")
-        return ste.Callable(
-            positional=tuple(arg.base for arg in element.positional + element.mixed),
-            returns=element.returns,
-        )
+        return (element.returns,)
+    # names of arguments may be relevant, do not discard
+    if any(arg.name is not None for arg in element.positional + element.mixed):
+        raise ValueError("'typing.Callable' does not support named arguments")
+    return (*(arg.base for arg in element.positional + element.mixed), element.returns)
+
+
+@normalize.register_fold(ste.Signature, _signature_children)
+def normalize_signature(element: ste.Signature, children: List) -> ste.Callable:
+    # TODO: declare a ``Protocol`` if ``Callable`` is not enough
+    if element.args:
+        return ste.Callable(positional=ste.Dots(), returns=children[-1])
+    return ste.Callable(positional=tuple(children[:-1]), returns=children[-1])
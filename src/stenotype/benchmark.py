@@ -0,0 +1,259 @@
+"""Benchmark suite for the passes of the stenotype backend.
+
+Each construct of the grammar is measured on expressions that grow in width, such as
+unions with more members, and in depth, such as lists nested in lists. The ``parse``,
+``normalize`` and ``unparse`` passes are timed separately, bypassing any caches.
+
+Results are written as JSON, so that the results of two runs can be compared:
+
+.. code-block:: bash
+
+    stenotype-bench --output before.json
+    stenotype-bench --output after.json --baseline before.json
+"""
+import json
+import platform
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+import click
+
+from stenotype import __version__
+from stenotype.backend import grammar
+from stenotype.backend.steno import unparse
+from stenotype.backend.typing import normalize
+
+
+class Construct(NamedTuple):
+    """Templates to grow an expression of a grammar construct"""
+
+    #: create an expression from several distinct names
+    width: Optional[Callable[[List[str]], str]]
+    #: wrap an expression in another level of the construct
+    depth: Optional[Callable[[str], str]]
+
+
+#: constructs of :py:mod:`~stenotype.backend.grammar` and how they grow
+CONSTRUCTS: Dict[str, Construct] = {
+    "identifier": Construct(lambda names: ".".join(names), None),
+    "generic": Construct(
+        lambda names: f"Dict[{', '.join(names)}]", lambda inner: f"Dict[str, {inner}]"
+    ),
+    "union": Construct(
+        lambda names: " or ".join(names), lambda inner: f"int or [{inner}]"
+    ),
+    "optional": Construct(
+        lambda names: f"({', '.join('?' + name for name in names)})",
+        lambda inner: f"?[{inner}]",
+    ),
+    "tuple": Construct(
+        lambda names: f"({', '.join(names)})", lambda inner: f"({inner}, int)"
+    ),
+    "list": Construct(None, lambda inner: f"[{inner}]"),
+    "dict": Construct(None, lambda inner: f"{{str: {inner}}}"),
+    "set": Construct(None, lambda inner: f"{{{inner}}}"),
+    "literal": Construct(
+        lambda names: " or ".join(
+            f"{index} or {name!r}" for index, name in enumerate(names)
+        ),
+        None,
+    ),
+    "shorthand": Construct(
+        lambda names: f"({', '.join('iter ' + name for name in names)})",
+        lambda inner: f"async with {inner}",
+    ),
+    "signature": Construct(
+        lambda names: f"({', '.join(names)}) -> R", lambda inner: f"(int) -> {inner}"
+    ),
+    "callable": Construct(
+        lambda names: f"Callable[[{', '.join(names)}], R]",
+        lambda inner: f"Callable[[{inner}], R]",
+    ),
+}
+
+
+def _names(count: int) -> List[str]:
+    """Create ``count`` distinct names, which may only contain letters"""
+    names = []
+    for index in range(count):
+        name = ""
+        while True:
+            index, digit = divmod(index, 26)
+            name += chr(ord("a") + digit)
+            if not index:
+                break
+        names.append(f"x{name}")
+    return names
+
+
+def expression(construct: str, dimension: str, size: int) -> str:
+    """Create an expression of ``construct`` with ``size`` in ``dimension``"""
+    templates = CONSTRUCTS[construct]
+    if dimension == "width" and templates.width is not None:
+        return templates.width(_names(size))
+    elif dimension == "depth" and templates.depth is not None:
+        steno = "int"
+        for _ in range(size):
+            steno = templates.depth(steno)
+        return steno
+    raise ValueError(f"{construct!r} does not grow in {dimension!r}")
+
+
+def measure(function: Callable[[], object], repeat: int, min_time: float) -> float:
+    """Measure the best time of calling ``function`` in seconds"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        seconds = time.perf_counter() - start
+        if seconds >= min_time:
+            break
+        number *= 2
+    best = seconds / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+class Result(NamedTuple):
+    """Timings of the passes for a single expression"""
+
+    construct: str
+    dimension: str
+    size: int
+    length: int
+    #: seconds per call of each pass, or ``None`` if the expression failed
+    parse: Optional[float]
+    normalize: Optional[float]
+    unparse: Optional[float]
+
+
+def run(
+    constructs: List[str],
+    engine: str,
+    max_width: int,
+    max_depth: int,
+    repeat: int = 5,
+    min_time: float = 0.01,
+) -> Iterator[Result]:
+    """Benchmark all ``constructs`` on sizes doubling up to the maximum size"""
+    parser = grammar.ENGINES[engine]
+    for construct in constructs:
+        for dimension, max_size in (("width", max_width), ("depth", max_depth)):
+            if getattr(CONSTRUCTS[construct], dimension) is None:
+                continue
+            size = 1
+            while size <= max_size:
+                steno = expression(construct, dimension, size)
+                try:
+                    tree = parser(steno)
+                    normalized = normalize(tree)
+                    unparse(normalized)
+                except RecursionError:
+                    yield Result(construct, dimension, size, len(steno), *[None] * 3)
+                    break
+                yield Result(
+                    construct,
+                    dimension,
+                    size,
+                    len(steno),
+                    measure(lambda: parser(steno), repeat, min_time),
+                    measure(lambda: normalize(tree), repeat, min_time),
+                    measure(lambda: unparse(normalized), repeat, min_time),
+                )
+                size *= 2
+
+
+def _compare(baseline: dict, results: List[Result]) -> Iterator[str]:
+    """Describe the change of each timing compared to the ``baseline`` report"""
+    known = {
+        (entry["construct"], entry["dimension"], entry["size"]): entry
+        for entry in baseline["results"]
+    }
+    for result in results:
+        entry = known.get((result.construct, result.dimension, result.size))
+        if entry is None:
+            continue
+        ratios = []
+        for name in ("parse", "normalize", "unparse"):
+            before, after = entry[name], getattr(result, name)
+            ratios.append(
+                f"{after / before:>9.2f}x" if before and after else f"{'-':>10}"
+            )
+        label = f"{result.construct} {result.dimension} {result.size}"
+        yield f"{label:<24} {' '.join(ratios)}"
+
+
+@click.command()
+@click.option(
+    "-c",
+    "--construct",
+    "constructs",
+    multiple=True,
+    type=click.Choice(list(CONSTRUCTS)),
+    help="Construct to benchmark, may be repeated. Defaults to all constructs.",
+)
+@click.option(
+    "-e",
+    "--engine",
+    default="descent",
+    type=click.Choice(list(grammar.ENGINES)),
+    help="Parser engine to benchmark. Note that the time of the 'pyparsing' engine "
+    "grows exponentially with depth.",
+)
+@click.option("--max-width", default=256, help="Largest width of expressions.")
+@click.option("--max-depth", default=64, help="Largest depth of expressions.")
+@click.option("--repeat", default=5, help="Number of measurements per timing.")
+@click.option(
+    "--min-time", default=0.01, help="Minimum duration of each measurement in seconds."
+)
+@click.option(
+    "-o", "--output", type=click.File("w"), default="-", help="File to write JSON to."
+)
+@click.option(
+    "-b",
+    "--baseline",
+    type=click.File("r"),
+    help="JSON output of an earlier run to compare against.",
+)
+def main(constructs, engine, max_width, max_depth, repeat, min_time, output, baseline):
+    """Benchmark the passes of stenotype for each construct of the grammar.
+
+    Timings are written as JSON, in seconds per call. If a baseline is given, the
+    ratio of each timing to the baseline is printed to stderr.
+    """
+    results = list(
+        run(
+            list(constructs or CONSTRUCTS),
+            engine,
+            max_width,
+            max_depth,
+            repeat=repeat,
+            min_time=min_time,
+        )
+    )
+    report = {
+        "stenotype": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": engine,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": [result._asdict() for result in results],
+    }
+    json.dump(report, output, indent=2)
+    output.write("\n")
+    if baseline is not None:
+        click.echo(
+            f"{'expression':<24} {'parse':>10} {'normalize':>10} {'unparse':>10}",
+            err=True,
+        )
+        for line in _compare(json.load(baseline), results):
+            click.echo(line, err=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
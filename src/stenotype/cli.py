@@ -4,19 +4,47 @@ The backend is exposed here through a simple command line interface. Documentati
 their usage is contained in the docstrings, which are written in a way that they will be
 rendered nicely by click's automatic --help text generator.
 """
+import time
 from logging import getLogger
+from typing import Union
 
 import click
 
-from stenotype.backend.grammar import parse
-from stenotype.backend.steno import unparse
-from stenotype.backend.typing import normalize as to_typing
+from stenotype.backend.pipeline import convert, shorten as shorten_expression
 from stenotype import util, __version__
 
 log = getLogger(__name__)
 
 
-@click.command()
+def _raise_error(outcome: Union[str, Exception]) -> str:
+    """Raise an error outcome of a batch conversion, or return its typing string"""
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
+
+
+class DefaultGroup(click.Group):
+    """Group of commands that runs ``default`` unless a command is named explicitly"""
+
+    def __init__(self, *args, default: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default = default
+
+    def parse_args(self, ctx, args):
+        if not args or args[0] not in self.commands and args[0] != "--help":
+            args = [self.default, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultGroup, default="convert")
+def cli():
+    """CLI entrypoint to use the stenotype backend.
+
+    Without a command, the arguments are converted as with the 'convert' command.
+    """
+
+
+@cli.command("convert")
 @click.option(
     "-v", "--version", is_flag=True, help="Print stenotype's version number and exit."
 )
@@ -31,7 +59,7 @@ log = getLogger(__name__)
     "-s",
     "--shorten",
     is_flag=True,
-    help="Inverts the parser to instead try to generate stenotype from standard types.",
+    help="Convert standard annotations to the shortest equivalent stenotype instead.",
 )
 @click.option(
     "-c",
@@ -40,9 +68,29 @@ log = getLogger(__name__)
     help="Disables the check-skipping, annotations need to be written as they would "
     "be in source files in this mode.",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    default=1,
+    type=click.IntRange(min=0),
+    help="Number of worker processes to convert arguments with, 0 for one per CPU.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Print the attempts, successes, failures and time of each grammar rule to "
+    "stderr after converting.",
+)
+@click.option(
+    "--profile-json",
+    type=click.File("w"),
+    help="Write the profile of the grammar rules as JSON to a file, '-' for stdout.",
+)
 @click.argument("args", nargs=-1)
-def cli(args, version, loglevel, shorten, check):
-    """CLI entrypoint to test the stenotype backend.
+def convert_expressions(
+    args, version, loglevel, shorten, check, jobs, profile, profile_json
+):
+    """Convert stenotype expressions to standard annotations.
 
     Enter any number of stenotype expressions to see which standard annotations they will
     resolve into. There is no need to double quote expression or to assign them to a
@@ -61,6 +109,22 @@ def cli(args, version, loglevel, shorten, check):
       $ stenotype 'T, int' 'bool or T'
       T = TypeVar[int]
       typing.Union[bool, T]
+
+    With --shorten, standard annotations are converted to stenotype instead:
+
+    \b
+      $ stenotype --shorten 'typing.Optional[typing.List[int]]'
+      ?[int]
+
+    With --profile, a table of the grammar rules tried while parsing is printed to
+    stderr, the most expensive rule first:
+
+    \b
+      $ stenotype --profile '?[int or str]'
+      typing.Optional[typing.List[typing.Union[int, str]]]
+      rule                 attempts  successes   failures    seconds
+      TYPE                        7          7          0   0.001237
+      ...
     """
     # early exits
     if version:
@@ -71,18 +135,224 @@ def cli(args, version, loglevel, shorten, check):
             "Flags --shorten and --check can't be used simultaneously.", err=True
         )
         exit(1)
+    if (profile or profile_json) and jobs != 1:
+        click.echo("Flags --profile and --jobs can't be used simultaneously.", err=True)
+        exit(1)
     if not args:
         click.echo("No arguments entered, nothing to do.", err=True)
         exit(0)
 
     util.setup_logging(loglevel)
+    if profile or profile_json:
+        from stenotype.backend import grammar
+
+        rule_profile = grammar.enable_profile()
     try:
-        if shorten:
-            expressions = (f"stub inverse function: {arg}" for arg in args)
+        if jobs != 1:
+            # starting worker processes is only worth it when asked for
+            from stenotype.backend import parallel
+
+            run_parallel = (
+                parallel.shorten_parallel if shorten else parallel.convert_parallel
+            )
+            outcomes = run_parallel(args, jobs=jobs or None, chunksize=64)
+            expressions = (_raise_error(outcome) for _, outcome in outcomes)
+        elif shorten:
+            expressions = (shorten_expression(arg) for arg in args)
         else:
-            expressions = (unparse(to_typing(parse(arg))) for arg in args)
+            expressions = (convert(arg) for arg in args)
         for expression in expressions:
             click.echo(expression)
     except util.StenotypeException as e:
         click.echo(e, err=True)
         exit(1)
+    finally:
+        if profile or profile_json:
+            grammar.disable_profile()
+            if profile:
+                click.echo(rule_profile.table(), err=True)
+            if profile_json:
+                profile_json.write(rule_profile.to_json() + "\n")
+
+
+@cli.command()
+@click.option(
+    "-l",
+    "--loglevel",
+    default="INFO",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"]),
+    help="Set the loglevel.",
+)
+@click.option(
+    "-s",
+    "--shorten",
+    is_flag=True,
+    help="Convert standard annotations to the shortest equivalent stenotype instead.",
+)
+@click.option(
+    "--ndjson",
+    is_flag=True,
+    help="Read JSON records with an 'expression' and an optional 'id' per line.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=1,
+    type=click.IntRange(min=0),
+    help="Number of worker processes to convert lines with, 0 for one per CPU.",
+)
+@click.option(
+    "--flush-every",
+    default=256,
+    type=click.IntRange(min=1),
+    show_default=True,
+    help="Number of results to write before flushing stdout, 1 for interactive use.",
+)
+def stream(loglevel, shorten, ndjson, jobs, flush_every):
+    """Convert the expressions on each line of stdin to JSON objects on stdout.
+
+    Each line is either an expression or, with --ndjson, a JSON record with an
+    'expression' and an 'id'. A JSON object is written for each line as the lines are
+    converted, with the 'id' of the record, or else the line number, and either the
+    'result' or an 'error'. Invalid lines do not stop the conversion:
+
+    \b
+      $ printf '?int\\n{str:\\n' | stenotype stream
+      {"id": 1, "result": "typing.Optional[int]"}
+      {"id": 2, "error": {"type": "ParseError", "message": "..."}}
+
+    Input is read lazily, so any amount of lines can be converted. The exit code is
+    1 if any line could not be converted.
+    """
+    from stenotype.stream import stream as stream_lines
+
+    util.setup_logging(loglevel)
+    errors = stream_lines(
+        click.get_text_stream("stdin"),
+        click.get_text_stream("stdout"),
+        ndjson=ndjson,
+        shorten=shorten,
+        jobs=jobs,
+        flush_every=flush_every,
+    )
+    exit(1 if errors else 0)
+
+
+@cli.command()
+@click.option(
+    "-l",
+    "--loglevel",
+    default="INFO",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"]),
+    help="Set the loglevel.",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Path of a Unix socket to serve clients on, instead of stdin and stdout.",
+)
+def serve(loglevel, socket_path):
+    """Answer JSON-RPC requests to parse, convert and shorten expressions.
+
+    Keeps the backend and its caches ready for many requests, so that tools such as
+    editor plugins do not start a new process for each conversion. Requests are read
+    from stdin, or from any number of clients of a Unix socket, one per line:
+
+    \b
+      $ echo '{"jsonrpc": "2.0", "id": 1, "method": "convert", "params": ["?int"]}' \\
+          | stenotype serve
+      {"jsonrpc": "2.0", "id": 1, "result": "typing.Optional[int]"}
+
+    The methods 'parse', 'convert' and 'shorten' take an 'expression' and an optional
+    parser 'engine'. Logs are written to stderr.
+    """
+    from stenotype import server
+
+    util.setup_logging(loglevel, "ext://sys.stderr")
+    if socket_path is None:
+        server.serve_stdio(
+            click.get_text_stream("stdin"), click.get_text_stream("stdout")
+        )
+    else:
+        try:
+            server.serve_socket(socket_path)
+        except KeyboardInterrupt:
+            pass
+
+
+@cli.command()
+@click.option(
+    "-l",
+    "--loglevel",
+    default="INFO",
+    type=click.Choice(["DEBUG", "INFO", "WARNING", "ERROR"]),
+    help="Set the loglevel.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=0,
+    type=click.IntRange(min=0),
+    help="Number of worker processes to rewrite files with, 0 for one per CPU.",
+)
+@click.option(
+    "-n",
+    "--dry-run",
+    is_flag=True,
+    help="Report which annotations would be rewritten without changing any files.",
+)
+@click.option(
+    "--cache-dir",
+    default=".stenotype_cache",
+    type=click.Path(file_okay=False),
+    show_default=True,
+    help="Directory to store results in, to skip unchanged files on later runs.",
+)
+@click.option("--no-cache", is_flag=True, help="Do not read or write the cache.")
+@click.argument("paths", nargs=-1, type=click.Path(exists=True))
+def rewrite(paths, loglevel, jobs, dry_run, cache_dir, no_cache):
+    """Rewrite stenotype annotations in Python files to standard annotations.
+
+    All string annotations of arguments, return values and variables in the files are
+    converted in place; the rest of each file is left unchanged. Directories are
+    searched recursively for '.py' files, skipping hidden directories:
+
+    \b
+      $ stenotype rewrite src/
+      src/example.py: rewrote 2 of 3 annotations in 4.1ms
+      1 file, 2 annotations rewritten in 0.08s
+
+    Annotations that cannot be converted are reported and left as they are. The
+    results for each file and annotation are cached, so that unchanged files and
+    annotations are skipped when running again.
+    """
+    from stenotype.backend.diskcache import DiskCache
+    from stenotype.rewrite import rewrite_paths
+
+    if not paths:
+        click.echo("No paths entered, nothing to do.", err=True)
+        exit(0)
+
+    util.setup_logging(loglevel)
+    start = time.perf_counter()
+    files, rewritten, failed = 0, 0, False
+    cache = None if no_cache else DiskCache(cache_dir)
+    reports = rewrite_paths(paths, jobs=jobs or None, write=not dry_run, cache=cache)
+    for report in reports:
+        files += 1
+        rewritten += report.rewritten
+        click.echo(
+            f"{report.path}: {'would rewrite' if dry_run else 'rewrote'}"
+            f" {report.rewritten} of {report.annotations} annotations"
+            f" in {report.seconds * 1000:.1f}ms{' (cached)' if report.cached else ''}"
+        )
+        for line, message in report.errors:
+            failed = True
+            click.echo(f"{report.path}:{line}: {message}", err=True)
+    click.echo(
+        f"{files} file{'s' if files != 1 else ''}, {rewritten} annotations"
+        f" {'to rewrite' if dry_run else 'rewritten'}"
+        f" in {time.perf_counter() - start:.2f}s"
+    )
+    exit(1 if failed else 0)
@@ -0,0 +1,125 @@
+"""Resolve the stenotype annotations of functions, classes and modules at runtime.
+
+:py:func:`~.get_type_hints` is a replacement of :py:func:`typing.get_type_hints` for
+code annotated with stenotype strings. Each string annotation is parsed and built into
+a typing object via :py:func:`~stenotype.backend.runtime.to_runtime`; strings that
+are not stenotype, such as ``"typing.Callable[[int], str]"``, are evaluated as Python
+code like :py:func:`typing.get_type_hints` does.
+
+Hints are resolved on the first call for each object and cached until the object is
+garbage collected. Concurrent first calls resolve the hints only once.
+"""
+import functools
+import sys
+import threading
+import weakref
+from collections import ChainMap
+from types import MethodType, ModuleType
+from typing import Any, Callable, Dict, Mapping, Optional
+
+__all__ = ["get_type_hints"]
+
+
+#: resolved hints of functions, classes and modules, by the object
+_HINTS: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+_HINTS_LOCK = threading.RLock()
+
+
+def _resolve_all(
+    annotations: Mapping[str, Any], namespace: Mapping[str, Any]
+) -> Dict[str, Any]:
+    """Resolve all ``annotations`` in ``namespace``"""
+    from .backend.grammar import parse
+    from .backend.pipeline import ERRORS
+    from .backend.runtime import Resolver, to_runtime
+
+    # modules share the caches of their resolver across calls
+    build: Callable[[Any], Any]
+    if isinstance(namespace, dict):
+        build = functools.partial(to_runtime, namespace=namespace)
+    else:
+        build = Resolver(namespace)
+    hints = {}
+    for name, annotation in annotations.items():
+        if isinstance(annotation, str):
+            try:
+                element = parse(annotation)
+            except ERRORS:
+                annotation = eval(annotation, {}, namespace)  # nosec
+            else:
+                annotation = build(element)
+        hints[name] = type(None) if annotation is None else annotation
+    return hints
+
+
+def _globals(obj: Any) -> Dict[str, Any]:
+    """Get the global namespace of a function, class or module ``obj``"""
+    if isinstance(obj, ModuleType):
+        return vars(obj)
+    if isinstance(obj, type):
+        module = sys.modules.get(obj.__module__)
+        return vars(module) if module is not None else {}
+    while hasattr(obj, "__wrapped__"):
+        obj = obj.__wrapped__
+    return getattr(obj, "__globals__", {})
+
+
+def _type_hints(
+    obj: Any, globalns: Optional[Dict[str, Any]], localns: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    if not isinstance(obj, type):
+        globalns = globalns if globalns is not None else _globals(obj)
+        namespace = globalns if localns is None else ChainMap(localns, globalns)
+        return _resolve_all(getattr(obj, "__annotations__", None) or {}, namespace)
+    hints: Dict[str, Any] = {}
+    # annotations of bases may use the names of their class and module
+    for base in reversed(obj.__mro__):
+        if "__annotations__" not in vars(base):
+            continue
+        namespaces = [
+            dict(vars(base)),
+            globalns if globalns is not None else _globals(base),
+        ]
+        if localns is not None:
+            namespaces.insert(0, localns)
+        hints.update(_resolve_all(vars(base)["__annotations__"], ChainMap(*namespaces)))
+    return hints
+
+
+def get_type_hints(
+    obj: Any,
+    globalns: Optional[Dict[str, Any]] = None,
+    localns: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Get the type hints of a function, method, class or module ``obj``
+
+    :param obj: the object of which to get the type hints
+    :param globalns: the global namespace to resolve annotations in, by default the
+        globals of the module defining ``obj``
+    :param localns: the local namespace to resolve annotations in first
+    :raises NameError: if a name used in an annotation is not defined
+
+    As for :py:func:`typing.get_type_hints`, ``None`` is replaced by
+    :py:class:`~types.NoneType` and classes include the hints of their bases.
+    Unlike it, default values of ``None`` do not make a hint optional.
+
+    Hints are resolved on the first call and cached for each ``obj`` that supports
+    weak references, unless either namespace is given. The hints of an object should
+    thus not change after the first call. Each call returns a new dictionary.
+    """
+    if isinstance(obj, MethodType):
+        obj = obj.__func__
+    if globalns is not None or localns is not None:
+        return _type_hints(obj, globalns, localns)
+    try:
+        hints = _HINTS.get(obj)
+    except TypeError:
+        # the object does not support weak references
+        return _type_hints(obj, None, None)
+    if hints is None:
+        with _HINTS_LOCK:
+            hints = _HINTS.get(obj)
+            if hints is None:
+                hints = _HINTS[obj] = _type_hints(obj, None, None)
+    return dict(hints)
@@ -0,0 +1,214 @@
+"""Convert stenotype annotations of modules while they are imported.
+
+The import hook is opt-in for specific packages: after
+
+.. code:: python
+
+    import stenotype.hook
+    stenotype.hook.install("my_package")
+
+every module of ``my_package`` is loaded with its string annotations rewritten as by
+:py:func:`~stenotype.rewrite.rewrite_source`, without changing the files themselves.
+
+The bytecode of rewritten modules is cached next to their regular bytecode, as
+``__pycache__/<module>.<tag>.opt-stenotype.pyc``. Each cache file is keyed to the
+modification time, size and hash of its source, as well as the
+:py:func:`~stenotype.backend.diskcache.fingerprint` of :py:mod:`stenotype`. A module
+is rewritten only if its source or :py:mod:`stenotype` changed; if only the
+modification time of the source changed, as after a fresh checkout, the cached
+bytecode is reused if the hash of the source still matches.
+"""
+import hashlib
+import importlib.util
+import marshal
+import os
+import struct
+import sys
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec, PathFinder, SourceFileLoader
+from logging import getLogger
+from types import CodeType
+from typing import Optional, Sequence, Tuple
+
+from stenotype.backend.diskcache import fingerprint
+
+log = getLogger(__name__)
+
+__all__ = ["install", "uninstall", "StenotypeFinder", "StenotypeLoader"]
+
+
+#: magic number, stenotype fingerprint, source mtime and size, and source hash
+_HEADER = struct.Struct("<4s16sqq32s")
+
+
+def cache_path(source_path: str) -> Optional[str]:
+    """Get the path of the cached bytecode of rewritten ``source_path``"""
+    optimization = "stenotype" + (str(sys.flags.optimize) if sys.flags.optimize else "")
+    try:
+        return importlib.util.cache_from_source(source_path, optimization=optimization)
+    except NotImplementedError:
+        # the interpreter does not support caching bytecode
+        return None
+
+
+def _header(stat: os.stat_result, source_hash: bytes) -> bytes:
+    return _HEADER.pack(
+        importlib.util.MAGIC_NUMBER,
+        fingerprint().encode("ascii"),
+        stat.st_mtime_ns,
+        stat.st_size,
+        source_hash,
+    )
+
+
+def _read_cache(path: str) -> Tuple[Optional[tuple], bytes]:
+    """Read the unpacked header and the code data of the cache file at ``path``"""
+    try:
+        with open(path, "rb") as in_stream:
+            data = in_stream.read()
+    except OSError:
+        return None, b""
+    if len(data) < _HEADER.size:
+        return None, b""
+    return _HEADER.unpack_from(data), data[_HEADER.size :]
+
+
+def _load_code(data: bytes) -> CodeType:
+    code: CodeType = marshal.loads(data)
+    return code
+
+
+def _write_cache(path: str, data: bytes) -> None:
+    """Atomically write ``data`` to the cache file at ``path``, if possible"""
+    if sys.dont_write_bytecode:
+        return
+    import tempfile
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix=".", suffix=".tmp"
+        )
+        try:
+            with open(handle, "wb") as out_stream:
+                out_stream.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError as err:
+        log.debug(f"cannot cache bytecode at {path}: {err}")
+
+
+class StenotypeLoader(SourceFileLoader):
+    """
+    Loader of Python source files that rewrites their stenotype annotations
+
+    :param fullname: the qualified name of the module
+    :param path: the path of the module's source file
+    :param engine: the parser engine, see :py:func:`~stenotype.backend.grammar.parse`
+    """
+
+    def __init__(self, fullname: str, path: str, engine: Optional[str] = None):
+        super().__init__(fullname, path)
+        self.engine = engine
+
+    def get_code(self, fullname: str) -> CodeType:
+        source_path = self.get_filename(fullname)
+        bytecode_path = cache_path(source_path)
+        if bytecode_path is None:
+            return self._rewrite_code(self.get_data(source_path), source_path)
+        stat = os.stat(source_path)
+        header, code_data = _read_cache(bytecode_path)
+        if header is not None and header[:2] != (
+            importlib.util.MAGIC_NUMBER,
+            fingerprint().encode("ascii"),
+        ):
+            header = None
+        if header is not None and header[2:4] == (stat.st_mtime_ns, stat.st_size):
+            return _load_code(code_data)
+        data = self.get_data(source_path)
+        source_hash = hashlib.sha256(data).digest()
+        if header is not None and header[4] == source_hash:
+            # only the modification time changed, as after a fresh checkout
+            _write_cache(bytecode_path, _header(stat, source_hash) + code_data)
+            return _load_code(code_data)
+        code = self._rewrite_code(data, source_path)
+        _write_cache(bytecode_path, _header(stat, source_hash) + marshal.dumps(code))
+        return code
+
+    def _rewrite_code(self, data: bytes, source_path: str) -> CodeType:
+        from stenotype.rewrite import rewrite_source
+
+        try:
+            source, report = rewrite_source(
+                importlib.util.decode_source(data), self.engine
+            )
+        except SyntaxError:
+            # let the compiler report the error of the original source
+            return self.source_to_code(data, source_path)
+        for line, message in report.errors:
+            log.debug(f"cannot rewrite annotation at {source_path}:{line}: {message}")
+        return self.source_to_code(source, source_path)
+
+
+class StenotypeFinder(MetaPathFinder):
+    """
+    Finder of the modules in ``packages``, which are loaded by a
+    :py:class:`~.StenotypeLoader`
+
+    :param packages: qualified names of the packages or modules to rewrite
+    :param engine: the parser engine, see :py:func:`~stenotype.backend.grammar.parse`
+
+    Modules are searched on :py:data:`sys.path` as by the regular import system.
+    Modules that are not Python source files are left to the other finders.
+    """
+
+    def __init__(self, packages: Sequence[str], engine: Optional[str] = None):
+        self.packages = tuple(packages)
+        self.engine = engine
+
+    def _matches(self, fullname: str) -> bool:
+        return any(
+            fullname == package or fullname.startswith(package + ".")
+            for package in self.packages
+        )
+
+    def find_spec(self, fullname, path=None, target=None) -> Optional[ModuleSpec]:
+        if not self._matches(fullname):
+            return None
+        spec = PathFinder.find_spec(fullname, path, target)
+        if spec is None or type(spec.loader) is not SourceFileLoader:
+            return None
+        source_path = spec.loader.path
+        spec.loader = StenotypeLoader(fullname, source_path, self.engine)
+        spec.cached = cache_path(source_path)
+        return spec
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.packages!r}, {self.engine!r})"
+
+
+def install(*packages: str, engine: Optional[str] = None) -> StenotypeFinder:
+    """
+    Rewrite the stenotype annotations of ``packages`` when they are imported
+
+    :param packages: qualified names of the packages or modules to rewrite,
+        including all their submodules
+    :param engine: the parser engine, see :py:func:`~stenotype.backend.grammar.parse`
+    :returns: the finder added to :py:data:`sys.meta_path`
+
+    Modules that are already imported are not affected.
+    """
+    if not packages:
+        raise ValueError("at least one package must be rewritten")
+    finder = StenotypeFinder(packages, engine)
+    sys.meta_path.insert(0, finder)
+    return finder
+
+
+def uninstall() -> None:
+    """Remove all finders added by :py:func:`~.install` from :py:data:`sys.meta_path`"""
+    sys.meta_path[:] = [
+        finder for finder in sys.meta_path if not isinstance(finder, StenotypeFinder)
+    ]
@@ -0,0 +1,306 @@
+"""Rewrite stenotype annotations in Python source files to standard typing annotations.
+
+Annotations are found via the :py:mod:`ast` of each file: every annotation of an
+argument, return value or variable that is a plain string is converted with the
+backend. The converted strings are spliced back in at the offsets of the original
+string literals, so that the rest of the file keeps its exact formatting.
+"""
+import ast
+import functools
+import io
+import os
+import re
+import time
+import tokenize
+from logging import getLogger
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from stenotype.backend import grammar
+from stenotype.backend.diskcache import DiskCache, digest
+from stenotype.backend.pipeline import ERRORS, convert
+
+log = getLogger(__name__)
+
+
+class FileReport(NamedTuple):
+    """Outcome of rewriting the annotations of a single file"""
+
+    path: str
+    #: number of string annotations found in the file
+    annotations: int
+    #: number of string annotations that were changed
+    rewritten: int
+    #: line number and message for each annotation or file that could not be converted
+    errors: List[Tuple[int, str]]
+    #: wall clock time spent on the file
+    seconds: float
+    #: whether the outcome was taken from a persistent cache
+    cached: bool = False
+
+
+def _string_value(node: Optional[ast.AST]) -> Optional[str]:
+    """Get the value of a plain string literal ``node``, if it is one"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    # Python 3.6 and 3.7 represent string literals as ``ast.Str``
+    if type(node).__name__ == "Str":
+        return node.s  # type: ignore
+    return None
+
+
+def find_annotations(tree: ast.AST) -> Iterator[ast.expr]:
+    """Find all annotations of arguments, return values and variables in ``tree``"""
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            arguments = node.args
+            for argument in (
+                *getattr(arguments, "posonlyargs", ()),
+                *arguments.args,
+                arguments.vararg,
+                *arguments.kwonlyargs,
+                arguments.kwarg,
+            ):
+                if argument is not None and argument.annotation is not None:
+                    yield argument.annotation
+            if node.returns is not None:
+                yield node.returns
+        elif isinstance(node, ast.AnnAssign):
+            yield node.annotation
+
+
+#: tokens that may separate implicitly concatenated string literals
+_SKIPPED = {tokenize.NL, tokenize.COMMENT}
+
+
+def _literal(value: str, template: str) -> str:
+    """Create a string literal of ``value`` using the quotes of ``template``"""
+    literal = repr(value)
+    if template.lstrip("rRuU")[:1] == '"' and literal[0] == "'" and '"' not in value:
+        return f'"{literal[1:-1]}"'
+    return literal
+
+
+#: replacement of ``source[start:end]`` by a string literal
+Replacement = Tuple[int, int, str]
+
+
+def _find_literals(
+    source: str,
+) -> Tuple[List[Tuple[int, int, int, str, str]], List[Tuple[int, str]]]:
+    """
+    Find all string literals used as annotations in ``source``
+
+    :returns: the line, start, end, value and source of each literal that can be
+        replaced, and the line and message of each literal that cannot
+    """
+    tree = ast.parse(source)
+    # offsets of ast nodes are in utf-8 bytes per line, those of tokens in characters
+    line_offsets = [0, *(match.end() for match in re.finditer("\n", source))]
+    tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    strings = {
+        token.start: index
+        for index, token in enumerate(tokens)
+        if token.type == tokenize.STRING
+    }
+    literals, errors = [], []
+    for node in find_annotations(tree):
+        value = _string_value(node)
+        if value is None:
+            continue
+        offset = line_offsets[node.lineno - 1]
+        prefix = source[offset : offset + node.col_offset].encode("utf-8")
+        column = len(prefix[: node.col_offset].decode("utf-8"))
+        index = strings.get((node.lineno, column), -1)
+        following = index + 1
+        while tokens[following].type in _SKIPPED:
+            following += 1
+        if index < 0 or tokens[following].type == tokenize.STRING:
+            # implicitly concatenated literals cannot be replaced as a whole
+            errors.append((node.lineno, "Cannot rewrite concatenated string literal"))
+            continue
+        token = tokens[index]
+        start = line_offsets[token.start[0] - 1] + token.start[1]
+        end = line_offsets[token.end[0] - 1] + token.end[1]
+        literals.append((node.lineno, start, end, value, token.string))
+    return literals, errors
+
+
+def _convert_all(
+    values: Iterable[str], engine: Optional[str], cache: Optional[DiskCache]
+) -> Dict[str, Tuple[bool, str]]:
+    """
+    Convert all ``values``, reusing and storing the outcomes in ``cache``
+
+    :returns: a mapping from each value to ``True`` and its conversion,
+        or ``False`` and an error message
+    """
+    outcomes: Dict[str, Tuple[bool, str]] = {}
+    # outcomes are stored in 256 shards, instead of one entry per string
+    shards: Dict[str, List[str]] = {}
+    for value in values:
+        shards.setdefault(digest(value)[:2], []).append(value)
+    for shard, shard_values in shards.items():
+        key = digest("strings", engine or grammar.DEFAULT_ENGINE, shard)
+        known = (cache.get(key) if cache is not None else None) or {}
+        missing = {}
+        for value in shard_values:
+            if value in known:
+                outcomes[value] = tuple(known[value])
+                continue
+            try:
+                outcomes[value] = missing[value] = (True, convert(value, engine))
+            except ERRORS as err:
+                outcomes[value] = missing[value] = (False, str(err))
+        if missing and cache is not None:
+            cache.update(key, missing)
+    return outcomes
+
+
+def _rewrite(
+    source: str, engine: Optional[str], cache: Optional[DiskCache]
+) -> Tuple[int, List[Replacement], List[Tuple[int, str]]]:
+    """Find the number of annotations, the replacements and errors for ``source``"""
+    literals, errors = _find_literals(source)
+    annotations = len(literals) + len(errors)
+    outcomes = _convert_all({literal[3] for literal in literals}, engine, cache)
+    replacements = []
+    for line, start, end, value, text in literals:
+        success, converted = outcomes[value]
+        if not success:
+            errors.append((line, converted))
+        elif converted != value:
+            replacements.append((start, end, _literal(converted, text)))
+    return annotations, replacements, sorted(errors)
+
+
+def _splice(source: str, replacements: Iterable[Replacement]) -> str:
+    pieces, end = [], len(source)
+    for first, last, literal in sorted(replacements, reverse=True):
+        pieces.append(source[last:end])
+        pieces.append(literal)
+        end = first
+    pieces.append(source[:end])
+    return "".join(reversed(pieces))
+
+
+def rewrite_source(source: str, engine: Optional[str] = None) -> Tuple[str, FileReport]:
+    """
+    Rewrite all string annotations in ``source`` to typing annotations
+
+    :param source: the source code of a module
+    :param engine: the parser engine, see :py:func:`~stenotype.backend.grammar.parse`
+    :raises SyntaxError: if ``source`` is not valid Python code
+    :returns: the rewritten source and a report of the annotations
+    """
+    start = time.perf_counter()
+    annotations, replacements, errors = _rewrite(source, engine, None)
+    report = FileReport(
+        "<string>", annotations, len(replacements), errors, time.perf_counter() - start,
+    )
+    return _splice(source, replacements), report
+
+
+def rewrite_file(
+    path: str,
+    engine: Optional[str] = None,
+    write: bool = True,
+    cache: Optional[DiskCache] = None,
+) -> FileReport:
+    """
+    Rewrite all string annotations in the file at ``path``
+
+    :param path: path of a Python source file
+    :param engine: the parser engine, see :py:func:`~stenotype.backend.grammar.parse`
+    :param write: whether to write changes back to the file
+    :param cache: persistent cache of the outcomes for files and annotations
+
+    If the ``cache`` has an entry for the content of the file, the file is not
+    parsed at all. Otherwise, only annotations not in the ``cache`` are converted.
+    """
+    start = time.perf_counter()
+    with open(path, "rb") as in_stream:
+        data = in_stream.read()
+    key = digest("file", engine or grammar.DEFAULT_ENGINE, data)
+    entry = cache.get(key) if cache is not None else None
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        source = data.decode(encoding)
+        if entry is None:
+            annotations, replacements, errors = _rewrite(source, engine, cache)
+        else:
+            annotations, replacements, errors = entry
+            replacements = list(map(tuple, replacements))
+            errors = list(map(tuple, errors))
+    except (SyntaxError, UnicodeDecodeError) as err:
+        error = (getattr(err, "lineno", None) or 0, str(err))
+        return FileReport(path, 0, 0, [error], time.perf_counter() - start)
+    if cache is not None and entry is None:
+        cache.put(key, [annotations, replacements, errors])
+    if write and replacements:
+        rewritten = _splice(source, replacements).encode(encoding)
+        with open(path, "wb") as out_stream:
+            out_stream.write(rewritten)
+    log.debug(f"rewrote {len(replacements)} of {annotations} in {path}")
+    return FileReport(
+        path,
+        annotations,
+        len(replacements),
+        errors,
+        time.perf_counter() - start,
+        cached=entry is not None,
+    )
+
+
+def find_files(paths: Iterable[str]) -> Iterator[str]:
+    """
+    Find all Python source files in ``paths``
+
+    Directories are searched recursively, skipping hidden directories such as
+    ``.git`` or ``.venv``; files are used as they are.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, directories, files in os.walk(path):
+            directories[:] = sorted(name for name in directories if name[0] != ".")
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    yield str(Path(directory, name))
+
+
+def rewrite_paths(
+    paths: Iterable[str],
+    jobs: Optional[int] = None,
+    engine: Optional[str] = None,
+    write: bool = True,
+    cache: Optional[DiskCache] = None,
+) -> Iterator[FileReport]:
+    """
+    Rewrite all string annotations in the Python files in ``paths``
+
+    :param paths: files or directories to search for Python files
+    :param jobs: number of worker processes, or ``None`` for one per CPU
+    :param engine: the parser engine, see :py:func:`~stenotype.backend.grammar.parse`
+    :param write: whether to write changes back to the files
+    :param cache: persistent cache of the outcomes for files and annotations,
+        which is pruned to its size limit when all files are done
+
+    Reports are produced as soon as each file is done.
+    """
+    files = find_files(paths)
+    if jobs == 1:
+        for path in files:
+            yield rewrite_file(path, engine, write, cache)
+    else:
+        from stenotype.backend.parallel import ProcessConverter
+
+        with ProcessConverter(jobs=jobs, chunksize=1, engine=engine) as converter:
+            yield from converter.map(
+                functools.partial(rewrite_file, write=write, cache=cache),
+                files,
+                ordered=False,
+            )
+    if cache is not None:
+        cache.prune()
@@ -0,0 +1,230 @@
+"""Serve conversions to other processes via JSON-RPC over stdio or a Unix socket.
+
+Tools such as editor plugins would otherwise start a new process for each
+conversion, paying for the startup of the interpreter and the backend every time.
+A server keeps the backend and its caches warm across all requests and clients.
+
+Messages are `JSON-RPC 2.0 <https://www.jsonrpc.org/specification>`_ requests, one
+per line, and each response is written as a single line as well:
+
+.. code:: none
+
+    --> {"jsonrpc": "2.0", "id": 1, "method": "convert", "params": ["?int"]}
+    <-- {"jsonrpc": "2.0", "id": 1, "result": "typing.Optional[int]"}
+
+The methods ``parse``, ``convert`` and ``shorten`` each take an ``expression`` and
+an optional ``engine``, by position or by name. ``parse`` returns the canonical
+stenotype form of a valid expression. Expressions that cannot be converted give an
+error with the code :py:data:`~.CONVERSION_ERROR`. Clients may send any number of
+requests, or batches of requests, without waiting for their responses. Lines sent
+to a socket may be at most :py:data:`~.MAX_LINE` bytes long.
+"""
+import inspect
+import json
+import os
+import socket
+import socketserver
+import stat
+from logging import getLogger
+from typing import Any, Callable, Dict, Iterable, Optional, TextIO
+
+from stenotype.backend import grammar, pipeline
+from stenotype.backend.steno import unparse
+
+log = getLogger(__name__)
+
+__all__ = ["handle_message", "serve_stdio", "create_server", "serve_socket"]
+
+
+# error codes defined by JSON-RPC
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+#: error code of expressions that cannot be parsed or converted
+CONVERSION_ERROR = -32000
+
+#: maximum size in bytes of a line sent to a socket, including its newline
+MAX_LINE = 1024 * 1024
+
+
+class InvalidParams(TypeError):
+    """The parameters of a request do not match its method"""
+
+
+def _method(function: Callable[[str, Optional[str]], str]) -> Callable[..., str]:
+    def method(expression: str, engine: Optional[str] = None) -> str:
+        if not isinstance(expression, str):
+            raise InvalidParams("expression must be a string")
+        if engine is not None and engine not in grammar.ENGINES:
+            raise InvalidParams(f"engine must be one of {', '.join(grammar.ENGINES)}")
+        return function(expression, engine)
+
+    return method
+
+
+def _parse(expression: str, engine: Optional[str] = None) -> str:
+    return unparse(grammar.parse(expression, engine))
+
+
+#: functions answering the requests of each method
+METHODS: Dict[str, Callable[..., str]] = {
+    "parse": _method(_parse),
+    "convert": _method(pipeline.convert),
+    "shorten": _method(pipeline.shorten),
+}
+for _name, _function in METHODS.items():
+    # name the method in the errors of wrong parameters
+    _function.__name__ = _function.__qualname__ = _name
+
+
+def _error(identifier: Any, code: int, message: str, data: Any = None) -> dict:
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": identifier, "error": error}
+
+
+def _call(method: Callable[..., str], params: Any) -> str:
+    if isinstance(params, list):
+        args, kwargs = params, {}
+    elif isinstance(params, dict):
+        args, kwargs = [], params
+    else:
+        raise InvalidParams("params must be an array or object")
+    try:
+        inspect.signature(method).bind(*args, **kwargs)
+    except TypeError as err:
+        # a wrong number or wrong names of parameters
+        raise InvalidParams(f"{method.__name__}() {err}") from None
+    return method(*args, **kwargs)
+
+
+def _handle_request(request: Any) -> Optional[dict]:
+    """Answer a single request, or give :py:data:`None` for a notification"""
+    if (
+        not isinstance(request, dict)
+        or request.get("jsonrpc") != "2.0"
+        or not isinstance(request.get("method"), str)
+    ):
+        identifier = request.get("id") if isinstance(request, dict) else None
+        return _error(identifier, INVALID_REQUEST, "Invalid Request")
+    identifier = request.get("id")
+    method = METHODS.get(request["method"])
+    if method is None:
+        response = _error(identifier, METHOD_NOT_FOUND, "Method not found")
+    else:
+        try:
+            result = _call(method, request.get("params", []))
+        except InvalidParams as err:
+            response = _error(identifier, INVALID_PARAMS, "Invalid params", str(err))
+        except pipeline.ERRORS as err:
+            data = {"type": err.__class__.__name__, "message": str(err)}
+            response = _error(identifier, CONVERSION_ERROR, "Conversion error", data)
+        except Exception:
+            log.exception(f"failed to answer {request!r}")
+            response = _error(identifier, INTERNAL_ERROR, "Internal error")
+        else:
+            response = {"jsonrpc": "2.0", "id": identifier, "result": result}
+    return response if "id" in request else None
+
+
+def handle_message(message: str) -> Optional[str]:
+    """
+    Answer a JSON-RPC ``message`` of a single request or a batch of requests
+
+    :returns: the response, or :py:data:`None` if the message holds only
+        notifications
+    """
+    try:
+        requests = json.loads(message)
+    except ValueError:
+        return json.dumps(_error(None, PARSE_ERROR, "Parse error"))
+    if not isinstance(requests, list):
+        response = _handle_request(requests)
+        return json.dumps(response) if response is not None else None
+    if not requests:
+        return json.dumps(_error(None, INVALID_REQUEST, "Invalid Request"))
+    responses = [
+        response for response in map(_handle_request, requests) if response is not None
+    ]
+    return json.dumps(responses) if responses else None
+
+
+def _warm_up() -> None:
+    """Prepare the backend before the first request"""
+    grammar.parse.__wrapped__("_")
+
+
+def serve_stdio(in_stream: Iterable[str], out_stream: TextIO) -> None:
+    """Answer the messages of each line of ``in_stream`` until it is exhausted"""
+    _warm_up()
+    for line in in_stream:
+        if not line.strip():
+            continue
+        response = handle_message(line)
+        if response is not None:
+            out_stream.write(response + "\n")
+            out_stream.flush()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answer the messages of each line sent by a client"""
+
+    def handle(self) -> None:
+        while True:
+            line = self.rfile.readline(MAX_LINE + 1)
+            if not line:
+                break
+            if len(line) > MAX_LINE:
+                # skip the rest of the line to answer the following lines
+                while line and not line.endswith(b"\n"):
+                    line = self.rfile.readline(MAX_LINE)
+                response: Optional[str] = json.dumps(
+                    _error(None, INVALID_REQUEST, "Request too large")
+                )
+            elif not line.strip():
+                continue
+            else:
+                response = handle_message(line.decode("utf-8", errors="replace"))
+            if response is not None:
+                self.wfile.write(response.encode("utf-8") + b"\n")
+
+
+def _remove_stale(path: str) -> None:
+    """Remove a socket at ``path`` if no server listens on it anymore"""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+
+
+def create_server(path: str) -> socketserver.BaseServer:
+    """
+    Create a server listening on the Unix socket at ``path``
+
+    Each client is served by its own thread. A socket left over by a server that
+    is no longer running is replaced.
+    """
+    _remove_stale(path)
+    server = socketserver.ThreadingUnixStreamServer(path, _RequestHandler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_socket(path: str) -> None:
+    """Answer clients connecting to the Unix socket at ``path`` until interrupted"""
+    _warm_up()
+    with create_server(path) as server:
+        log.info(f"serving on {path}")
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
@@ -0,0 +1,127 @@
+"""Convert a stream of expressions, such as the lines of stdin, record by record.
+
+Each input line is either a plain expression, or an NDJSON record of the form
+``{"id": 7, "expression": "?int"}`` whose optional ``id`` may be any JSON value. For
+each line, a JSON object with the ``id`` of the record, or else the line number, is
+written with either the ``result`` or an ``error`` of the conversion:
+
+.. code:: none
+
+    {"id": 7, "result": "typing.Optional[int]"}
+    {"id": 8, "error": {"type": "ParseError", "message": "Expected ..."}}
+
+Blank lines are skipped. Lines are read and converted lazily, and results are
+written in the order of inputs, so that memory does not grow for unbounded input.
+"""
+import functools
+import json
+from typing import Any, Iterable, Iterator, Optional, TextIO, Tuple
+
+from stenotype.backend import pipeline
+
+__all__ = ["process_line", "process_lines", "stream"]
+
+
+class InvalidRecord(ValueError):
+    """An NDJSON line is not an object with a string ``expression``"""
+
+
+def _record(line: str, number: int) -> Tuple[Any, str]:
+    """Get the id, defaulting to the line ``number``, and expression of a record"""
+    record = json.loads(line)
+    if not isinstance(record, dict) or not isinstance(record.get("expression"), str):
+        raise InvalidRecord("record must be an object with a string 'expression'")
+    return record.get("id", number), record["expression"]
+
+
+def process_line(
+    numbered: Tuple[int, str],
+    ndjson: bool = False,
+    shorten: bool = False,
+    engine: Optional[str] = None,
+) -> Optional[Tuple[str, bool]]:
+    """
+    Convert a single line and format the outcome as a JSON object
+
+    :param numbered: the line number and the line
+    :param ndjson: whether the line is an NDJSON record instead of an expression
+    :param shorten: whether to shorten typing expressions instead of converting
+    :param engine: the parser engine, see :py:func:`~stenotype.backend.grammar.parse`
+    :returns: the JSON object and whether it is an error,
+        or :py:data:`None` for blank lines
+    """
+    number, line = numbered
+    if not line.strip():
+        return None
+    identifier: Any = number
+    try:
+        if ndjson:
+            identifier, expression = _record(line, number)
+        else:
+            expression = line.strip()
+        result = (pipeline.shorten if shorten else pipeline.convert)(expression, engine)
+    except pipeline.ERRORS as err:
+        error = {"type": err.__class__.__name__, "message": str(err)}
+        return json.dumps({"id": identifier, "error": error}), True
+    return json.dumps({"id": identifier, "result": result}), False
+
+
+def process_lines(
+    lines: Iterable[str],
+    ndjson: bool = False,
+    shorten: bool = False,
+    jobs: int = 1,
+    engine: Optional[str] = None,
+) -> Iterator[Tuple[str, bool]]:
+    """
+    Lazily convert ``lines``, see :py:func:`~.process_line` for the parameters
+
+    :param jobs: number of worker processes, or ``0`` for one per CPU
+
+    With several ``jobs``, the lines are processed in chunks by a
+    :py:class:`~stenotype.backend.parallel.ProcessConverter`, of which only a few
+    are in flight at any time.
+    """
+    process = functools.partial(
+        process_line, ndjson=ndjson, shorten=shorten, engine=engine
+    )
+    numbered = enumerate(lines, 1)
+    if jobs == 1:
+        outcomes: Iterable[Optional[Tuple[str, bool]]] = map(process, numbered)
+        yield from filter(None, outcomes)
+        return
+    from stenotype.backend.parallel import ProcessConverter
+
+    with ProcessConverter(jobs=jobs or None, chunksize=64, engine=engine) as converter:
+        yield from filter(None, converter.map(process, numbered))
+
+
+def stream(
+    lines: Iterable[str],
+    out_stream: TextIO,
+    ndjson: bool = False,
+    shorten: bool = False,
+    jobs: int = 1,
+    flush_every: int = 256,
+    engine: Optional[str] = None,
+) -> int:
+    """
+    Convert ``lines`` and write a JSON object per line to ``out_stream``
+
+    :param flush_every: number of objects to write before flushing ``out_stream``
+
+    See :py:func:`~.process_lines` for the other parameters. The output is flushed
+    whenever ``flush_every`` objects are written, and once all lines are done.
+
+    :returns: the number of lines that could not be converted
+    """
+    errors, pending = 0, 0
+    for output, failed in process_lines(lines, ndjson, shorten, jobs, engine):
+        errors += failed
+        out_stream.write(output + "\n")
+        pending += 1
+        if pending >= flush_every:
+            out_stream.flush()
+            pending = 0
+    out_stream.flush()
+    return errors
@@ -10,7 +10,6 @@ would lead to circular dependencies down the line. Code that is needed here shou
 have been here from the start.
 """
 from logging import getLogger
-from logging.config import dictConfig
 
 log = getLogger(__name__)
 
@@ -19,13 +18,44 @@ class StenotypeException(Exception):
     pass
 
 
-def setup_logging(loglevel: str):
+class ParseError(StenotypeException):
+    """A string is not a valid stenotype or typing expression"""
+
+    def __init__(self, message: str, string: str, loc: int):
+        super().__init__(f"{message} (at char {loc}) in {string!r}")
+        self.message = message
+        self.string = string
+        self.loc = loc
+
+    def __reduce__(self):
+        return self.__class__, (self.message, self.string, self.loc)
+
+
+class LimitExceeded(StenotypeException):
+    """Parsing a string would exceed a limit on the resources it may use"""
+
+    def __init__(self, limit: str, value: float, string: str):
+        shown = string if len(string) <= 64 else f"{string[:61]}..."
+        super().__init__(f"Exceeded the {limit} of {value} in {shown!r}")
+        self.limit = limit
+        self.value = value
+        self.string = string
+
+    def __reduce__(self):
+        return self.__class__, (self.limit, self.value, self.string)
+
+
+def setup_logging(loglevel: str, stream: str = "ext://sys.stdout"):
     """Set up basic logging to stdout.
 
     Args:
         loglevel: Can be any of [DEBUG, INFO, WARNING, ERROR, CRITICAL]
+        stream: The stream to log to, such as "ext://sys.stderr"
 
     """
+    # logging.config is slow to import and only needed by the CLI
+    from logging.config import dictConfig
+
     dictConfig(
         {
             "version": 1,
@@ -40,7 +70,7 @@ def setup_logging(loglevel: str):
                     "level": loglevel,
                     "formatter": "standard",
                     "class": "logging.StreamHandler",
-                    "stream": "ext://sys.stdout",
+                    "stream": stream,
                 }
             },
             "loggers": {
@@ -0,0 +1,183 @@
+"""Test conversion for asyncio event loops."""
+
+import asyncio
+import contextlib
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from stenotype.backend import asynchronous
+from stenotype.backend.asynchronous import AsyncConverter
+from stenotype.backend.grammar import parse
+from stenotype.backend.pipeline import convert
+from stenotype.util import ParseError
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class Calls(list):
+    """Strings converted by workers, which wait for ``release`` if it is set"""
+
+    release = None
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = Calls()
+    call = asynchronous._call
+
+    def recording_call(name, string, engine):
+        calls.append(string)
+        if calls.release is not None:
+            calls.release.wait(5)
+        return call(name, string, engine)
+
+    monkeypatch.setattr(asynchronous, "_call", recording_call)
+    return calls
+
+
+def test_functions():
+    async def main():
+        return (
+            await asynchronous.convert("?[int]"),
+            await asynchronous.shorten("typing.List[int]"),
+            await asynchronous.parse("int"),
+        )
+
+    assert run(main()) == ("typing.Optional[typing.List[int]]", "[int]", ("int",))
+
+
+def test_errors():
+    converter = AsyncConverter(engine="descent")
+    with pytest.raises(ParseError):
+        run(converter.convert("int or or"))
+    with pytest.raises(ParseError):
+        run(converter.convert("int or or"))
+
+
+def test_cached(calls):
+    converter = AsyncConverter(engine="descent")
+    convert.cache_clear()
+    assert run(converter.convert("{str: ?int}")) == convert("{str: ?int}", "descent")
+    assert run(converter.convert("{str: ?int}")) == convert("{str: ?int}", "descent")
+    assert calls == ["{str: ?int}"]
+
+
+def test_merged(calls):
+    converter = AsyncConverter(engine="descent")
+    convert.cache_clear()
+
+    async def main():
+        requests = [converter.convert(steno) for steno in ["?int", "?str"] * 10]
+        return await asyncio.gather(*requests)
+
+    results = run(main())
+    assert results == ["typing.Optional[int]", "typing.Optional[str]"] * 10
+    assert sorted(calls) == ["?int", "?str"]
+    assert not converter._in_flight
+
+
+def test_cancel(calls):
+    calls.release = threading.Event()
+    converter = AsyncConverter(ThreadPoolExecutor(1), max_pending=1, engine="descent")
+    convert.cache_clear()
+
+    async def main():
+        running = asyncio.ensure_future(converter.convert("?bytes"))
+        waiting = asyncio.ensure_future(converter.convert("?float"))
+        shared = [asyncio.ensure_future(converter.convert("?int")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        shared[0].cancel()
+        await asyncio.sleep(0.01)
+        calls.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        return await running, await shared[1]
+
+    assert run(main()) == ("typing.Optional[bytes]", "typing.Optional[int]")
+    # the cancelled request never reached the worker
+    assert calls == ["?bytes", "?int"]
+    converter.executor.shutdown()
+
+
+def test_cancel_overlapping(calls):
+    """A request right after the last one was cancelled starts a new conversion"""
+    calls.release = threading.Event()
+    converter = AsyncConverter(ThreadPoolExecutor(1), max_pending=1, engine="descent")
+    convert.cache_clear()
+
+    async def main():
+        first = asyncio.ensure_future(converter.convert("?int"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        # requested before the cancelled conversion is done
+        second = asyncio.ensure_future(converter.convert("?int"))
+        calls.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert run(main()) == "typing.Optional[int]"
+    assert not converter._in_flight
+    converter.executor.shutdown()
+
+
+def test_processes():
+    convert.cache_clear()
+    with ProcessPoolExecutor(2) as executor:
+        converter = AsyncConverter(executor, max_pending=2, engine="descent")
+
+        async def main():
+            return await asyncio.gather(
+                *(converter.convert(f"[{steno}]") for steno in "abcd")
+            )
+
+        assert run(main()) == [f"typing.List[{steno}]" for steno in "abcd"]
+    # results of the workers are cached by this process
+    assert convert.cache_info().currsize == 4
+
+
+@pytest.mark.benchmark
+def test_benchmark_event_loop():
+    """Compare the longest stall of an event loop with and without an executor"""
+    names = [first + second for first in "abcdefgh" for second in "abcde"]
+    steno = "(" + ", ".join(f"?[{{str: {name} or None}}]" for name in names)
+    burst = [f"{steno}) -> {name}" for name in names[:16]]
+
+    async def measure(request):
+        stalls = []
+
+        async def tick():
+            while True:
+                start = time.perf_counter()
+                await asyncio.sleep(0)
+                stalls.append(time.perf_counter() - start)
+
+        ticker = asyncio.ensure_future(tick())
+        start = time.perf_counter()
+        await asyncio.gather(*map(request, burst))
+        seconds = time.perf_counter() - start
+        ticker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await ticker
+        return seconds, max(stalls)
+
+    async def blocking(string):
+        return convert(string, "pyparsing")
+
+    converter = AsyncConverter(engine="pyparsing")
+    print(f"\n{'method':<16} {'total':>10} {'longest stall':>14}")
+    for name, request in (("blocking", blocking), ("executor", converter.convert)):
+        convert.cache_clear()
+        parse.cache_clear()
+        seconds, stall = run(measure(request))
+        print(f"{name:<16} {seconds * 1000:>8.1f}ms {stall * 1000:>12.2f}ms")
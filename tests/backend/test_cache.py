@@ -0,0 +1,139 @@
+"""Test bounded memoization of conversions."""
+
+import sys
+
+import pytest
+
+from stenotype.backend import elements as ste
+from stenotype.backend.cache import (
+    LRUCache,
+    CacheInfo,
+    bounded_cache,
+    approximate_size,
+)
+from stenotype.backend import grammar
+from stenotype.backend.grammar import parse
+
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # "b" is the least recently used entry
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert len(cache) == 2
+
+
+def test_byte_budget():
+    entry_size = approximate_size("a") + approximate_size("b")
+    cache = LRUCache(maxsize=None, maxbytes=entry_size * 2)
+    cache.put("a", "b")
+    cache.put("c", "d")
+    cache.put("e", "f")
+    assert len(cache) == 2
+    assert cache.info().currbytes <= cache.info().maxbytes
+    # entries larger than the entire budget are never stored
+    cache.put("huge", "x" * 1024)
+    assert "huge" not in cache
+
+
+def test_resize():
+    cache = LRUCache(maxsize=8)
+    for i in range(8):
+        cache.put(i, i)
+    cache.resize(maxsize=2, maxbytes=None)
+    assert len(cache) == 2
+    assert 7 in cache
+
+
+def test_info_and_clear():
+    cache = LRUCache(maxsize=4, maxbytes=None)
+    cache.put("a", None)
+    assert cache.get("a", "default") is None
+    assert cache.get("b", "default") == "default"
+    info = cache.info()
+    assert info == CacheInfo(
+        hits=1, misses=1, maxsize=4, currsize=1, maxbytes=None, currbytes=info.currbytes
+    )
+    cache.clear()
+    assert cache.info() == CacheInfo(0, 0, 4, 0, None, 0)
+
+
+def test_approximate_size():
+    leaf = ste.Identifier("foo")
+    shared = ste.Union(leaf, leaf)
+    # shared members are only counted once
+    assert approximate_size(shared) == sys.getsizeof(shared) + approximate_size(leaf)
+    assert approximate_size(ste.List(leaf)) > approximate_size(leaf)
+
+
+def test_cached_function():
+    calls = []
+
+    @bounded_cache(maxsize=4)
+    def double(value, factor=2):
+        """Double a value"""
+        calls.append(value)
+        return value * factor
+
+    assert double(2) == 4
+    assert double(2) == 4
+    assert double(2, factor=3) == 6
+    assert calls == [2, 2]
+    assert double.cache_info().hits == 1
+    assert double.cache_info().misses == 2
+    assert double.__doc__ == "Double a value"
+    assert double.__wrapped__(2) == 4
+    double.cache_clear()
+    assert double.cache_info().currsize == 0
+
+
+def test_cached_exceptions():
+    calls = []
+
+    @bounded_cache(maxsize=4)
+    def fail(value):
+        calls.append(value)
+        raise ValueError(value)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            fail(1)
+    assert calls == [1, 1]
+
+
+def test_parse_cache():
+    parse.cache_clear()
+    first = parse("?[foo] or {bar: _}")
+    assert parse("?[foo] or {bar: _}") is first
+    info = parse.cache_info()
+    assert info.hits == 1 and info.misses == 1 and info.currsize == 1
+    assert info.currbytes > 0
+
+
+def test_parse_cache_engine(monkeypatch):
+    parse.cache_clear()
+    monkeypatch.setattr(grammar, "DEFAULT_ENGINE", "descent")
+    first = parse("?foo")
+    assert parse("?foo", None) is first
+    assert parse("?foo", engine=None) is first
+    assert parse("?foo", engine="descent") is first
+    assert parse.cache_info().currsize == 1
+    parse("?foo", engine="pyparsing")
+    assert parse.cache_info().currsize == 2
+
+
+def test_custom_key():
+    calls = []
+
+    @bounded_cache(maxsize=4, key=lambda value, factor=2: (value, factor))
+    def scale(value, factor=2):
+        calls.append(value)
+        return value * factor
+
+    assert scale(2) == scale(2, 2) == scale(2, factor=2) == 4
+    assert scale(2, 3) == 6
+    assert calls == [2, 2]
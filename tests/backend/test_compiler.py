@@ -0,0 +1,141 @@
+"""Test the single pass compiler against the separate passes."""
+
+import random
+import timeit
+
+import pytest
+
+from stenotype.backend import elements as ste
+from stenotype.backend.compiler import to_typing
+from stenotype.backend.grammar import parse
+from stenotype.backend.steno import unparse
+from stenotype.backend.typing import normalize
+from stenotype.backend.pipeline import ERRORS
+
+from .test_descent import tricky, benchmark_corpus
+from .test_dispatch import Percent
+
+
+def passes_or_error(steno):
+    try:
+        return unparse(normalize(parse(steno, "descent")))
+    except ERRORS as err:
+        return type(err), str(err)
+
+
+def compiler_or_error(steno):
+    try:
+        return to_typing(parse(steno, "descent"))
+    except ERRORS as err:
+        return type(err), str(err)
+
+
+def random_steno(rng: random.Random, depth: int) -> str:
+    """Create a random, mostly valid stenotype string"""
+    if depth <= 0 or rng.random() < 0.2:
+        return rng.choice(
+            ["int", "foo.bar", "_", "None", "True", "12", "'a'", 'b"x"', "-1"]
+        )
+
+    def inner():
+        return random_steno(rng, depth - 1)
+
+    def several(count=None):
+        return ", ".join(inner() for _ in range(count or rng.randint(1, 3)))
+
+    def parameter():
+        return rng.choice(["", "", "a: ", "b: "]) + inner()
+
+    return rng.choice(
+        [
+            lambda: f"?{inner()}",
+            lambda: f"{inner()} or {inner()}",
+            lambda: f"[{inner()}]",
+            lambda: f"{{{inner()}}}",
+            lambda: f"{{{inner()}: {inner()}}}",
+            lambda: f"({several()})",
+            lambda: f"({several()}, ...)",
+            lambda: f"{rng.choice(['iter', 'with', 'await', 'async iter'])} {inner()}",
+            lambda: f"typing.Dict[{several()}]",
+            lambda: f"Callable[[{several()}], {inner()}]",
+            lambda: f"typing.Callable[..., {inner()}]",
+            lambda: f"Callable[[{inner()}]]",
+            lambda: f"({', '.join(parameter() for _ in range(2))}) -> {inner()}",
+            lambda: f"({parameter()}, /, {parameter()}) -> {inner()}",
+            lambda: f"(*{rng.choice(['', 'args: _', '_', 'args: int'])}) -> {inner()}",
+            lambda: f"(*, k: {inner()}) -> {inner()}",
+            lambda: f"(...) -> {inner()}",
+        ]
+    )()
+
+
+def test_differential_tricky():
+    for steno in tricky:
+        assert compiler_or_error(steno) == passes_or_error(steno), steno
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_differential_generated(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        steno = random_steno(rng, depth=3)
+        assert compiler_or_error(steno) == passes_or_error(steno), steno
+
+
+@pytest.mark.parametrize(
+    "steno, expected",
+    [
+        ("(int) -> ?str", "typing.Callable[[int], typing.Optional[str]]"),
+        ("(?int, /) -> _", "typing.Callable[[typing.Optional[int]], typing.Any]"),
+        ("(*) -> R", "typing.Callable[[], R]"),
+        ("(...) -> [R]", "typing.Callable[..., typing.List[R]]"),
+        ("Callable[..., ?R]", "typing.Callable[..., typing.Optional[R]]"),
+        ("typing.Literal[42]", "typing.Literal[42]"),
+        ("Literal[1, 'a']", "Literal[1, 'a']"),
+    ],
+)
+def test_compiled(steno, expected):
+    assert to_typing(parse(steno)) == expected
+    assert to_typing(parse(expected)) == expected
+
+
+@pytest.mark.parametrize(
+    "steno", ["(a: int) -> R", "(*args: int) -> R", "(k: A, *, b: B) -> R"]
+)
+def test_errors(steno):
+    element = parse(steno)
+    with pytest.raises(ValueError) as exc_info:
+        normalize(element)
+    with pytest.raises(ValueError, match=str(exc_info.value)):
+        to_typing(element)
+
+
+def test_separate_passes():
+    element = ste.List(Percent(ste.Optional(ste.Any())))
+    assert to_typing(element) == ("typing.List[percent[typing.Optional[typing.Any]]]")
+    with pytest.raises(NotImplementedError):
+        to_typing(object())
+
+
+@pytest.mark.benchmark
+def test_benchmark_compiler():
+    """Compare the compiler to the separate passes over parsed elements"""
+    print(f"\n{'expression':<50} {'passes':>10} {'compiler':>10} {'speedup':>8}")
+    for steno in benchmark_corpus:
+        if not isinstance(passes_or_error(steno), str):
+            continue
+        element = parse(steno, "descent")
+        timings = {}
+        for name, convert in (
+            ("passes", lambda: unparse(normalize(element))),
+            ("compiler", lambda: to_typing(element)),
+        ):
+            number = 200
+            timings[name] = (
+                min(timeit.repeat(convert, number=number, repeat=5)) / number
+            )
+        speedup = timings["passes"] / timings["compiler"]
+        print(
+            f"{steno:<50} {timings['passes'] * 1e6:>8.1f}us"
+            f" {timings['compiler'] * 1e6:>8.1f}us {speedup:>7.1f}x"
+        )
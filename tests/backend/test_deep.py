@@ -0,0 +1,88 @@
+"""Test conversion of expressions nested thousands of levels deep."""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from stenotype.backend import elements as ste
+from stenotype.backend.descent import parse_deep
+from stenotype.backend.grammar import parse
+from stenotype.backend.steno import unparse
+from stenotype.backend.typing import normalize
+from stenotype.util import ParseError
+
+
+def nested(depth: int) -> str:
+    """Create a string such as ``?[{str: ?[{str: ... int}]}]`` of ``depth`` levels"""
+    templates = ["?{}", "[{}]", "{{str: {}}}", "({}, int)", "iter {}", "Dict[str, {}]"]
+    steno = "int"
+    for level in range(depth):
+        steno = templates[level % len(templates)].format(steno)
+    return steno
+
+
+@pytest.mark.parametrize("steno", ["?[{str: ?[int or float]}]", "(a: A, *, b: B) -> R"])
+def test_shallow(steno):
+    assert parse_deep(steno) == parse(steno, "descent")
+
+
+def test_deep():
+    depth = 5000
+    steno = nested(depth)
+    with pytest.raises(RecursionError):
+        parse(steno, "descent")
+    tree = parse(steno, "deep")
+    assert unparse(tree) == steno
+    assert normalize(tree).base == ste.Identifier("typing", "List")
+    assert sys.getrecursionlimit() < depth
+
+
+def test_recursion_limit(monkeypatch):
+    """The recursion limit is shared by all threads, and is never changed"""
+
+    def setrecursionlimit(limit):
+        raise AssertionError(f"recursion limit set to {limit}")
+
+    monkeypatch.setattr(sys, "setrecursionlimit", setrecursionlimit)
+    steno = nested(2000)
+    assert unparse(parse_deep(steno)) == steno
+
+
+def test_concurrent():
+    strings = [nested(depth) for depth in (1000, 2000, 3000, 4000)]
+    trees = {}
+
+    def run(steno):
+        trees[steno] = parse_deep(steno)
+
+    threads = [threading.Thread(target=run, args=(steno,)) for steno in strings]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [unparse(trees[steno]) for steno in strings] == strings
+
+
+def test_deep_error():
+    steno = nested(5000) + "]"
+    with pytest.raises(ParseError) as exc_info:
+        parse_deep(steno)
+    assert exc_info.value.loc == len(steno) - 1
+
+
+def convert_seconds(depth: int) -> float:
+    steno = nested(depth)
+    start = time.perf_counter()
+    unparse(normalize(parse_deep(steno)))
+    return time.perf_counter() - start
+
+
+def test_linear():
+    """Time per level does not grow with the depth"""
+    convert_seconds(1000)
+    small = min(convert_seconds(1000) for _ in range(3))
+    large = min(convert_seconds(8000) for _ in range(3))
+    # 8 times the depth, allowing for plenty of noise but not quadratic growth
+    assert large < 8 * 4 * small
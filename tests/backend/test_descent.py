@@ -0,0 +1,85 @@
+"""Test the recursive descent parser against the pyparsing grammar."""
+
+import timeit
+
+import pytest
+
+from stenotype.backend import descent
+from stenotype.backend.grammar import parse_pyparsing
+from stenotype.util import ParseError, StenotypeException
+
+
+# fmt: off
+# expressions where the pyparsing grammar backtracks or rejects input
+tricky = [
+    "?a or b", "a or ?b or c", "iter a or b", "(a, b) or c", "x or (a) -> b",
+    "(A) -> R or B", "?(a) -> b", "[(a) -> b]", "(a: A or B) -> R",
+    "(A, ...)", "(A, ..., B)", "(...)", "(...) -> R", "(a, ...) -> R", "(a: A)",
+    "Callable[[A], R, S]", "Callable[[A] or B, R]", "Callable[[A]]", "Callable[[A, B]]",
+    "Callable[[A], R] or B", "typing . Callable[..., R]", "Callable", "typing.Callable",
+    "(*) -> R", "() -> R", "(*_: A) -> R", "(**kw: K) -> R", "(A, **k: K) -> R",
+    "(*, **k: K) -> R", "(a: A, b) -> R", "(*a: A, b) -> R", "(a, b, /, c) -> (d)",
+    "(*, a: A, **k: K, ) -> R", "(/, a) -> R", "(a, /, /) -> R",
+    "iter1", "True1", "iterx", "_x", "foo_bar", "async  iter a", "async iterx a",
+    "b", "b or c", 'b "x"', "[b'x']", "- 1", "-1", "??a", "? ?a", "{a: b, c}",
+    "with", "Tuple[int, ...]", "a.b.c[d, e][f]", "foo . bar", "", "  ",
+]
+# fmt: on
+
+
+def parse_or_error(parser, steno):
+    try:
+        return parser(steno)
+    except ParseError:
+        return ParseError
+
+
+@pytest.mark.parametrize("steno", tricky)
+def test_equivalence(steno):
+    expected = parse_or_error(parse_pyparsing, steno)
+    parsed = parse_or_error(descent.parse, steno)
+    assert parsed == expected
+    assert repr(parsed) == repr(expected)
+
+
+@pytest.mark.parametrize(
+    "steno, loc", [("[foo", 4), ("foo or", 6), ("(a: A)", 6), ("foo $", 4)]
+)
+def test_errors(steno, loc):
+    with pytest.raises(ParseError) as exc_info:
+        descent.parse(steno)
+    assert isinstance(exc_info.value, StenotypeException)
+    assert exc_info.value.loc == loc
+
+
+# fmt: off
+benchmark_corpus = [
+    "str", "typing.List", "Dict[str, str]", "?foo", "foo or bar", "[foo] or [bar]",
+    "{str: _}", "(foo, bar, ...)", "iter foo", "async with foo", '"foo bar"',
+    "typing.Callable[[A, B, C], R]", "(a: A, B, /, C, d: D, *e: E, f: F, **g: G) -> R",
+    "?[{str: ?[int or float]}]", "{a: {b: {c: d}}}", "(a: (B) -> C) -> (D) -> E",
+]
+# fmt: on
+
+
+@pytest.mark.benchmark
+def test_benchmark_engines():
+    """Compare the descent parser to the pyparsing grammar"""
+    print(f"\n{'expression':<50} {'pyparsing':>10} {'descent':>10} {'speedup':>8}")
+    for steno in benchmark_corpus:
+        timings = {}
+        for name, parser in (
+            ("pyparsing", parse_pyparsing),
+            ("descent", descent.parse),
+        ):
+            number = 10
+            timings[name] = (
+                min(timeit.repeat(lambda: parser(steno), number=number, repeat=5))
+                / number
+            )
+        speedup = timings["pyparsing"] / timings["descent"]
+        print(
+            f"{steno:<50} {timings['pyparsing'] * 1e6:8.0f}us"
+            f" {timings['descent'] * 1e6:8.0f}us {speedup:7.1f}x"
+        )
+        assert speedup > 1
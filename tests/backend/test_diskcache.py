@@ -0,0 +1,59 @@
+"""Test the persistent cache of conversion results."""
+
+import os
+
+from stenotype.backend.diskcache import DiskCache, digest, fingerprint
+
+
+def test_digest():
+    assert digest("a", "bc") != digest("ab", "c")
+    assert digest("a") == digest(b"a")
+    assert len(fingerprint()) == 16
+
+
+def test_get_put(tmp_path):
+    cache = DiskCache(tmp_path / "cache")
+    key = digest("key")
+    assert cache.get(key) is None
+    cache.put(key, [1, {"a": None}])
+    assert cache.get(key) == [1, {"a": None}]
+    assert DiskCache(tmp_path / "cache").get(key) == [1, {"a": None}]
+    # only complete entries remain, and the cache is excluded from version control
+    paths = {path.name for path in (tmp_path / "cache").rglob("*") if path.is_file()}
+    assert paths == {f"{key}.json", ".gitignore"}
+
+
+def test_corrupt_entry(tmp_path):
+    cache = DiskCache(tmp_path)
+    key = digest("key")
+    cache.put(key, "value")
+    (path,) = tmp_path.glob(f"*/*/{key}.json")
+    path.write_text('{"trunc')
+    assert cache.get(key) is None
+
+
+def test_update(tmp_path):
+    cache, other = DiskCache(tmp_path), DiskCache(tmp_path)
+    key = digest("key")
+    cache.update(key, {"a": 1})
+    other.update(key, {"b": 2})
+    assert cache.get(key) == {"a": 1, "b": 2}
+
+
+def test_prune(tmp_path):
+    cache = DiskCache(tmp_path, maxbytes=None)
+    keys = [digest(str(index)) for index in range(10)]
+    for age, key in enumerate(keys):
+        cache.put(key, "x" * 100)
+        (path,) = tmp_path.glob(f"*/*/{key}.json")
+        os.utime(path, (1000 + age, 1000 + age))
+    assert cache.prune() == 0
+    # reading an entry marks it as recently used
+    cache.get(keys[0])
+    cache.maxbytes = 500
+    assert cache.prune() == 6
+    assert cache.get(keys[0]) is not None
+    assert all(cache.get(key) is None for key in keys[1:7])
+    assert all(cache.get(key) is not None for key in keys[7:])
+    cache.clear()
+    assert cache.get(keys[0]) is None
@@ -0,0 +1,120 @@
+import functools
+import timeit
+from typing import NamedTuple
+
+import pytest
+
+from stenotype.backend import elements as ste
+from stenotype.backend.dispatch import typedispatch
+from stenotype.backend.steno import unparse
+from stenotype.backend.typing import normalize
+
+
+def test_dispatch():
+    @typedispatch
+    def describe(element) -> str:
+        """Describe an element"""
+        return "default"
+
+    @describe.register(ste.Optional)
+    def describe_optional(element):
+        return "optional"
+
+    class Special(ste.Optional):
+        pass
+
+    assert describe.__doc__ == "Describe an element"
+    assert describe(ste.Optional(ste.Any())) == "optional"
+    assert describe(Special(ste.Any())) == "optional"
+    assert describe(ste.Any()) == "default"
+    # new handlers replace those found for subclasses
+    describe.register(Special, lambda element: "special")
+    assert describe(Special(ste.Any())) == "special"
+    assert describe(ste.Optional(ste.Any())) == "optional"
+    assert describe.dispatch(ste.List) is describe.default
+
+
+class Percent(NamedTuple):
+    """A third party element, ``%base``"""
+
+    base: ste.Steno
+
+
+@normalize.register(Percent)
+def normalize_percent(element: Percent) -> ste.Generic:
+    return ste.Generic(ste.Identifier("percent"), (normalize(element.base),))
+
+
+@unparse.register(Percent)
+def unparse_percent(element: Percent) -> str:
+    return f"%{unparse(element.base)}"
+
+
+def test_third_party():
+    element = ste.List(Percent(ste.Any()))
+    assert unparse(element) == "[%_]"
+    assert unparse(normalize(element)) == "typing.List[percent[typing.Any]]"
+
+
+def count_with(dispatch):
+    """Create a function counting the nodes of a tree via ``dispatch``"""
+
+    @dispatch
+    def count(element) -> int:
+        return 1
+
+    def count_base(element) -> int:
+        return 1 + count(element.base)
+
+    def count_members(element) -> int:
+        return 1 + sum(map(count, element))
+
+    for cls in (ste.Optional, ste.Iterable, ste.Awaitable):
+        count.register(cls, count_base)
+    count.register(ste.List, lambda element: 1 + count(element.values))
+    count.register(ste.Union, count_members)
+    count.register(ste.Generic, lambda element: 1 + count_members(element.parameters))
+    return count
+
+
+def deep_tree(depth: int) -> ste.Steno:
+    tree: ste.Steno = ste.Identifier("foo")
+    kinds = (ste.Optional, ste.List, ste.Iterable, ste.Awaitable)
+    for level in range(depth):
+        tree = kinds[level % len(kinds)](tree)
+    return tree
+
+
+def wide_tree(width: int) -> ste.Steno:
+    return ste.Union(
+        *(
+            ste.Generic(ste.Identifier("typing", "List"), (ste.Identifier("foo"),))
+            for _ in range(width)
+        )
+    )
+
+
+@pytest.mark.parametrize("tree", [deep_tree(100), wide_tree(100)])
+def test_count(tree):
+    assert count_with(typedispatch)(tree) == count_with(functools.singledispatch)(tree)
+
+
+@pytest.mark.benchmark
+def test_benchmark_dispatch():
+    """Compare dispatch tables to ``singledispatch`` on deep and wide trees"""
+    print(f"\n{'tree':<20} {'singledispatch':>15} {'typedispatch':>15} {'speedup':>8}")
+    for name, tree in (
+        ("deep 200", deep_tree(200)),
+        ("wide 5000", wide_tree(5000)),
+    ):
+        timings = {}
+        for dispatch in (functools.singledispatch, typedispatch):
+            count = count_with(dispatch)
+            timings[dispatch] = min(
+                timeit.repeat(lambda: count(tree), number=10, repeat=5)
+            )
+        speedup = timings[functools.singledispatch] / timings[typedispatch]
+        print(
+            f"{name:<20} {timings[functools.singledispatch] * 1e2:>13.2f}ms"
+            f" {timings[typedispatch] * 1e2:>13.2f}ms {speedup:>7.1f}x"
+        )
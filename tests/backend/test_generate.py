@@ -0,0 +1,83 @@
+import io
+
+import pytest
+
+from stenotype.backend import elements as ste
+from stenotype.backend.generate import CONSTRUCTS, Generator, roundtrip, write_corpus
+from stenotype.backend.steno import unparse
+
+
+def element_types(tree):
+    """Find the types of all elements in ``tree``"""
+    types, stack = set(), [tree]
+    while stack:
+        element = stack.pop()
+        types.add(type(element))
+        if isinstance(element, ste.Signature):
+            stack.extend(
+                parameter
+                for parameter in (
+                    *element.positional,
+                    *element.mixed,
+                    element.args,
+                    *element.keywords,
+                    element.kwargs,
+                )
+                if parameter is not None
+            )
+            stack.append(element.returns)
+        elif isinstance(element, ste.Parameter):
+            stack.append(element.base)
+        elif isinstance(element, tuple) and not isinstance(element, ste.Literal):
+            stack.extend(child for child in element if isinstance(child, tuple))
+            stack.extend(
+                child for child in element if isinstance(child, (ste.Dots, ste.Any))
+            )
+    return types
+
+
+def test_seeded():
+    first = list(Generator(seed=7).strings(50))
+    assert first == list(Generator(seed=7).strings(50))
+    assert first != list(Generator(seed=8).strings(50))
+
+
+def test_coverage():
+    types = set()
+    for tree in Generator(seed=0, max_depth=3).trees(500):
+        types |= element_types(tree)
+    assert types >= set(ste.Steno.__args__)  # type: ignore
+
+
+@pytest.mark.parametrize("engine", ["descent", "pyparsing"])
+def test_roundtrip(engine):
+    count = 2000 if engine == "descent" else 100
+    generator = Generator(seed=1, max_depth=4 if engine == "descent" else 2)
+    for tree in generator.trees(count):
+        assert roundtrip(tree, engine), unparse(tree)
+
+
+def test_options():
+    generator = Generator(
+        seed=2, max_depth=2, max_width=8, weights={"union": 5, "literal": 0}
+    )
+    for tree in generator.trees(200):
+        assert ste.Literal not in element_types(tree)
+    for tree in Generator(seed=3, max_depth=0).trees(50):
+        assert type(tree) in (ste.Identifier, ste.Any, ste.Literal)
+    with pytest.raises(ValueError):
+        Generator(weights={"foo": 1})
+    with pytest.raises(ValueError):
+        Generator(weights={"identifier": 0, "any": 0, "literal": 0})
+    assert "signature" in CONSTRUCTS
+
+
+def test_write_corpus(tmp_path):
+    stream = io.StringIO()
+    written = write_corpus(stream, 100, Generator(seed=4))
+    assert written == len(stream.getvalue())
+    path = tmp_path / "corpus.txt"
+    write_corpus(path, 100, Generator(seed=4))
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines == stream.getvalue().splitlines()
+    assert lines == list(Generator(seed=4).strings(100))
@@ -1,6 +1,7 @@
 import pytest
 
 from stenotype.backend import elements as ste
+from stenotype.backend import grammar, rules
 from stenotype.backend.grammar import parse
 
 
@@ -197,6 +198,15 @@ signatures = [
 # fmt: on
 
 
+@pytest.fixture(autouse=True, params=sorted(grammar.ENGINES))
+def engine(request, monkeypatch):
+    """Run every test with each parser engine"""
+    monkeypatch.setattr(grammar, "DEFAULT_ENGINE", request.param)
+    parse.cache_clear()
+    yield request.param
+    parse.cache_clear()
+
+
 @pytest.mark.parametrize("literal", literals)
 def test_literals(literal):
     # testing literals is a little different from other types
@@ -253,3 +263,27 @@ def test_reprs():
     assert "Literal(value=Ellipsis)" == f"{parse('Ellipsis')}"
     assert "Identifier('foo', 'bar')" == f"{parse('foo.bar')}"
     assert "Union(Identifier('foo'), Identifier('bar'))" == f"{parse('foo or bar')}"
+
+
+@pytest.fixture
+def packrat():
+    grammar.enable_packrat(maxsize=16)
+    yield
+    grammar.disable_packrat()
+
+
+@pytest.mark.parametrize(
+    "steno, parsed", typing + terminals + specials + shorthands + callables + signatures
+)
+def test_packrat(packrat, steno, parsed):
+    assert grammar.parse_pyparsing(steno) == parsed
+
+
+def test_packrat_scope(packrat):
+    from pyparsing import ParserElement, Word, nums
+
+    assert ParserElement._parse is ParserElement._parseNoCache
+    assert "_parse" not in Word(nums).__dict__
+    assert "_parse" in rules.TYPE.__dict__
+    grammar.disable_packrat()
+    assert "_parse" not in rules.TYPE.__dict__
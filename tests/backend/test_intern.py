@@ -0,0 +1,108 @@
+"""Test hash-consing of element trees."""
+
+import gc
+import itertools
+import tracemalloc
+
+import pytest
+
+from stenotype.backend import elements as ste, descent
+from stenotype.backend.intern import Interner, intern
+from stenotype.backend.typing import normalize
+
+
+# fmt: off
+elements = [
+    "?[int] or [str]", "(a: A, *_) -> {x: _}", "(int, ...)", "typing.Callable[..., R]",
+    "b'x' or 'x' or 1 or True or None", "async with iter await {int}",
+]
+# fmt: on
+
+
+@pytest.mark.parametrize("steno", elements)
+def test_intern_equal(steno):
+    interner = Interner()
+    element = descent.parse(steno)
+    interned = interner(element)
+    assert interned == element
+    assert repr(interned) == repr(element)
+    assert interner(descent.parse(steno)) is interned
+
+
+def test_intern_shared():
+    interner = Interner()
+    first = interner(descent.parse("[int] or ?[int]"))
+    second = interner(descent.parse("?[int]"))
+    assert first[0] is second.base
+    assert first[1] is second
+    normalized = interner(normalize(descent.parse("[str]")))
+    assert normalized.base is interner(ste.Identifier("typing", "List"))
+
+
+def test_intern_types():
+    interner = Interner()
+    # equal as tuples, but still different elements
+    assert interner(ste.Identifier("a")) is not interner(ste.Literal("a"))
+    assert interner(ste.Literal(True)) is not interner(ste.Literal(1))
+    assert interner(ste.Literal(True)).value is True
+
+
+def test_intern_bounded():
+    interner = Interner(maxsize=8)
+    for index in range(100):
+        interner(ste.List(ste.Identifier(f"name{index}")))
+    assert len(interner) == interner.info().maxsize == 8
+    # evicted children do not affect interned parents
+    element = interner(descent.parse("{a: b}"))
+    for index in range(100):
+        interner(ste.Identifier(f"name{index}"))
+    again = interner(descent.parse("{a: b}"))
+    assert again == element
+    interner.clear()
+    assert len(interner) == 0 and interner.info().hits == 0
+
+
+def test_intern_default():
+    assert intern(ste.Identifier("foo", "bar")) is intern(ste.Identifier("foo", "bar"))
+
+
+def corpus(count):
+    names = ["int", "str", "bytes", "foo.Bar", "typing.Any", "T"]
+    templates = [
+        "?[{{{0}: {1}}}] or {2}",
+        "({0}, {1}, ...) or [{2}]",
+        "({0}, ?{1}) -> [{2}]",
+        "iter {{{0}}} or await ?{1} or {2}",
+    ]
+    combinations = itertools.cycle(itertools.product(templates, names, names, names))
+    for index, (template, *parts) in zip(range(count), combinations):
+        # names may not contain digits, so make each string unique using letters
+        suffix = "".join(chr(ord("a") + int(digit)) for digit in str(index))
+        yield template.format(*parts).replace("T", f"T{suffix}")
+
+
+@pytest.mark.benchmark
+def test_benchmark_memory():
+    """Compare the memory of plain and interned normalized trees of a large corpus"""
+    strings = list(corpus(20000))
+    gc.collect()
+    tracemalloc.start()
+    trees = [normalize(descent.parse(string)) for string in strings]
+    plain = tracemalloc.get_traced_memory()[0]
+    del trees
+    gc.collect()
+    tracemalloc.stop()
+    tracemalloc.start()
+    interner = Interner(maxsize=None)
+    trees = [interner(normalize(descent.parse(string))) for string in strings]
+    interned = tracemalloc.get_traced_memory()[0]
+    interner.clear()
+    gc.collect()
+    shared = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(
+        f"\n{len(strings)} trees: {plain / 2**20:.1f}MiB plain,"
+        f" {interned / 2**20:.1f}MiB interned including the interner,"
+        f" {shared / 2**20:.1f}MiB interned after clearing the interner"
+    )
+    assert shared < plain
@@ -0,0 +1,89 @@
+"""Test splitting of stenotype strings into tokens."""
+
+import timeit
+from keyword import kwlist
+
+import pytest
+
+from stenotype.backend import rules
+from stenotype.backend.lexer import Token, tokenize, KEYWORDS
+from stenotype.util import ParseError
+
+
+# fmt: off
+tokens = [
+    ("typing.List", [("NAME", "typing"), (".", "."), ("NAME", "List")]),
+    ("?foo or _", [("?", "?"), ("NAME", "foo"), ("or", "or"), ("_", "_")]),
+    ("(a: A, *, **k) -> R", [
+        ("(", "("), ("NAME", "a"), (":", ":"), ("NAME", "A"), (",", ","), ("*", "*"),
+        (",", ","), ("**", "**"), ("NAME", "k"), (")", ")"), ("->", "->"),
+        ("NAME", "R"),
+    ]),
+    ("(A, ...)", [("(", "("), ("NAME", "A"), (",", ","), ("...", "..."), (")", ")")]),
+    ("async iter await with iter", [
+        ("async iter", "async iter"), ("await", "await"), ("with", "with"),
+        ("iter", "iter"),
+    ]),
+    ("True False None Ellipsis", [
+        ("True", "True"), ("False", "False"), ("None", "None"),
+        ("Ellipsis", "Ellipsis"),
+    ]),
+    ("-12 34", [("INT", "-12"), ("INT", "34")]),
+    ("'a' \"b\\\"\"", [("STRING", "'a'"), ("STRING", '"b\\""')]),
+    ("b'a' b \"b\" bar", [("BYTES", "b'a'"), ("BYTES", 'b "b"'), ("NAME", "bar")]),
+    # keywords must not be followed by identifier characters
+    ("iterable iter1 True_", [
+        ("NAME", "iterable"), ("NAME", "iter"), ("INT", "1"), ("NAME", "True"),
+        ("_", "_"),
+    ]),
+]
+# fmt: on
+
+
+@pytest.mark.parametrize("string, expected", tokens)
+def test_tokens(string, expected):
+    *result, end = tokenize(string)
+    assert [(token.kind, token.value) for token in result] == expected
+    assert end == Token("END", "", len(string), len(string))
+
+
+def test_offsets():
+    string = "  Dict[ str ,int]"
+    for token in tokenize(string):
+        assert string[token.start : token.end] == token.value
+
+
+@pytest.mark.parametrize("word", kwlist)
+def test_keywords(word):
+    (token, _) = tokenize(word)
+    assert token.kind == KEYWORDS[word]
+    assert token.kind != "NAME"
+
+
+@pytest.mark.parametrize("string, loc", [("foo $", 4), ("_x", 0), ("a\tß", 2)])
+def test_errors(string, loc):
+    with pytest.raises(ParseError) as exc_info:
+        list(tokenize(string))
+    assert exc_info.value.loc == loc
+
+
+@pytest.mark.benchmark
+def test_benchmark_keywords():
+    """Compare keyword lookup of identifiers to matching each keyword in turn"""
+    from pyparsing import Keyword, MatchFirst, Word, alphas, delimitedList
+
+    keywords = MatchFirst(tuple(map(Keyword, KEYWORDS)))
+    backtracking = delimitedList(~keywords + Word(alphas), delim=".")
+    lookup = delimitedList(rules.WORD, delim=".")
+    identifier = "collections.abc.Mapping"
+    number = 1000
+    timings = {
+        name: min(timeit.repeat(lambda: rule.parseString(identifier), number=number))
+        / number
+        for name, rule in (("backtracking", backtracking), ("lookup", lookup))
+    }
+    print(
+        f"\n{identifier}: {timings['backtracking'] * 1e6:.0f}us with backtracking,"
+        f" {timings['lookup'] * 1e6:.0f}us with lookup"
+    )
+    assert timings["lookup"] < timings["backtracking"]
@@ -0,0 +1,189 @@
+"""Test limits on the resources used for parsing untrusted strings."""
+
+import pickle
+import time
+
+import pytest
+
+from stenotype.backend import grammar, pipeline, rules
+from stenotype.backend.limits import nesting_depth
+from stenotype.backend.parallel import convert_parallel
+from stenotype.util import LimitExceeded, StenotypeException
+
+
+ENGINES = ["pyparsing", "descent", "deep"]
+
+#: strings crafted to make parsing slow, each of which must fail fast
+adversarial = {
+    "parens": "(" * 5000,
+    "long": "a" * 100_000,
+    "union": " or ".join(["int"] * 5000),
+    "brackets": "typing.List[" * 200 + "int" + "]" * 200,
+    "prefixes": "?" * 3000 + "int",
+    "dicts": "{" * 40 + "a" + ": b}" * 40,
+    "optionals": "?[" * 8 + "a or b" + "]" * 8,
+    "tuples": "(" * 30 + "a, b" + ")" * 30,
+    "signatures": "(" * 20 + "a) -> b" * 20,
+}
+
+
+@pytest.fixture
+def limits():
+    def set_limits(**kwargs):
+        grammar.set_limits(**kwargs)
+        grammar.parse.cache_clear()
+        pipeline.convert.cache_clear()
+
+    yield set_limits
+    set_limits()
+
+
+@pytest.mark.parametrize(
+    "steno, depth",
+    [
+        ("int", 0),
+        ("foo or bar", 0),
+        ("[int]", 1),
+        ("?int", 1),
+        ("?[int]", 2),
+        ("{str: [int]}", 2),
+        ("(a: [A]) -> ?R", 2),
+        ("??int", 2),
+        ("?int or ?[str]", 2),
+        ("async iter [int]", 2),
+        ("(", 1),
+    ],
+)
+def test_nesting_depth(steno, depth):
+    assert nesting_depth(steno) == depth
+
+
+def test_unset(limits):
+    assert grammar.LIMITS is None
+    limits(max_depth=4)
+    assert grammar.LIMITS == (None, 4, None, None)
+    limits()
+    assert grammar.LIMITS is None
+    assert "_parse" not in rules.TYPE.__dict__
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize(
+    "kwargs, limit",
+    [
+        ({"max_length": 8}, "maximum length"),
+        ({"max_depth": 2}, "maximum depth"),
+        ({"max_steps": 4}, "maximum steps"),
+    ],
+)
+def test_exceeded(limits, engine, kwargs, limit):
+    steno = "?[{str: ?int}]"
+    limits(**kwargs)
+    with pytest.raises(LimitExceeded) as exc_info:
+        grammar.parse(steno, engine)
+    assert exc_info.value.limit == limit
+    assert exc_info.value.string == steno
+    assert isinstance(exc_info.value, StenotypeException)
+    with pytest.raises(LimitExceeded):
+        pipeline.convert(steno, engine)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_within(limits, engine):
+    limits(max_length=64, max_depth=4, max_steps=10_000, max_seconds=1)
+    assert pipeline.convert("?[{str: ?int}]", engine) == (
+        "typing.Optional[typing.List[typing.Dict[str, typing.Optional[int]]]]"
+    )
+    assert pipeline.convert("(A, B) -> R", engine) == "typing.Callable[[A, B], R]"
+
+
+def test_seconds(limits):
+    limits(max_seconds=0.01)
+    with pytest.raises(LimitExceeded, match="maximum seconds"):
+        grammar.parse(adversarial["optionals"] + " or " + adversarial["optionals"])
+
+
+def test_cached(limits):
+    limits()
+    grammar.parse("?[int]")
+    grammar.set_limits(max_depth=1)
+    assert grammar.parse("?[int]") is grammar.parse("?[int]", grammar.DEFAULT_ENGINE)
+    with pytest.raises(LimitExceeded):
+        grammar.parse("?[str]")
+
+
+def test_packrat(limits):
+    grammar.enable_packrat()
+    try:
+        limits(max_steps=100)
+        assert "_parse" in rules.TYPE.__dict__
+        with pytest.raises(LimitExceeded):
+            grammar.parse(adversarial["optionals"])
+        limits()
+        assert "_parse" in rules.TYPE.__dict__
+        assert grammar.parse("?[int or str]")
+    finally:
+        grammar.disable_packrat()
+    assert "_parse" not in rules.TYPE.__dict__
+
+
+def test_pickle():
+    error = LimitExceeded("maximum length", 8, "x" * 100)
+    copy = pickle.loads(pickle.dumps(error))
+    assert str(copy) == str(error)
+    assert (copy.limit, copy.value, copy.string) == ("maximum length", 8, "x" * 100)
+    assert str(error).endswith("xxx...'")
+
+
+def test_parallel(limits):
+    limits(max_depth=1)
+    outcomes = convert_parallel(["?int", "?[int]"], jobs=1, engine="descent")
+    (_, typing), (_, error) = outcomes
+    assert typing == "typing.Optional[int]"
+    assert isinstance(error, LimitExceeded)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("name", sorted(adversarial))
+def test_benchmark_adversarial_fast(limits, engine, name):
+    """Every adversarial string fails fast, as measured in wall time"""
+    limits(max_length=4096, max_depth=32, max_steps=20_000, max_seconds=0.5)
+    start = time.perf_counter()
+    try:
+        grammar.parse(adversarial[name], engine)
+    except StenotypeException:
+        pass
+    assert time.perf_counter() - start < 0.1
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_adversarial_limits(limits, engine):
+    """Every adversarial string exceeds some limit for the backtracking engine"""
+    limits(max_length=4096, max_depth=32, max_steps=20_000)
+    exceeded = set()
+    for name, steno in adversarial.items():
+        try:
+            grammar.parse(steno, engine)
+        except LimitExceeded:
+            exceeded.add(name)
+        except StenotypeException:
+            pass
+    assert {"parens", "long", "union", "brackets", "prefixes", "dicts"} <= exceeded
+    if engine == "pyparsing":
+        assert {"optionals", "tuples"} <= exceeded
+
+
+@pytest.mark.benchmark
+def test_benchmark_adversarial(limits):
+    steno = "?[" * 6 + "a or b" + "]" * 6
+    start = time.perf_counter()
+    grammar.parse.__wrapped__(steno)
+    unlimited = time.perf_counter() - start
+    limits(max_steps=20_000)
+    start = time.perf_counter()
+    with pytest.raises(LimitExceeded):
+        grammar.parse.__wrapped__(steno)
+    limited = time.perf_counter() - start
+    print(f"\nadversarial string: unlimited {unlimited:.3f}s, limited {limited:.3f}s")
+    assert limited < unlimited
@@ -0,0 +1,95 @@
+"""Test conversion using a pool of worker processes."""
+
+import multiprocessing
+import pickle
+import time
+
+import pytest
+
+from stenotype.backend.parallel import ProcessConverter, convert_parallel
+from stenotype.backend.pipeline import convert_many
+from stenotype.util import ParseError
+
+
+corpus = ["?int", "foo or bar", "[foo", "(a: A) -> R", "{str: _}", "?int", "x or"]
+
+
+def test_parse_error_pickle():
+    error = ParseError("Expected end of text", "[foo", 4)
+    copy = pickle.loads(pickle.dumps(error))
+    assert str(copy) == str(error)
+    assert (copy.string, copy.loc) == (error.string, error.loc)
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 100])
+def test_ordered(chunksize):
+    expected = [
+        (steno, str(outcome)) for steno, outcome in convert_many(corpus, window=0)
+    ]
+    with ProcessConverter(jobs=2, chunksize=chunksize) as converter:
+        result = [
+            (steno, str(outcome)) for steno, outcome in converter.convert_many(corpus)
+        ]
+    assert result == expected
+
+
+def test_unordered():
+    expected = sorted(
+        (steno, str(outcome)) for steno, outcome in convert_many(corpus, window=0)
+    )
+    outcomes = convert_parallel(corpus, jobs=2, chunksize=1, ordered=False)
+    result = sorted((steno, str(outcome)) for steno, outcome in outcomes)
+    assert result == expected
+
+
+def test_engine():
+    outcomes = convert_parallel(["?int", "[foo"], jobs=1, engine="descent")
+    (_, typing), (_, error) = outcomes
+    assert typing == "typing.Optional[int]"
+    assert isinstance(error, ParseError)
+    with pytest.raises(ValueError):
+        ProcessConverter(engine="unknown")
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_map(ordered):
+    with ProcessConverter(jobs=2, chunksize=2) as converter:
+        results = list(converter.map(abs, range(-5, 5), ordered=ordered))
+        assert sorted(results) == sorted(map(abs, range(-5, 5)))
+        with pytest.raises(TypeError):
+            list(converter.map(abs, ["a"], ordered=ordered))
+
+
+def test_errors():
+    outcomes = dict(convert_parallel(corpus, jobs=2, chunksize=3))
+    assert isinstance(outcomes["[foo"], ParseError)
+    assert outcomes["[foo"].loc == 4
+
+
+def test_lazy():
+    def strings():
+        yield "?int"
+        yield "?bool"
+        raise AssertionError("consumed too much input")
+
+    with ProcessConverter(jobs=1, chunksize=1) as converter:
+        results = converter.convert_many(strings())
+        # the single worker may only have two chunks in flight
+        assert next(results) == ("?int", "typing.Optional[int]")
+
+
+@pytest.mark.benchmark
+def test_benchmark_scaling():
+    """Show how conversion throughput scales with the number of workers"""
+    # distinct strings, so that the results of workers cannot be reused
+    corpus = [f"?[{{name{index}: (a: A, *b: B) -> R or S}}]" for index in range(500)]
+    print(f"\n{'jobs':>4} {'seconds':>8} {'speedup':>8}")
+    baseline = None
+    for jobs in range(1, multiprocessing.cpu_count() + 1):
+        with ProcessConverter(jobs=jobs, chunksize=256) as converter:
+            start = time.perf_counter()
+            for _ in converter.convert_many(corpus, ordered=False):
+                pass
+            duration = time.perf_counter() - start
+        baseline = baseline or duration
+        print(f"{jobs:>4} {duration:>8.2f} {baseline / duration:>7.1f}x")
@@ -0,0 +1,89 @@
+"""Test the chained conversion passes."""
+
+import itertools
+
+import pytest
+
+from stenotype.backend import elements as ste, grammar, pipeline
+from stenotype.backend.pipeline import convert, convert_many, parse_many
+from stenotype.util import ParseError, StenotypeException
+
+
+# fmt: off
+conversions = [
+    ("?int", "typing.Optional[int]"),
+    ("[int]", "typing.List[int]"),
+    ("{str: _}", "typing.Dict[str, typing.Any]"),
+    ("int or ?str", "typing.Union[int, typing.Optional[str]]"),
+]
+# fmt: on
+
+
+@pytest.mark.parametrize("steno, typing", conversions)
+def test_convert(steno, typing):
+    assert convert(steno) == typing
+
+
+def test_convert_cache():
+    convert.cache_clear()
+    for _ in range(3):
+        assert convert("?[int]") == "typing.Optional[typing.List[int]]"
+    info = convert.cache_info()
+    assert info.hits == 2 and info.misses == 1
+
+
+def test_convert_many():
+    results = list(convert_many(["?int", "[int", "?int", "(a: A) -> R"]))
+    assert [steno for steno, _ in results] == ["?int", "[int", "?int", "(a: A) -> R"]
+    assert results[0][1] == results[2][1] == "typing.Optional[int]"
+    assert isinstance(results[1][1], ParseError)
+    assert isinstance(results[3][1], ValueError)
+
+
+@pytest.mark.parametrize("engine", sorted(grammar.ENGINES))
+def test_convert_many_engine(engine, monkeypatch):
+    calls = []
+    parser = grammar.ENGINES[engine]
+
+    def record(steno_string):
+        calls.append(steno_string)
+        return parser(steno_string)
+
+    monkeypatch.setitem(grammar.ENGINES, engine, record)
+    grammar.parse.cache_clear()
+    convert.cache_clear()
+    results = list(convert_many(["?int", "[int]"], engine=engine))
+    assert results == [("?int", "typing.Optional[int]"), ("[int]", "typing.List[int]")]
+    assert calls == ["?int", "[int]"]
+
+
+def test_parse_many():
+    (_, first), (_, error), (_, again) = parse_many(["?foo", "foo or", "?foo"])
+    assert first == ste.Optional(ste.Identifier("foo"))
+    assert again is first
+    assert isinstance(error, ParseError)
+
+
+def test_many_dedupe(monkeypatch):
+    calls = []
+
+    def fail(steno_string, engine=None):
+        calls.append(steno_string)
+        raise StenotypeException(steno_string)
+
+    monkeypatch.setattr(pipeline, "convert", fail)
+    results = list(convert_many(["a", "b", "a", "c", "d", "a"], window=2))
+    # "a" is evicted from the window by "c" and "d"
+    assert calls == ["a", "b", "c", "d", "a"]
+    assert results[0][1] is results[2][1]
+    assert results[0][1] is not results[5][1]
+
+
+def test_many_lazy():
+    inputs = (f"[{name}]" for name in itertools.cycle(["foo", "bar"]))
+    results = convert_many(inputs)
+    assert [typing for _, typing in itertools.islice(results, 3)] == [
+        "typing.List[foo]",
+        "typing.List[bar]",
+        "typing.List[foo]",
+    ]
@@ -0,0 +1,93 @@
+"""Test the profile of the grammar rules."""
+
+import json
+import time
+
+import pytest
+
+from stenotype.backend import grammar, rules
+from stenotype.backend.profiler import RuleProfile
+
+
+@pytest.fixture
+def profile():
+    profile = grammar.enable_profile()
+    yield profile
+    grammar.disable_profile()
+
+
+def test_counts(profile):
+    grammar.parse_pyparsing("?[int or str]")
+    assert set(profile.stats) <= set(vars(rules))
+    for stats in profile.stats.values():
+        assert stats.attempts == stats.successes + stats.failures
+        assert stats.active == 0
+    # rules are retried when backtracking, e.g. after ``UNION`` finds no ``or``
+    assert profile["UNION"].successes >= 1
+    assert profile["OPTIONAL"].successes > 1
+    assert profile["TYPE"].attempts >= 3
+
+
+def test_recursive(profile):
+    """The recursive ``TYPE`` rule takes no longer than the whole parse"""
+    start = time.perf_counter()
+    grammar.parse_pyparsing("?[{str: ?[int or float]}]")
+    seconds = time.perf_counter() - start
+    assert 0 < profile["TYPE"].seconds <= seconds
+    assert all(stats.seconds <= seconds for stats in profile.stats.values())
+
+
+def test_failure(profile):
+    with pytest.raises(grammar.ParseError):
+        grammar.parse_pyparsing("[int")
+    assert profile["LIST"].failures >= 1
+    assert profile["TYPE"].failures >= 1
+
+
+def test_formats(profile):
+    grammar.parse_pyparsing("(a: A, *, b: B) -> R")
+    header, first, *rows = profile.table().splitlines()
+    assert header.split() == ["rule", "attempts", "successes", "failures", "seconds"]
+    seconds = [float(row.split()[-1]) for row in [first, *rows]]
+    assert seconds == sorted(seconds, reverse=True)
+    as_json = json.loads(profile.to_json())
+    assert list(as_json) == [row.split()[0] for row in [first, *rows]]
+    assert as_json["SIGNATURE"]["successes"] == 1
+    profile.clear()
+    assert json.loads(profile.to_json()) == {}
+    grammar.parse_pyparsing("?int")
+    assert profile["OPTIONAL"].successes >= 1
+    assert profile["PARAMETER_LIST"].attempts == 0
+
+
+def test_disabled():
+    profile = grammar.enable_profile()
+    assert "_parse" in rules.UNION.__dict__
+    grammar.disable_profile()
+    assert "_parse" not in rules.UNION.__dict__
+    grammar.parse_pyparsing("int or str")
+    assert profile.to_json() == "{}"
+
+
+def test_packrat_and_limits(profile):
+    grammar.enable_packrat()
+    grammar.set_limits(max_steps=100_000)
+    try:
+        grammar.parse_pyparsing("?[int or str]")
+        assert profile["UNION"].successes >= 1
+    finally:
+        grammar.set_limits()
+        grammar.disable_packrat()
+    assert "_parse" in rules.UNION.__dict__
+    grammar.disable_profile()
+    assert "_parse" not in rules.UNION.__dict__
+
+
+def test_empty():
+    assert RuleProfile().table().split() == [
+        "rule",
+        "attempts",
+        "successes",
+        "failures",
+        "seconds",
+    ]
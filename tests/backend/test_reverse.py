@@ -0,0 +1,184 @@
+"""Test shortening typing expressions to stenotype expressions."""
+
+import time
+import typing
+
+import pytest
+
+from stenotype.backend import elements as ste
+from stenotype.backend.generate import Generator
+from stenotype.backend.grammar import parse
+from stenotype.backend.pipeline import convert, convert_many, shorten, shorten_many
+from stenotype.backend.reverse import GENERICS, denormalize
+from stenotype.backend.steno import unparse
+from stenotype.backend.typing import normalize
+from stenotype.util import ParseError
+
+# fmt: off
+shortened = [
+    ("typing.Any", "_"),
+    ("Any", "_"),
+    ("typing.Optional[int]", "?int"),
+    ("Optional[foo.Bar]", "?foo.Bar"),
+    ("typing.Union[int, str]", "int or str"),
+    ("typing.Tuple[int, str]", "(int, str)"),
+    ("typing.List[int]", "[int]"),
+    ("typing.Dict[str, typing.Any]", "{str: _}"),
+    ("typing.Set[int]", "{int}"),
+    ("typing.Literal[True]", "True"),
+    ("typing.Iterable[int]", "iter int"),
+    ("typing.ContextManager[int]", "with int"),
+    ("typing.Awaitable[int]", "await int"),
+    ("typing.AsyncIterable[int]", "async iter int"),
+    ("typing.AsyncContextManager[int]", "async with int"),
+    ("typing.Callable[[int, str], bool]", "(int, str) -> bool"),
+    ("typing.Callable[..., bool]", "(*_) -> bool"),
+    ("typing.List[typing.Dict[str, typing.Optional[int]]]", "[{str: ?int}]"),
+    ("Callable[[typing.Callable[[int], str]], int]", "((int) -> str) -> int"),
+    ("[typing.List[int]]", "[[int]]"),
+    ("typing.Tuple[int, ...]", "(int, ...)"),
+    ("typing.Tuple[typing.List[int], str, ...]", "([int], str, ...)"),
+    ("typing.Callable[[], bool]", "(*) -> bool"),
+]
+mixed = [
+    ("?typing.List[int]", "?[int]"),
+    ("(a: typing.List[int], *, b: Optional[int]) -> typing.Any", "(a: [int], *, b: ?int) -> _"),
+]
+merged = [
+    ("typing.Union[int, None]", "?int"),
+    ("typing.Union[int, typing.Optional[str]]", "?int or str"),
+    ("typing.Union[typing.Optional[int], str, bytes]", "?int or str or bytes"),
+    ("typing.Optional[typing.Optional[int]]", "?int"),
+    ("typing.Union[typing.Union[int, str], bytes]", "int or str or bytes"),
+    ("typing.Union[typing.Literal[1], None]", "?1"),
+]
+kept = [
+    ("foo.Bar[int]", "foo.Bar[int]"),
+    ("typing.List[int, str]", "List[int, str]"),
+    ("typing.Literal[foo]", "Literal[foo]"),
+    ("typing.Literal[1, 2]", "Literal[1, 2]"),
+    ("typing.Literal[1, 'a', None]", "Literal[1, 'a', None]"),
+    ("typing.Tuple[..., int]", "Tuple[..., int]"),
+    ("typing.Tuple[...]", "Tuple[...]"),
+    ("typing.Mapping[str, typing.List[int]]", "typing.Mapping[str, [int]]"),
+    ("typing.Union[typing.Iterable[int], str]", "typing.Iterable[int] or str"),
+    ("typing.Union[str, typing.Iterable[int]]", "str or iter int"),
+    ("typing.Union[typing.Callable[[int], str], int]", "typing.Callable[[int], str] or int"),
+]
+# fmt: on
+
+
+@pytest.mark.parametrize("typing_string, steno", shortened + merged + mixed)
+def test_shorten(typing_string, steno):
+    assert shorten(typing_string) == steno
+
+
+@pytest.mark.parametrize("typing_string, steno", kept)
+def test_kept(typing_string, steno):
+    # the base of a kept generic is not touched, e.g. ``typing.List`` stays qualified
+    assert shorten(typing_string).replace("typing.", "") == steno.replace("typing.", "")
+    assert convert(shorten(typing_string)) == convert(typing_string)
+
+
+@pytest.mark.parametrize("typing_string, steno", shortened)
+def test_inverse(typing_string, steno):
+    assert shorten(convert(steno)) == steno
+    assert shorten(steno) == steno
+
+
+@pytest.mark.parametrize("typing_string, steno", merged)
+def test_equivalent(typing_string, steno):
+    if not hasattr(typing, "Literal"):
+        pytest.skip("typing.Literal requires Python 3.8")
+    namespace = {"typing": typing}
+    assert eval(convert(steno), namespace) == eval(typing_string, namespace)
+
+
+def test_tables():
+    assert (
+        GENERICS[ste.Identifier("typing", "List")] is GENERICS[ste.Identifier("List")]
+    )
+    with pytest.raises(NotImplementedError):
+        denormalize(object())
+
+
+def test_roundtrip():
+    # merged forms are equivalent but not equal, so generate none of them; this
+    # includes generics such as ``List[int]``, which are shortened to ``[int]``
+    generator = Generator(
+        seed=5, max_depth=3, weights={"optional": 0, "literal": 0, "generic": 0}
+    )
+    for tree in generator.trees(500):
+        try:
+            typing_string = convert(unparse(tree), "descent")
+            parse(typing_string, "descent")
+        except (ValueError, ParseError):
+            # not all stenotype can be expressed by, or parsed from, typing strings
+            continue
+        steno = shorten(typing_string, "descent")
+        assert convert(steno, "descent") == typing_string
+        assert shorten(steno, "descent") == steno
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_roundtrip_equivalent(seed):
+    """Shortening and converting back gives an equivalent typing string"""
+    for steno in Generator(seed=seed).strings(1000):
+        try:
+            typing_string = convert(steno, "descent")
+        except (ValueError, ParseError):
+            continue
+        shortened = shorten(typing_string, "descent")
+        roundtrip = convert(shortened, "descent")
+        # merged forms differ, but are shortened to the same stenotype string
+        assert shorten(roundtrip, "descent") == shortened
+        assert convert(shorten(roundtrip, "descent"), "descent") == roundtrip
+
+
+def test_optional_none():
+    # like a member ``Literal[None]``, which is merged into the optional
+    assert shorten("typing.Union[int, typing.Optional[typing.Literal[None]]]") == "?int"
+
+
+def test_shorten_many():
+    results = list(shorten_many(["typing.List[int]", "List[", "typing.List[int]"]))
+    assert [string for string, _ in results] == [
+        "typing.List[int]",
+        "List[",
+        "typing.List[int]",
+    ]
+    assert results[0][1] == results[2][1] == "[int]"
+    assert isinstance(results[1][1], ParseError)
+
+
+@pytest.mark.benchmark
+def test_benchmark_shorten():
+    """Compare the throughput of shortening and converting, and of their passes"""
+    generator = Generator(seed=6, max_depth=3, weights={"signature": 0})
+    stenos, typings, steno_trees, typing_trees = [], [], [], []
+    for steno in generator.strings(2500):
+        try:
+            typing_tree = parse(convert(steno, "descent"), "descent")
+        except ParseError:
+            # typing strings of tuples with ``...`` cannot be parsed
+            continue
+        stenos.append(steno)
+        typings.append(convert(steno, "descent"))
+        steno_trees.append(parse(steno, "descent"))
+        typing_trees.append(typing_tree)
+    print(f"\n{'':<20} {'strings/s':>12}")
+    for name, run in (
+        ("convert", lambda: list(convert_many(stenos, "descent", window=0))),
+        ("shorten", lambda: list(shorten_many(typings, "descent", window=0))),
+        ("normalize pass", lambda: [normalize(tree) for tree in steno_trees]),
+        ("denormalize pass", lambda: [denormalize(tree) for tree in typing_trees]),
+    ):
+        best = float("inf")
+        for _ in range(5):
+            convert.cache_clear()
+            shorten.cache_clear()
+            parse.cache_clear()
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<20} {len(stenos) / best:>12.0f}")
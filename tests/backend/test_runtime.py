@@ -0,0 +1,116 @@
+"""Test building runtime typing objects from elements."""
+
+import collections.abc as abc
+import timeit
+import typing
+from types import SimpleNamespace
+
+import pytest
+
+from stenotype.backend.generate import Generator
+from stenotype.backend.grammar import parse
+from stenotype.backend.pipeline import convert
+from stenotype.backend.runtime import Resolver, to_runtime
+from stenotype.backend.steno import unparse
+
+expressions = [
+    "int",
+    "_",
+    "?int",
+    "int or str or None",
+    "(int, ...)",
+    "[int]",
+    "{str: ?[bytes]}",
+    "{int}",
+    "iter with await async iter async with int",
+    "(int, str) -> bool",
+    "(...) -> int",
+    "typing.Mapping[str, typing.List[int]]",
+    "typing.Callable[[int], typing.Any]",
+]
+literals = ["True", "1", "-1", "None", "'a'", 'b"x"', "Ellipsis", "True or 1"]
+
+
+@pytest.mark.parametrize("steno", expressions)
+def test_to_runtime(steno):
+    assert to_runtime(parse(steno)) == eval(convert(steno), {"typing": typing})
+
+
+@pytest.mark.parametrize("steno", literals)
+def test_literals(steno):
+    if not hasattr(typing, "Literal"):
+        pytest.skip("typing.Literal requires Python 3.8")
+    expected = eval(convert(steno), {"typing": typing})
+    assert to_runtime(parse(steno)) == expected
+    assert repr(to_runtime(parse(steno))) == repr(expected)
+
+
+class Counting(type):
+    """Generic type counting how often it is subscribed"""
+
+    def __getitem__(cls, item):
+        cls.calls += 1
+        return typing.List[item]
+
+
+class Box(metaclass=Counting):
+    calls = 0
+
+
+def test_namespace():
+    namespace = {"Box": Box, "int": str}
+    assert (
+        to_runtime(parse("?Box[int]"), namespace) == typing.Optional[typing.List[str]]
+    )
+    assert to_runtime(parse("[Box[int]] or Box[int]"), namespace)
+    assert Box.calls == 1
+    with pytest.raises(NameError):
+        to_runtime(parse("Box[int]"))
+    with pytest.raises(NameError):
+        to_runtime(parse("typing.Foo"))
+    # modules are never imported while resolving
+    with pytest.raises(NameError):
+        to_runtime(parse("stenotypetestmodule.Foo"))
+
+
+def test_resolver():
+    resolver = Resolver({"T": int})
+    assert resolver.resolve(parse("T")) is int
+    assert (
+        resolver(parse("[T] or {T}")) == typing.Union[typing.List[int], typing.Set[int]]
+    )
+    with pytest.raises(ValueError):
+        resolver(parse("(*, a: T) -> T"))
+
+
+@pytest.mark.benchmark
+def test_benchmark_to_runtime():
+    """Compare building typing objects to evaluating typing strings"""
+    generator = Generator(seed=7, max_depth=3, weights={"signature": 0})
+    namespace = {name: int for name in ("foo", "Bar", "T")}
+    namespace.update(typing=typing, List=typing.List, Mapping=typing.Mapping)
+    namespace.update(Foo=typing.List, np=SimpleNamespace(ndarray=int), abc=abc)
+    trees, strings = [], []
+    for tree in generator.trees(1000):
+        string = convert(unparse(tree), "descent")
+        try:
+            eval(string, namespace)
+        except TypeError:
+            # generics with the wrong number of parameters
+            continue
+        trees.append(tree)
+        strings.append(string)
+    resolver = Resolver(namespace)
+
+    def evaluate():
+        for string in strings:
+            eval(string, namespace)
+
+    def build():
+        for tree in trees:
+            resolver(tree)
+
+    print(f"\n{'method':<12} {'per expression':>16}")
+    for name, run in (("eval", evaluate), ("to_runtime", build)):
+        seconds = min(timeit.repeat(run, number=1, repeat=5)) / len(trees)
+        print(f"{name:<12} {seconds * 1e6:>14.1f}us")
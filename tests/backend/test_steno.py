@@ -51,6 +51,11 @@ shorthands = [
     ste.AsyncIterable(ste.Identifier("foo")),
     ste.AsyncContext(ste.Identifier("foo")),
 ]
+signatures = [
+    "(a, b) -> R", "(a: A, /, b) -> R", "(*) -> R", "(*args: _) -> R", "(A, *B) -> R",
+    "(*, k: K) -> R", "(*, **kwargs: K) -> R", "(a, *b: B, c: C, **d: D) -> R",
+    "((a) -> b, c: (d) -> e or f) -> (g) -> h",
+]
 # fmt: on
 
 
@@ -79,6 +84,11 @@ def test_shorthands(element):
     assert parse(unparse(element)) == element
 
 
+@pytest.mark.parametrize("steno", signatures)
+def test_signatures(steno):
+    assert unparse(parse(steno)) == steno
+
+
 def test_unknown():
     with pytest.raises(NotImplementedError, match="cannot be represented") as e:
         unparse(object())
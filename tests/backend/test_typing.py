@@ -57,6 +57,13 @@ callables = [
     ("typing.Callable[[A, B], R]", ste.Callable(
         (ste.Identifier('A'), ste.Identifier('B')), ste.Identifier('R'),
     )),
+    # parameter and return types are normalized as well
+    ("typing.Callable[..., typing.Optional[R]]", ste.Callable(
+        ste.Dots(), ste.Optional(ste.Identifier('R')),
+    )),
+    ("typing.Callable[[typing.List[A], typing.Any], typing.Set[R]]", ste.Callable(
+        (ste.List(ste.Identifier('A')), ste.Any()), ste.Set(ste.Identifier('R')),
+    )),
 ]
 callable_signatures = [
     ("typing.Callable[..., R]", ste.Signature(
@@ -77,6 +84,15 @@ callable_signatures = [
         mixed=(ste.Parameter(None, ste.Identifier('C')),),
         args=None, keywords=(), kwargs=None, returns=ste.Identifier('R'))
      ),
+    # parameter and return types are normalized as well
+    ("typing.Callable[..., typing.Literal[None]]", ste.Signature(
+        positional=(), mixed=(), args=ste.Parameter('args', ste.Any()), keywords=(), kwargs=None, returns=ste.Literal(None))
+     ),
+    ("typing.Callable[[typing.Optional[A], typing.Any], typing.List[R]]", ste.Signature(
+        positional=(ste.Parameter(None, ste.Optional(ste.Identifier('A'))),),
+        mixed=(ste.Parameter(None, ste.Any()),),
+        args=None, keywords=(), kwargs=None, returns=ste.List(ste.Identifier('R')))
+     ),
 ]
 protocol_signatures = [
     ste.Signature(
@@ -165,3 +181,20 @@ def test_protocol_signatures(element):
 def test_unknown():
     with pytest.raises(NotImplementedError, match="cannot be represented"):
         normalize(object)
+
+
+@pytest.mark.parametrize(
+    "base",
+    [
+        ste.Identifier("typing", "Literal"),
+        ste.Identifier("Literal"),
+        ste.Identifier("typing_extensions", "Literal"),
+    ],
+)
+def test_literal_generics(base):
+    """The values of a literal generic are kept, so that normalizing is idempotent"""
+    element = ste.Generic(base, (ste.Literal(1), ste.Literal("'a'"), ste.Literal(None)))
+    assert normalize(element) == element
+    assert normalize(ste.List(element)) == ste.Generic(
+        ste.Identifier("typing", "List"), (element,)
+    )
@@ -7,7 +7,7 @@ from stenotype import cli
 @pytest.fixture
 def test_cli(monkeypatch):
     # patch out logger setup
-    monkeypatch.setattr(cli.util, "setup_logging", lambda x: None)
+    monkeypatch.setattr(cli.util, "setup_logging", lambda *args: None)
     return lambda *args: CliRunner(mix_stderr=False).invoke(cli.cli, args=args)
 
 
@@ -20,6 +20,13 @@ def pytest_addoption(parser):
         default=False,
         help="Enable tests that ensure mypy and stenotype interoperability.",
     )
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        dest="benchmark",
+        default=False,
+        help="Enable tests that measure and compare the performance of stenotype.",
+    )
 
 
 def pytest_configure(config):
@@ -27,9 +34,12 @@ def pytest_configure(config):
 
     Running ``pytest`` by itself does not invoke the mypy tests. Similarly,
     running ``pytest --mypy`` does not invoke the unit tests. This way, we
-    can let them run as separate stages in the CI.
+    can let them run as separate stages in the CI. The same applies to the
+    benchmark tests and the --benchmark flag.
     """
     if config.option.mypy:
         setattr(config.option, "markexpr", "mypy")
+    elif config.option.benchmark:
+        setattr(config.option, "markexpr", "benchmark")
     else:
-        setattr(config.option, "markexpr", "not mypy")
+        setattr(config.option, "markexpr", "not mypy and not benchmark")
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from stenotype import benchmark
+from stenotype.backend.grammar import parse
+
+
+@pytest.mark.parametrize("construct", list(benchmark.CONSTRUCTS))
+@pytest.mark.parametrize("dimension", ["width", "depth"])
+def test_expressions(construct, dimension):
+    if getattr(benchmark.CONSTRUCTS[construct], dimension) is None:
+        with pytest.raises(ValueError):
+            benchmark.expression(construct, dimension, 1)
+        return
+    previous = None
+    for size in (1, 2, 3, 30):
+        steno = benchmark.expression(construct, dimension, size)
+        assert parse(steno, "descent")
+        assert steno != previous
+        previous = steno
+
+
+def test_cli(tmp_path):
+    args = ["--max-width", "2", "--max-depth", "2", "--repeat", "1"]
+    args += ["--min-time", "0", "-c", "union", "-c", "list"]
+    runner = CliRunner(mix_stderr=False)
+    result = runner.invoke(benchmark.main, args=args)
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.stdout)
+    assert report["engine"] == "descent"
+    assert [
+        (entry["construct"], entry["dimension"], entry["size"])
+        for entry in report["results"]
+    ] == [
+        ("union", "width", 1),
+        ("union", "width", 2),
+        ("union", "depth", 1),
+        ("union", "depth", 2),
+        ("list", "depth", 1),
+        ("list", "depth", 2),
+    ]
+    assert all(entry["parse"] > 0 for entry in report["results"])
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(result.stdout)
+    result = runner.invoke(benchmark.main, args=args + ["-b", str(baseline)])
+    assert result.exit_code == 0, result.output
+    assert "list depth 2" in result.stderr
@@ -1,3 +1,8 @@
+import json
+
+import pytest
+
+from stenotype.backend import rules
 from stenotype.util import StenotypeException
 
 
@@ -36,20 +41,80 @@ def test_shorten_and_check(test_cli):
 
 
 def test_shorten(test_cli):
-    result = test_cli("-s", "typing.Optional[int]")
+    result = test_cli("-s", "typing.Optional[int]", "typing.Dict[str, typing.Any]")
     assert result.exit_code == 0
-    assert result.stdout == "stub inverse function: typing.Optional[int]\n"
-    # should be "?int"
+    assert result.stdout == "?int\n{str: _}\n"
+
+
+def test_shorten_jobs(test_cli):
+    result = test_cli("-s", "-j", "2", "typing.Optional[int]", "typing.List[int")
+    assert result.exit_code == 1
+    assert result.stdout == "?int\n"
+    assert "typing.List[int" in result.stderr
 
 
 def test_parser_exception(test_cli, monkeypatch):
     from stenotype import cli
 
-    def parse_that_fails(*_, **__):
+    def convert_that_fails(*_, **__):
         raise StenotypeException("test message")
 
-    monkeypatch.setattr(cli, "parse", parse_that_fails)
+    monkeypatch.setattr(cli, "convert", convert_that_fails)
 
     result = test_cli("?int")
     assert result.exit_code == 1
     assert result.stderr == "test message\n"
+
+
+def test_jobs(test_cli):
+    result = test_cli("-j", "2", "?int", "?bool")
+    assert result.exit_code == 0
+    assert result.stdout == "typing.Optional[int]\n" "typing.Optional[bool]\n"
+
+
+def test_jobs_parser_exception(test_cli):
+    result = test_cli("-j", "2", "?int", "[int")
+    assert result.exit_code == 1
+    assert result.stdout == "typing.Optional[int]\n"
+    assert "[int" in result.stderr
+
+
+def test_convert_command(test_cli):
+    result = test_cli("convert", "?int")
+    assert result.exit_code == 0
+    assert result.stdout == "typing.Optional[int]\n"
+
+
+@pytest.fixture
+def uncached():
+    from stenotype.backend import grammar, pipeline
+
+    grammar.parse.cache_clear()
+    pipeline.convert.cache_clear()
+
+
+def test_profile(test_cli, uncached):
+    result = test_cli("--profile", "?[int or str]")
+    assert result.exit_code == 0
+    assert result.stdout == "typing.Optional[typing.List[typing.Union[int, str]]]\n"
+    header, *rows = result.stderr.splitlines()
+    assert header.split() == ["rule", "attempts", "successes", "failures", "seconds"]
+    assert {"TYPE", "UNION", "OPTIONAL", "LIST"} <= {row.split()[0] for row in rows}
+    assert "_parse" not in rules.TYPE.__dict__
+
+
+def test_profile_json(test_cli, uncached, tmp_path):
+    path = tmp_path / "profile.json"
+    result = test_cli("--profile-json", str(path), "?[int or str]", "[int")
+    assert result.exit_code == 1
+    profile = json.loads(path.read_text())
+    assert profile["UNION"]["attempts"] == (
+        profile["UNION"]["successes"] + profile["UNION"]["failures"]
+    )
+    assert profile["TYPE"]["failures"] >= 1
+
+
+def test_profile_and_jobs(test_cli):
+    result = test_cli("--profile", "-j", "2", "?int")
+    assert result.exit_code == 1
+    assert result.stderr == "Flags --profile and --jobs can't be used simultaneously.\n"
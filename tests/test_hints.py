@@ -0,0 +1,151 @@
+"""Test resolving stenotype annotations at runtime."""
+
+import gc
+import threading
+import time
+import typing
+from functools import wraps
+
+import pytest
+
+import stenotype
+from stenotype import hints
+
+
+class Node:
+    parent: "?Node"
+    children: "[Node]" = []
+    value: "int or str"
+
+    def walk(self, depth: "?int" = None) -> "iter Node":
+        pass
+
+
+class Leaf(Node):
+    value: int
+    weight: "float"
+
+
+def function(a: "{str: Node}", b: int, *c: "typing.Callable[[int], str]") -> None:
+    pass
+
+
+def test_function():
+    assert stenotype.get_type_hints(function) == {
+        "a": typing.Dict[str, Node],
+        "b": int,
+        "c": typing.Callable[[int], str],
+        "return": type(None),
+    }
+
+
+def test_class():
+    assert stenotype.get_type_hints(Node) == {
+        "parent": typing.Optional[Node],
+        "children": typing.List[Node],
+        "value": typing.Union[int, str],
+    }
+    assert stenotype.get_type_hints(Leaf) == {
+        "parent": typing.Optional[Node],
+        "children": typing.List[Node],
+        "value": int,
+        "weight": float,
+    }
+    assert stenotype.get_type_hints(Node().walk) == {
+        "depth": typing.Optional[int],
+        "return": typing.Iterable[Node],
+    }
+
+
+def test_namespaces():
+    def local(a: "?Local") -> "Local":
+        pass
+
+    with pytest.raises(NameError):
+        stenotype.get_type_hints(local)
+
+    class Local:
+        pass
+
+    assert stenotype.get_type_hints(local, localns={"Local": Local}) == {
+        "a": typing.Optional[Local],
+        "return": Local,
+    }
+    assert stenotype.get_type_hints(local, globalns={"Local": int}) == {
+        "a": typing.Optional[int],
+        "return": int,
+    }
+
+
+def test_wrapped():
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        return function(*args, **kwargs)
+
+    assert stenotype.get_type_hints(wrapper) == stenotype.get_type_hints(function)
+
+
+def test_cache():
+    def cached(a: "?int"):
+        pass
+
+    first = stenotype.get_type_hints(cached)
+    first["a"] = None
+    assert stenotype.get_type_hints(cached) == {"a": typing.Optional[int]}
+    cached.__annotations__["a"] = "int"
+    assert stenotype.get_type_hints(cached) == {"a": typing.Optional[int]}
+    assert cached in hints._HINTS
+    del cached
+    gc.collect()
+    assert not any(
+        getattr(obj, "__name__", None) == "cached" for obj in hints._HINTS.keys()
+    )
+
+
+def test_threads(monkeypatch):
+    resolved = []
+    type_hints = hints._type_hints
+
+    def slow_type_hints(*args):
+        resolved.append(args[0])
+        time.sleep(0.01)
+        return type_hints(*args)
+
+    def contended(a: "[?int]"):
+        pass
+
+    monkeypatch.setattr(hints, "_type_hints", slow_type_hints)
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(stenotype.get_type_hints(contended))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert resolved == [contended]
+    assert results == [{"a": typing.List[typing.Optional[int]]}] * 8
+
+
+@pytest.mark.benchmark
+def test_benchmark_get_type_hints():
+    """Compare cached hints to resolving typing strings on each call"""
+
+    def annotated(
+        a: "typing.Optional[typing.List[int]]", b: "typing.Dict[str, Node]"
+    ) -> "typing.Union[int, str]":
+        pass
+
+    print(f"\n{'function':<28} {'per call':>10}")
+    for name, get_type_hints in (
+        ("typing.get_type_hints", typing.get_type_hints),
+        ("stenotype.get_type_hints", stenotype.get_type_hints),
+    ):
+        start = time.perf_counter()
+        for _ in range(10000):
+            get_type_hints(annotated)
+        seconds = (time.perf_counter() - start) / 10000
+        print(f"{name:<28} {seconds * 1e6:>8.2f}us")
@@ -0,0 +1,132 @@
+"""Test converting annotations of modules while they are imported."""
+
+import importlib
+import os
+import sys
+import time
+
+import pytest
+
+import stenotype.rewrite
+from stenotype import hook
+
+MODULE = """
+def f(a: '?int', *b: 'int or str') -> '[str]':
+    pass
+
+x: '{str: _}' = {}
+"""
+
+ANNOTATIONS = {
+    "a": "typing.Optional[int]",
+    "b": "typing.Union[int, str]",
+    "return": "typing.List[str]",
+}
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """Path of the package ``hooked``, which is rewritten on import"""
+    path = tmp_path / "hooked"
+    path.mkdir()
+    (path / "__init__.py").write_text("")
+    (path / "module.py").write_text(MODULE)
+    (tmp_path / "plain.py").write_text(MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    hook.install("hooked")
+    yield path
+    hook.uninstall()
+    for name in ("hooked", "hooked.module", "plain"):
+        sys.modules.pop(name, None)
+
+
+def reimport(name: str):
+    sys.modules.pop(name, None)
+    importlib.invalidate_caches()
+    return importlib.import_module(name)
+
+
+def forbid_rewrite(monkeypatch):
+    def rewrite_source(*args, **kwargs):
+        raise AssertionError("module was rewritten instead of loaded from cache")
+
+    monkeypatch.setattr(stenotype.rewrite, "rewrite_source", rewrite_source)
+
+
+def test_rewrite(package):
+    module = reimport("hooked.module")
+    assert module.f.__annotations__ == ANNOTATIONS
+    assert module.__annotations__ == {"x": "typing.Dict[str, typing.Any]"}
+    assert os.path.exists(module.__cached__)
+    assert module.__cached__.endswith(".opt-stenotype.pyc")
+    # modules outside of the package are not touched
+    assert reimport("plain").f.__annotations__["a"] == "?int"
+
+
+def test_cache(package, monkeypatch):
+    source = package / "module.py"
+    reimport("hooked.module")
+    with monkeypatch.context() as patch:
+        forbid_rewrite(patch)
+        assert reimport("hooked.module").f.__annotations__ == ANNOTATIONS
+        # a new modification time with the same content reuses the cache
+        stat = source.stat()
+        os.utime(str(source), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert reimport("hooked.module").f.__annotations__ == ANNOTATIONS
+        assert reimport("hooked.module").f.__annotations__ == ANNOTATIONS
+    # a new content is rewritten
+    source.write_text(MODULE.replace("?int", "?bytes"))
+    os.utime(str(source), ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10 ** 9))
+    module = reimport("hooked.module")
+    assert module.f.__annotations__["a"] == "typing.Optional[bytes]"
+
+
+def test_fingerprint(package, monkeypatch):
+    reimport("hooked.module")
+    # a new version of stenotype rewrites all modules again
+    monkeypatch.setattr(hook, "fingerprint", lambda: "0" * 16)
+    forbid_rewrite(monkeypatch)
+    with pytest.raises(AssertionError):
+        reimport("hooked.module")
+
+
+def test_errors(package):
+    (package / "broken.py").write_text("x: 'int or' = 1\ny: '?int' = 2\n")
+    module = reimport("hooked.broken")
+    assert module.__annotations__ == {"x": "int or", "y": "typing.Optional[int]"}
+    (package / "invalid.py").write_text("x: ?int = 1\n")
+    with pytest.raises(SyntaxError):
+        reimport("hooked.invalid")
+    with pytest.raises(ValueError):
+        hook.install()
+
+
+def test_uninstall(package):
+    hook.uninstall()
+    assert not any(isinstance(finder, hook.StenotypeFinder) for finder in sys.meta_path)
+    assert reimport("hooked.module").f.__annotations__["a"] == "?int"
+
+
+@pytest.mark.benchmark
+def test_benchmark_import(package):
+    """Compare importing a rewritten module to importing a regular module"""
+    lines = [
+        f"def f{index}(a: '?[int]', b: '{{str: int or None}}') -> '(int, ...)': pass"
+        for index in range(500)
+    ]
+    (package / "large.py").write_text("\n".join(lines))
+    (package.parent / "large.py").write_text("\n".join(lines))
+
+    def timeit(name):
+        start = time.perf_counter()
+        reimport(name)
+        return time.perf_counter() - start
+
+    print(f"\n{'import':<28} {'time':>10}")
+    print(f"{'rewritten, cold':<28} {timeit('hooked.large') * 1000:>8.1f}ms")
+    for label, name in (("rewritten, cached", "hooked.large"), ("regular", "large")):
+        timeit(name)
+        seconds = min(timeit(name) for _ in range(5))
+        print(f"{label:<28} {seconds * 1000:>8.1f}ms")
+    sys.modules.pop("large", None)
@@ -0,0 +1,195 @@
+"""Test rewriting of annotations in Python source files."""
+
+import pytest
+
+from stenotype import rewrite
+from stenotype.backend.diskcache import DiskCache
+from stenotype.rewrite import find_files, rewrite_file, rewrite_paths, rewrite_source
+
+
+# fmt: off
+sources = [
+    ('x: "?int" = None\n', 'x: "typing.Optional[int]" = None\n'),
+    ("x: '[int]'\n", "x: 'typing.List[int]'\n"),
+    ('x: """{str: _}"""\n', 'x: "typing.Dict[str, typing.Any]"\n'),
+    ("def f(a: '?int', *b: 'int or str', c=1, **d: 'foo') -> '[int]': pass\n",
+     "def f(a: 'typing.Optional[int]', *b: 'typing.Union[int, str]', c=1,"
+     " **d: 'foo') -> 'typing.List[int]': pass\n"),
+    ("async def f(*, a: '?int'):\n    b: 'str or ?int'  # keep\n",
+     "async def f(*, a: 'typing.Optional[int]'):\n"
+     "    b: 'typing.Union[str, typing.Optional[int]]'  # keep\n"),
+    # quotes of the original literal are kept unless the annotation contains them
+    ("x: \"'a' or 'b'\"\ny: '\"a\"'\n",
+     "x: \"typing.Union[typing.Literal['a'], typing.Literal['b']]\"\n"
+     "y: 'typing.Literal[\"a\"]'\n"),
+    # code outside of annotations and non-string annotations are untouched
+    ("x = '?int'\ny: int = f('?int')\nz: List['?int']\n",
+     "x = '?int'\ny: int = f('?int')\nz: List['?int']\n"),
+    # offsets are tracked across non-ascii characters and line continuations
+    ("ö = 'ü'; x: '?int'\ndef f(a: ('?int'),\n      b: '?str'): pass\n",
+     "ö = 'ü'; x: 'typing.Optional[int]'\ndef f(a: ('typing.Optional[int]'),\n"
+     "      b: 'typing.Optional[str]'): pass\n"),
+]
+# fmt: on
+
+
+@pytest.mark.parametrize("source, expected", sources)
+def test_rewrite_source(source, expected):
+    rewritten, report = rewrite_source(source)
+    assert rewritten == expected
+    assert not report.errors
+
+
+@pytest.mark.parametrize("source", [source for source, _ in sources])
+def test_rewrite_twice(source):
+    once, _ = rewrite_source(source)
+    twice, report = rewrite_source(once)
+    assert twice == once
+    assert report.rewritten == 0
+
+
+def test_rewrite_literals():
+    source = "x: '42'\ny: 'typing.Literal[1, None] or ?[True]'\n"
+    once, _ = rewrite_source(source)
+    assert once == (
+        "x: 'typing.Literal[42]'\n"
+        "y: 'typing.Union[typing.Literal[1, None],"
+        " typing.Optional[typing.List[typing.Literal[True]]]]'\n"
+    )
+    assert rewrite_source(once)[0] == once
+
+
+def test_rewrite_errors():
+    source = "a: '?int'\nb: 'foo or'\nc: ('?a'\n    '?b')\n"
+    rewritten, report = rewrite_source(source)
+    assert rewritten == source.replace("'?int'", "'typing.Optional[int]'")
+    assert (report.annotations, report.rewritten) == (3, 1)
+    assert [line for line, _ in report.errors] == [2, 3]
+
+
+def test_rewrite_file(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_bytes("# -*- coding: latin-1 -*-\nö: '?int'\n".encode("latin-1"))
+    report = rewrite_file(str(path), write=False)
+    assert (report.annotations, report.rewritten) == (1, 1)
+    assert "?int" in path.read_text("latin-1")
+    report = rewrite_file(str(path))
+    assert report.seconds > 0
+    assert path.read_text("latin-1") == (
+        "# -*- coding: latin-1 -*-\nö: 'typing.Optional[int]'\n"
+    )
+
+
+def test_syntax_error(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text("x: '?int'\ndef f(:\n")
+    report = rewrite_file(str(path))
+    assert report.rewritten == 0
+    assert report.errors[0][0] == 2
+    assert path.read_text() == "x: '?int'\ndef f(:\n"
+
+
+@pytest.fixture
+def project(tmp_path):
+    for name in ("a.py", "b/c.py", "b/d.txt", ".venv/e.py"):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x: '?int'\n")
+    return tmp_path
+
+
+def test_find_files(project):
+    assert sorted(find_files([str(project)])) == [
+        str(project / "a.py"),
+        str(project / "b" / "c.py"),
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_rewrite_paths(project, jobs):
+    reports = list(rewrite_paths([str(project)], jobs=jobs))
+    assert sorted(report.path for report in reports) == [
+        str(project / "a.py"),
+        str(project / "b" / "c.py"),
+    ]
+    assert all(report.rewritten == 1 for report in reports)
+    assert (project / "b" / "c.py").read_text() == "x: 'typing.Optional[int]'\n"
+    assert (project / ".venv" / "e.py").read_text() == "x: '?int'\n"
+
+
+def test_cli_rewrite(test_cli, project):
+    result = test_cli("rewrite", "-j", "1", "--no-cache", "-n", str(project))
+    assert result.exit_code == 0
+    assert "would rewrite 1 of 1 annotations" in result.stdout
+    assert "2 files, 2 annotations to rewrite" in result.stdout
+    assert (project / "a.py").read_text() == "x: '?int'\n"
+    (project / "a.py").write_text("x: 'foo or'\n")
+    result = test_cli("rewrite", "-j", "1", "--no-cache", str(project))
+    assert result.exit_code == 1
+    assert "a.py:1: " in result.stderr
+    assert (project / "b" / "c.py").read_text() == "x: 'typing.Optional[int]'\n"
+
+
+def test_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def convert(steno_string, engine=None):
+        calls.append(steno_string)
+        if steno_string.startswith("?"):
+            return f"typing.Optional[{steno_string[1:]}]"
+        return steno_string
+
+    monkeypatch.setattr(rewrite, "convert", convert)
+    cache = DiskCache(tmp_path / "cache")
+    path = tmp_path / "module.py"
+    path.write_text("a: '?int'\nb: '?str'\n")
+    report = rewrite_file(str(path), write=False, cache=cache)
+    assert (report.rewritten, report.cached) == (2, False)
+    assert calls == ["?int", "?str"] or calls == ["?str", "?int"]
+    # unchanged files are not parsed again
+    report = rewrite_file(str(path), cache=cache)
+    assert (report.rewritten, report.cached) == (2, True)
+    assert path.read_text() == "a: 'typing.Optional[int]'\nb: 'typing.Optional[str]'\n"
+    assert len(calls) == 2
+    # files produced by rewriting are checked like any other file
+    report = rewrite_file(str(path), cache=cache)
+    assert (report.annotations, report.rewritten, report.cached) == (2, 0, False)
+    assert len(calls) == 4
+    report = rewrite_file(str(path), cache=cache)
+    assert (report.annotations, report.rewritten, report.cached) == (2, 0, True)
+    assert len(calls) == 4
+    # only new annotations of changed files are converted
+    path.write_text("a: '?int'\nb: '?bool'\n")
+    report = rewrite_file(str(path), cache=cache)
+    assert (report.rewritten, report.cached) == (2, False)
+    assert calls[4:] == ["?bool"]
+
+
+def test_cache_matches_uncached(tmp_path):
+    """Runs with and without a cache write the same files, however often repeated"""
+    source = "a: '?int'\nb: '42 or foo'\nc: 'foo or'\nd: 'typing.Literal[1]'\n"
+    cache = DiskCache(tmp_path / "cache")
+    cached, uncached = tmp_path / "cached.py", tmp_path / "uncached.py"
+    cached.write_text(source)
+    uncached.write_text(source)
+    for _ in range(3):
+        cached_report = rewrite_file(str(cached), cache=cache)
+        uncached_report = rewrite_file(str(uncached))
+        assert cached.read_text() == uncached.read_text()
+        assert cached_report.errors == uncached_report.errors
+        assert cached_report.rewritten == uncached_report.rewritten
+    assert uncached.read_text() == rewrite_source(source)[0]
+
+
+def test_cli_cache(test_cli, project):
+    cache_dir = str(project / ".cache")
+    # files are identified by content, so identical files share an entry
+    (project / "b" / "c.py").write_text("y: '?str'\n")
+    result = test_cli(
+        "rewrite", "-j", "1", "-n", "--cache-dir", cache_dir, str(project)
+    )
+    assert "(cached)" not in result.stdout
+    result = test_cli(
+        "rewrite", "-j", "1", "-n", "--cache-dir", cache_dir, str(project)
+    )
+    assert result.stdout.count("(cached)") == 2
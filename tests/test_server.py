@@ -0,0 +1,221 @@
+"""Test serving conversions via JSON-RPC."""
+
+import io
+import json
+import socket
+import threading
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from stenotype import cli, server
+from stenotype.server import (
+    CONVERSION_ERROR,
+    INTERNAL_ERROR,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    create_server,
+    handle_message,
+    serve_stdio,
+)
+
+from .test_startup import run_python
+
+
+def request(identifier, method, *args, **kwargs):
+    message = {"jsonrpc": "2.0", "id": identifier, "method": method}
+    message["params"] = kwargs if kwargs else list(args)
+    return message
+
+
+def call(message):
+    return json.loads(handle_message(json.dumps(message)))
+
+
+# fmt: off
+results = [
+    (request(1, "convert", "?int"), "typing.Optional[int]"),
+    (request("a", "convert", expression="[int]", engine="descent"), "typing.List[int]"),
+    (request(2, "shorten", "typing.Optional[int]"), "?int"),
+    (request(3, "parse", "typing.Optional[ int ]"), "typing.Optional[int]"),
+    (request(4, "parse", "?[ int ]"), "?[int]"),
+]
+errors = [
+    (request(1, "convert", "int or"), CONVERSION_ERROR),
+    (request(1, "convert", "int", "nope"), INVALID_PARAMS),
+    (request(1, "unparse", "int"), METHOD_NOT_FOUND),
+    (request(1, "convert", 1), INVALID_PARAMS),
+    (request(1, "convert"), INVALID_PARAMS),
+    (request(1, "convert", "int", "descent", 3), INVALID_PARAMS),
+    (request(1, "convert", string="int"), INVALID_PARAMS),
+    ({"jsonrpc": "2.0", "id": 1, "method": "convert", "params": "int"}, INVALID_PARAMS),
+    ({"id": 1, "method": "convert", "params": ["int"]}, INVALID_REQUEST),
+    ([], INVALID_REQUEST),
+    (1, INVALID_REQUEST),
+]
+# fmt: on
+
+
+@pytest.mark.parametrize("message, result", results)
+def test_result(message, result):
+    assert call(message) == {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+
+@pytest.mark.parametrize("message, code", errors)
+def test_error(message, code):
+    response = call(message)
+    assert response["error"]["code"] == code
+    assert "result" not in response
+
+
+def test_messages():
+    assert json.loads(handle_message("{")) == {
+        "jsonrpc": "2.0",
+        "id": None,
+        "error": {"code": PARSE_ERROR, "message": "Parse error"},
+    }
+    notification = {"jsonrpc": "2.0", "method": "convert", "params": ["?int"]}
+    assert handle_message(json.dumps(notification)) is None
+    assert handle_message(json.dumps([notification, notification])) is None
+    batch = call([request(1, "convert", "?int"), notification, request(2, "nope")])
+    assert [response["id"] for response in batch] == [1, 2]
+    assert batch[0]["result"] == "typing.Optional[int]"
+    assert batch[1]["error"]["code"] == METHOD_NOT_FOUND
+
+
+def test_internal_error(monkeypatch):
+    """Errors of a method itself are no errors of the parameters"""
+
+    def convert(expression, engine=None):
+        raise TypeError("internal")
+
+    monkeypatch.setitem(server.METHODS, "convert", convert)
+    response = call(request(1, "convert", "int"))
+    assert response["error"] == {"code": INTERNAL_ERROR, "message": "Internal error"}
+    response = call(request(2, "convert", "int", "descent", 3))
+    assert response["error"]["code"] == INVALID_PARAMS
+    assert response["error"]["data"] == "convert() too many positional arguments"
+
+
+def test_stdio():
+    messages = [request(index, "convert", "?int") for index in range(3)]
+    in_stream = io.StringIO("\n".join(map(json.dumps, messages)) + "\n\n")
+    out_stream = io.StringIO()
+    serve_stdio(in_stream, out_stream)
+    responses = [json.loads(line) for line in out_stream.getvalue().splitlines()]
+    assert [response["id"] for response in responses] == [0, 1, 2]
+
+
+def test_cli_serve(monkeypatch):
+    monkeypatch.setattr(cli.util, "setup_logging", lambda *args: None)
+    message = json.dumps(request(1, "shorten", "typing.List[int]"))
+    result = CliRunner(mix_stderr=False).invoke(cli.cli, ["serve"], input=message)
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["result"] == "[int]"
+
+
+@pytest.fixture
+def server_path(tmp_path):
+    if not hasattr(socket, "AF_UNIX"):
+        pytest.skip("Unix sockets are not available")
+    path = str(tmp_path / "stenotype.sock")
+    server = create_server(path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def pipeline_requests(path, messages):
+    """Send all ``messages`` at once and read all responses"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        client.sendall(b"".join(json.dumps(msg).encode() + b"\n" for msg in messages))
+        with client.makefile("rb") as responses:
+            return [json.loads(next(responses)) for _ in messages]
+
+
+def test_socket(server_path):
+    expressions = ["?int", "[str]", "int or", "{str: _}"] * 50
+    outcomes = {}
+
+    def run_client(client):
+        messages = [
+            request(f"{client}-{index}", "convert", expression)
+            for index, expression in enumerate(expressions)
+        ]
+        outcomes[client] = pipeline_requests(server_path, messages)
+
+    clients = [threading.Thread(target=run_client, args=(name,)) for name in range(4)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    for client, responses in outcomes.items():
+        assert [response["id"] for response in responses] == [
+            f"{client}-{index}" for index in range(len(expressions))
+        ]
+        assert [response.get("result") for response in responses[:4]] == [
+            "typing.Optional[int]",
+            "typing.List[str]",
+            None,
+            "typing.Dict[str, typing.Any]",
+        ]
+
+
+def test_socket_line_limit(server_path, monkeypatch):
+    monkeypatch.setattr(server, "MAX_LINE", 128)
+    messages = [
+        request(1, "convert", "int or " * 100 + "str"),
+        request(2, "convert", "?int"),
+    ]
+    first, second = pipeline_requests(server_path, messages)
+    assert first["error"]["code"] == INVALID_REQUEST
+    assert first["id"] is None
+    assert second["result"] == "typing.Optional[int]"
+
+
+def test_stale_socket(tmp_path):
+    if not hasattr(socket, "AF_UNIX"):
+        pytest.skip("Unix sockets are not available")
+    path = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    server = create_server(path)
+    server.server_close()
+
+
+@pytest.mark.benchmark
+def test_benchmark_latency(server_path):
+    """Compare the latency of a request to a server and of a new process"""
+    print(f"\n{'method':<24} {'latency':>10}")
+    processes = []
+    for _ in range(5):
+        start = time.perf_counter()
+        run_python("-c", "from stenotype.cli import cli; cli()", "?[int]")
+        processes.append(time.perf_counter() - start)
+    print(f"{'new process':<24} {min(processes) * 1000:>8.2f}ms")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(server_path)
+        with client.makefile("rb") as responses:
+            latencies = []
+            for index in range(1000):
+                message = request(index, "convert", f"?[int{' or str' * (index % 50)}]")
+                start = time.perf_counter()
+                client.sendall(json.dumps(message).encode() + b"\n")
+                next(responses)
+                latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(f"{'server, median':<24} {latencies[500] * 1000:>8.2f}ms")
+    print(f"{'server, 99th percentile':<24} {latencies[990] * 1000:>8.2f}ms")
+    messages = [request(index, "convert", "?[int]") for index in range(1000)]
+    start = time.perf_counter()
+    pipeline_requests(server_path, messages)
+    seconds = (time.perf_counter() - start) / len(messages)
+    print(f"{'server, pipelined':<24} {seconds * 1000:>8.2f}ms")
@@ -0,0 +1,116 @@
+"""Guard the time it takes to start stenotype in a new process."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import stenotype
+
+#: modules that are slow to import and not needed before the first parse
+DEFERRED = ["pyparsing", "stenotype.backend.rules", "logging.config"]
+
+
+def run_python(*args: str, **environ: str) -> subprocess.CompletedProcess:
+    """Run python with ``args``, importing stenotype from the tested location"""
+    env = dict(
+        os.environ, PYTHONPATH=str(Path(stenotype.__file__).parents[1]), **environ
+    )
+    return subprocess.run(
+        [sys.executable, *args],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def loaded_modules(code: str) -> set:
+    script = f"{code}\nimport sys\nprint(*sys.modules)"
+    return set(run_python("-c", script).stdout.split())
+
+
+def test_lazy_grammar():
+    modules = loaded_modules("import stenotype.cli")
+    assert not modules & set(DEFERRED)
+    modules = loaded_modules(
+        "from stenotype.backend.grammar import parse\nparse('int', 'descent')"
+    )
+    assert "pyparsing" not in modules
+    modules = loaded_modules(
+        "from stenotype.backend.grammar import parse\nparse('int', 'pyparsing')"
+    )
+    assert "stenotype.backend.rules" in modules
+
+
+def import_times(module: str) -> dict:
+    """Get the cumulative import time of each module in microseconds"""
+    stderr = run_python("-X", "importtime", "-c", f"import {module}").stderr
+    times = {}
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.benchmark
+def test_benchmark_import():
+    """Report the import time of the CLI and its slowest dependencies"""
+    if sys.version_info < (3, 7):
+        pytest.skip("-X importtime requires Python 3.7")
+    print(f"\n{'module':<40} {'cumulative':>12}")
+    for module in ("stenotype.cli", "stenotype.backend.rules"):
+        runs = [import_times(module) for _ in range(5)]
+        times = {name: min(run[name] for run in runs) for name in runs[0]}
+        for name, micros in sorted(times.items(), key=lambda item: -item[1])[:6]:
+            print(f"{name:<40} {micros / 1000:>10.1f}ms")
+        print()
+
+
+#: print the time of the first parse with ``engine`` in a new process
+FIRST_PARSE = """
+import time
+start = time.perf_counter()
+from stenotype.backend.grammar import parse
+parse('int', {engine!r})
+print(time.perf_counter() - start)
+"""
+#: print the time of building the pyparsing rules in a new process
+BUILD_RULES = """
+import time
+import pyparsing
+start = time.perf_counter()
+import stenotype.backend.rules
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(code: str, bytecode: bool, prefix: Path) -> float:
+    """Measure the best time printed by ``code`` in milliseconds"""
+    # the cache prefix holds the bytecode of all modules, including the stdlib
+    environ = {
+        "PYTHONPYCACHEPREFIX": str(prefix),
+        "PYTHONDONTWRITEBYTECODE": "" if bytecode else "1",
+    }
+    run_python("-c", code, **environ)
+    return min(float(run_python("-c", code, **environ).stdout) for _ in range(5)) * 1000
+
+
+@pytest.mark.benchmark
+def test_benchmark_cold_start(tmp_path):
+    """Report the latency of the first parse, with and without cached bytecode"""
+    if sys.version_info < (3, 8):
+        pytest.skip("PYTHONPYCACHEPREFIX requires Python 3.8")
+    print(f"\n{'measurement':<32} {'bytecode':>10} {'no bytecode':>12}")
+    measurements = [
+        (f"first parse ({engine})", FIRST_PARSE.format(engine=engine))
+        for engine in ("pyparsing", "descent")
+    ]
+    measurements.append(("build pyparsing rules", BUILD_RULES))
+    for label, code in measurements:
+        cached = cold_start(code, True, tmp_path / "cached")
+        uncached = cold_start(code, False, tmp_path / "empty")
+        print(f"{label:<32} {cached:>8.1f}ms {uncached:>10.1f}ms")
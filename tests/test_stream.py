@@ -0,0 +1,139 @@
+"""Test converting streams of expressions and NDJSON records."""
+
+import io
+import itertools
+import json
+import time
+import tracemalloc
+
+import pytest
+from click.testing import CliRunner
+
+from stenotype import cli
+
+from stenotype.stream import process_line, process_lines, stream
+
+
+def test_process_line():
+    output, failed = process_line((3, "?int\n"))
+    assert json.loads(output) == {"id": 3, "result": "typing.Optional[int]"}
+    assert not failed
+    output, failed = process_line((4, "typing.List[int]"), shorten=True)
+    assert json.loads(output) == {"id": 4, "result": "[int]"}
+    output, failed = process_line((5, "int or"))
+    assert failed
+    assert json.loads(output)["error"]["type"] == "ParseError"
+    assert process_line((6, "  \n")) is None
+
+
+# fmt: off
+records = [
+    ('{"id": "a", "expression": "?int"}', {"id": "a", "result": "typing.Optional[int]"}),
+    ('{"id": [1, 2], "expression": "int"}', {"id": [1, 2], "result": "int"}),
+    ('{"id": null, "expression": "int"}', {"id": None, "result": "int"}),
+    ('{"expression": "int"}', {"id": 1, "result": "int"}),
+    ('{"id": 2, "expression": "int or"}', {"id": 2, "error": "ParseError"}),
+    ('{"id": 2, "expression": 3}', {"id": 1, "error": "InvalidRecord"}),
+    ('[1]', {"id": 1, "error": "InvalidRecord"}),
+    ('{"id": 2', {"id": 1, "error": "JSONDecodeError"}),
+]
+# fmt: on
+
+
+@pytest.mark.parametrize("line, expected", records)
+def test_records(line, expected):
+    output, failed = process_line((1, line), ndjson=True)
+    output = json.loads(output)
+    if failed:
+        output["error"] = output["error"]["type"]
+    assert output == expected
+    assert failed == ("error" in expected)
+
+
+def test_lazy():
+    lines = itertools.cycle(["?int\n", "int or\n", "\n"])
+    outcomes = itertools.islice(process_lines(lines), 1000)
+    assert sum(failed for _, failed in outcomes) == 500
+
+
+def test_jobs():
+    names = ["int", "str", "T"]
+    lines = [
+        json.dumps({"id": index, "expression": f"?{names[index % 3]}"})
+        for index in range(500)
+    ]
+    outputs = [json.loads(output) for output, _ in process_lines(lines, True, jobs=2)]
+    assert outputs == [
+        {"id": index, "result": f"typing.Optional[{names[index % 3]}]"}
+        for index in range(500)
+    ]
+
+
+class Output(io.StringIO):
+    """Output stream recording the number of lines at each flush"""
+
+    def __init__(self):
+        super().__init__()
+        self.flushes = []
+
+    def flush(self):
+        self.flushes.append(self.getvalue().count("\n"))
+
+
+def test_stream():
+    output = Output()
+    errors = stream(["?int\n", "int or\n", "\n"] * 4, output, flush_every=3)
+    assert errors == 4
+    assert output.flushes == [3, 6, 8]
+    lines = output.getvalue().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 4, 5, 7, 8, 10, 11]
+
+
+def test_cli_stream(monkeypatch):
+    monkeypatch.setattr(cli.util, "setup_logging", lambda x: None)
+    runner = CliRunner(mix_stderr=False)
+    result = runner.invoke(cli.cli, ["stream"], input="?int\n[str]\n")
+    assert result.exit_code == 0
+    assert result.stdout == (
+        '{"id": 1, "result": "typing.Optional[int]"}\n'
+        '{"id": 2, "result": "typing.List[str]"}\n'
+    )
+    source = '{"id": "x", "expression": "typing.List[int]"}\n{"id": "y"}\n'
+    result = runner.invoke(cli.cli, ["stream", "--ndjson", "-s"], input=source)
+    assert result.exit_code == 1
+    outputs = [json.loads(line) for line in result.stdout.splitlines()]
+    assert outputs[0] == {"id": "x", "result": "[int]"}
+    assert outputs[1]["error"]["type"] == "InvalidRecord"
+
+
+def cycled(expressions, count):
+    return (
+        f"{line}\n" for line in itertools.islice(itertools.cycle(expressions), count)
+    )
+
+
+@pytest.mark.benchmark
+def test_benchmark_stream():
+    """Report the throughput and peak memory of streaming many lines"""
+    from stenotype.backend.generate import Generator
+
+    # more distinct expressions than the conversion cache holds
+    expressions = list(Generator(seed=8, max_depth=3).strings(20000))
+    stream(cycled(expressions, 20000), Null(), engine="descent")
+    print(f"\n{'lines':>10} {'lines/s':>10} {'peak memory':>12}")
+    for count in (10000, 50000):
+        start = time.perf_counter()
+        stream(cycled(expressions, count), Null(), engine="descent")
+        seconds = time.perf_counter() - start
+        tracemalloc.start()
+        stream(cycled(expressions, count), Null(), engine="descent")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{count:>10} {count / seconds:>10.0f} {peak / 1024:>10.0f}KB")
+
+
+class Null(io.TextIOBase):
+    """Output stream discarding all output"""
+
+    def write(self, string):
+        return len(string)